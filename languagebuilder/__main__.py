@@ -1,8 +1,206 @@
-from .example import my_language
+from array import array
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import pickle
+import sys
 
-def run_wordbuilder():
-    print("Running wordbuilder")
-    return
+# Command line for building words from a saved language
+# - a language file is a pickled Language, written with the save command
+# - subsystems load only when a command or the language file needs them,
+#   so the command line starts quickly when run many times from a pipeline
+# - each result is written to stdout as one line of JSON
+# - library logging is silenced unless sent to stderr with --verbose
+
+def load_language(path):
+    """Read a pickled Language from a language file"""
+    with open(path, "rb") as language_file:
+        return pickle.load(language_file)
+
+def save_language(language, path):
+    """Write a Language to a language file"""
+    with open(path, "wb") as language_file:
+        pickle.dump(language, language_file, protocol=pickle.HIGHEST_PROTOCOL)
+    return path
+
+def parse_properties(properties_text):
+    """Read grammatical properties formatted as category:grammeme,category:grammeme"""
+    properties = {}
+    for pair in filter(None, (properties_text or "").split(",")):
+        category, _, grammeme = pair.partition(":")
+        if not (category and grammeme):
+            raise ValueError(f"Expected properties formatted as category:grammeme not {pair}")
+        properties.setdefault(category.strip(), set()).add(grammeme.strip())
+    return properties
+
+def read_words(words):
+    """Read sound sequences from arguments or from stdin lines, where each word is
+    a JSON list of symbols or a string of space-separated symbols"""
+    lines = words if words else (line.strip() for line in sys.stdin)
+    for line in lines:
+        if not line:
+            continue
+        yield json.loads(line) if line.startswith("[") else line.split()
+
+def format_json(value):
+    """Write sets within results as sorted lists and arrays as lists"""
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, array):
+        return list(value)
+    raise TypeError(f"Cannot write {type(value).__name__} as JSON")
+
+def write_line(output, result):
+    output.write(json.dumps(result, ensure_ascii=False, default=format_json) + "\n")
+
+def save(options, output):
+    import importlib
+    module_name, _, attribute = options.source.partition(":")
+    language = getattr(importlib.import_module(module_name), attribute or "language")
+    # build the language when the source is a function
+    language = language() if callable(language) else language
+    save_language(language, options.language)
+    write_line(output, {'saved': options.language, 'name': language.name})
+
+def generate(options, output):
+    language = load_language(options.language)
+    for i in range(options.count):
+        entry = language.generate(
+            length=options.length,
+            definition=options.definition.format(i=i),
+            word_class=options.word_class,
+            ngrams=options.ngrams,
+            min_distance=options.min_distance
+        )
+        # write null for words that could not be generated, as attach does
+        if not entry:
+            write_line(output, None)
+            continue
+        headword, entry_index = entry
+        write_line(output, dict(
+            language.vocabulary.lookup(headword, entry_index),
+            headword=headword,
+            entry_index=entry_index
+        ))
+    options.save and save_language(language, options.language)
+
+def attach(options, output):
+    language = load_language(options.language)
+    for base in options.bases:
+        write_line(output, language.attach(
+            base=base,
+            entry_index=options.entry_index,
+            properties=parse_properties(options.properties),
+            word_classes=options.word_classes
+        ))
+    options.save and save_language(language, options.language)
+
+def paradigm(options, output):
+    language = load_language(options.language)
+    fixed_properties = parse_properties(options.properties)
+    # build one form for every combination of grammemes across filled categories
+    filled_grammemes = [
+        [(category, grammeme) for grammeme in language.grammar.properties.get(category) or []]
+        for category in options.categories
+    ]
+    for combination in itertools.product(*filled_grammemes):
+        properties = {category: set(grammemes) for category, grammemes in fixed_properties.items()}
+        for category, grammeme in combination:
+            properties.setdefault(category, set()).add(grammeme)
+        write_line(output, language.attach(
+            base=options.base,
+            entry_index=options.entry_index,
+            properties=properties,
+            word_classes=options.word_classes
+        ))
+    options.save and save_language(language, options.language)
+
+def apply_rules(options, output):
+    language = load_language(options.language)
+    words = list(read_words(options.words))
+    changes = language.phonology.apply_rules_many(words)
+    for sound, change in zip(words, changes):
+        write_line(output, {'sound': sound, 'change': change})
+
+def syllabify(options, output):
+    language = load_language(options.language)
+    for sound in read_words(options.words):
+        write_line(output, {
+            'sound': sound,
+            'syllables': language.phonology.syllables.syllabify(sound)
+        })
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m languagebuilder",
+        description="Build words with a saved language, writing one JSON result per line"
+    )
+    parser.add_argument("--verbose", action="store_true", help="send library logging to stderr")
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    command = commands.add_parser("save", help="save a language built in a module to a language file")
+    command.add_argument("source", help="module and language or language function, like languagebuilder.benchmarks.workloads:build_language")
+    command.add_argument("language", help="language file to write")
+    command.set_defaults(run=save)
+
+    command = commands.add_parser("generate", help="generate base words into the vocabulary")
+    command.add_argument("language", help="language file")
+    command.add_argument("--count", type=int, default=1, help="number of words to generate")
+    command.add_argument("--length", type=int, help="syllables per word (default: random within language min and max)")
+    command.add_argument("--definition", default="", help="definition for each word, where {i} is the word's number")
+    command.add_argument("--word-class", help="part of speech for each word")
+    command.add_argument("--ngrams", action="store_true", help="sample sounds resembling vocabulary words")
+    command.add_argument("--min-distance", type=float, help="skip words sounding closer than this to vocabulary words")
+    command.add_argument("--save", action="store_true", help="write generated words back to the language file")
+    command.set_defaults(run=generate)
+
+    command = commands.add_parser("attach", help="attach grammatical pieces to base words")
+    command.add_argument("language", help="language file")
+    command.add_argument("bases", nargs="+", help="vocabulary headwords, or one-off base spellings without --entry-index")
+    command.add_argument("--entry-index", type=int, help="vocabulary entry under each headword")
+    command.add_argument("--properties", default="", help="properties formatted as category:grammeme,category:grammeme")
+    command.add_argument("--word-classes", help="parts of speech for the built unit")
+    command.add_argument("--save", action="store_true", help="write built units back to the language file corpus")
+    command.set_defaults(run=attach)
+
+    command = commands.add_parser("paradigm", help="attach every grammeme combination of categories to a base word")
+    command.add_argument("language", help="language file")
+    command.add_argument("base", help="vocabulary headword")
+    command.add_argument("--entry-index", type=int, default=0, help="vocabulary entry under the headword")
+    command.add_argument("--categories", nargs="+", required=True, help="categories to fill with each of their grammemes")
+    command.add_argument("--properties", default="", help="fixed properties formatted as category:grammeme,category:grammeme")
+    command.add_argument("--word-classes", help="parts of speech for the built units")
+    command.add_argument("--save", action="store_true", help="write built units back to the language file corpus")
+    command.set_defaults(run=paradigm)
+
+    command = commands.add_parser("apply-rules", help="apply sound changes to words")
+    command.add_argument("language", help="language file")
+    command.add_argument("words", nargs="*", help="words as space-separated symbols or JSON lists (default: stdin lines)")
+    command.set_defaults(run=apply_rules)
+
+    command = commands.add_parser("syllabify", help="break words into syllables")
+    command.add_argument("language", help="language file")
+    command.add_argument("words", nargs="*", help="words as space-separated symbols or JSON lists (default: stdin lines)")
+    command.set_defaults(run=syllabify)
+
+    return parser.parse_args(args)
+
+def main(args=None):
+    options = parse_args(args)
+    output = sys.stdout
+    # keep stdout for results only
+    with open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(sys.stderr if options.verbose else devnull):
+            try:
+                options.run(options, output)
+            # stop quietly when a pipeline stops reading
+            except BrokenPipeError:
+                os.dup2(devnull.fileno(), output.fileno())
+                return 1
+    return 0
 
 if __name__ == '__main__':
-    run_wordbuilder()
+    sys.exit(main())
@@ -0,0 +1,44 @@
+from .runner import run_benchmarks, compare, format_report, save, load
+from .workloads import sizes, workloads
+import argparse
+import json
+import sys
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m languagebuilder.benchmarks",
+        description="Time word generation, sound changes, syllabification and grammar on seeded languages"
+    )
+    parser.add_argument("--sizes", nargs="+", choices=list(sizes), help="language sizes to run (default: all)")
+    parser.add_argument("--workloads", nargs="+", choices=list(workloads), help="workloads to run (default: all)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for languages and inputs")
+    parser.add_argument("--iterations", type=int, default=100, help="calls per timed repeat")
+    parser.add_argument("--repeat", type=int, default=3, help="timed repeats per workload (best is kept)")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--baseline", help="compare against a saved JSON report")
+    parser.add_argument("--threshold", type=float, default=0.1, help="slowdown ratio over baseline counted as a regression")
+    parser.add_argument("--json", action="store_true", help="print the JSON report instead of a table")
+    return parser.parse_args(args)
+
+def main(args=None):
+    options = parse_args(args)
+    report = run_benchmarks(
+        sizes=options.sizes,
+        workloads=options.workloads,
+        seed=options.seed,
+        iterations=options.iterations,
+        repeat=options.repeat
+    )
+
+    comparisons = compare(report, load(options.baseline), options.threshold) if options.baseline else []
+    if comparisons:
+        report['comparisons'] = comparisons
+
+    options.output and save(report, options.output)
+    print(json.dumps(report, indent=2) if options.json else format_report(report, comparisons))
+
+    # fail when any workload regressed against the baseline
+    return 1 if any(comparison['regression'] for comparison in comparisons) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+from . import workloads as benchmark_workloads
+import contextlib
+import json
+import os
+import platform
+import random
+import time
+import tracemalloc
+
+# Run seeded workloads, collect timing and memory, compare against a baseline
+# - timings are taken with tracing off, then one extra traced pass reads memory
+# - the library logs heavily, so output is silenced while measuring
+# - results are plain dicts ready to dump as JSON
+
+def measure(run, iterations=100, repeat=3):
+    """Time a workload callable over several repeats and trace its peak memory.
+    Returns seconds per repeat and the peak traced memory in bytes."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            run()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    for _ in range(iterations):
+        run()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return timings, peak_memory
+
+def run_benchmarks(sizes=None, workloads=None, seed=0, iterations=100, repeat=3):
+    """Build each sized language and measure every requested workload on it"""
+    sizes = sizes if sizes else list(benchmark_workloads.sizes)
+    workloads = workloads if workloads else list(benchmark_workloads.workloads)
+
+    results = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for size in sizes:
+            language = benchmark_workloads.build_language(size, seed=seed)
+            for workload in workloads:
+                # reseed so every workload samples the same inputs run to run
+                random.seed(seed)
+                run = benchmark_workloads.workloads[workload](language)
+                timings, peak_memory = measure(run, iterations=iterations, repeat=repeat)
+                results.append({
+                    'workload': workload,
+                    'size': size,
+                    'iterations': iterations,
+                    'repeat': repeat,
+                    'seconds': min(timings),
+                    'seconds_mean': sum(timings) / len(timings),
+                    'seconds_per_iteration': min(timings) / iterations,
+                    'peak_memory': peak_memory
+                })
+
+    return {
+        'seed': seed,
+        'python': platform.python_version(),
+        'results': results
+    }
+
+def compare(report, baseline, threshold=0.1):
+    """Compare per-iteration timings to a baseline report. Returns one entry per
+    workload and size found in both, flagging slowdowns beyond the threshold."""
+    baseline_results = {
+        (result['workload'], result['size']): result
+        for result in baseline.get('results', [])
+    }
+    comparisons = []
+    for result in report['results']:
+        baseline_result = baseline_results.get((result['workload'], result['size']))
+        if not baseline_result or not baseline_result['seconds_per_iteration']:
+            continue
+        ratio = result['seconds_per_iteration'] / baseline_result['seconds_per_iteration']
+        comparisons.append({
+            'workload': result['workload'],
+            'size': result['size'],
+            'ratio': ratio,
+            'regression': ratio > 1 + threshold
+        })
+    return comparisons
+
+def format_report(report, comparisons=None):
+    """Build a display table of results, with baseline ratios when compared"""
+    ratios = {
+        (comparison['workload'], comparison['size']): comparison
+        for comparison in comparisons or []
+    }
+    lines = [f"{'workload':<18}{'size':<8}{'per iteration (ms)':>20}{'peak memory (KiB)':>20}{'vs baseline':>14}"]
+    for result in report['results']:
+        comparison = ratios.get((result['workload'], result['size']))
+        ratio_text = ""
+        if comparison:
+            ratio_text = f"{comparison['ratio']:.2f}x" + (" !" if comparison['regression'] else "")
+        lines.append("{0:<18}{1:<8}{2:>20.4f}{3:>20.1f}{4:>14}".format(
+            result['workload'],
+            result['size'],
+            result['seconds_per_iteration'] * 1000,
+            result['peak_memory'] / 1024,
+            ratio_text
+        ))
+    return "\n".join(lines)
+
+def save(report, path):
+    """Write a report to a JSON file"""
+    with open(path, "w") as report_file:
+        json.dump(report, report_file, indent=2)
+    return path
+
+def load(path):
+    """Read a saved JSON report"""
+    with open(path) as report_file:
+        return json.load(report_file)
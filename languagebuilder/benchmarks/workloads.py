@@ -0,0 +1,169 @@
+from ..language.language import Language
+from ..data.ipa_features import vc_map
+from ..tools import flat_list
+import random
+
+# Seeded languages and workloads for benchmarking hot paths
+# - each size sets inventory, rule, exponent and vocabulary counts
+# - languages are built like example.py: features map, sounds, syllables,
+#   sound change rules, grammatical properties and exponents, base words
+# - each workload prepares its inputs up front and returns a callable that
+#   runs one iteration of the measured work
+
+sizes = {
+    'small': {
+        'consonants': 6,
+        'vowels': 3,
+        'syllables': ["CV", "V"],
+        'rules': 5,
+        'exponents': 4,
+        'words': 50
+    },
+    'medium': {
+        'consonants': 16,
+        'vowels': 5,
+        'syllables': ["CV", "CVC", "V", "VC"],
+        'rules': 20,
+        'exponents': 12,
+        'words': 200
+    },
+    'large': {
+        'consonants': 35,
+        'vowels': 10,
+        'syllables': ["CV", "CVC", "V", "VC", "CCV", "CVCC"],
+        'rules': 50,
+        'exponents': 30,
+        'words': 500
+    }
+}
+
+# rule source -> target feature shifts and environments sampled to build rules
+rule_changes = [
+    (["voiceless"], ["voiced"]),
+    (["voiced"], ["voiceless"]),
+    (["stop"], ["fricative"]),
+    (["fricative"], ["stop"]),
+    (["alveolar"], ["postalveolar"]),
+    (["velar"], ["uvular"]),
+    (["front"], ["retracted"]),
+    (["rounded"], ["unrounded"])
+]
+rule_environments = ["V_V", "_#", "#_", "C_V", "V_C", "_C", "V_"]
+
+def build_language(size="small", seed=0):
+    """Create a seeded example language with the given size settings"""
+    settings = sizes[size]
+    random.seed(seed)
+
+    language = Language(name=f"Benchmarkish ({size})")
+    language.phonetics.add_map(vc_map)
+
+    # inventory with each symbol spelled as itself
+    vowels = [ipa for ipa, features in vc_map.items() if 'vowel' in features]
+    consonants = [ipa for ipa, features in vc_map.items() if 'consonant' in features]
+    language.phonology.add_sounds({
+        ipa: [ipa]
+        for ipa in vowels[:settings['vowels']] + consonants[:settings['consonants']]
+    })
+    for syllable in settings['syllables']:
+        language.phonology.add_syllable(syllable)
+
+    # sound changes
+    for _ in range(settings['rules']):
+        source, target = random.choice(rule_changes)
+        language.phonology.add_rule(source, target, random.choice(rule_environments))
+
+    # grammar with one suffix per case
+    language.grammar.word_classes.add("noun")
+    for i in range(settings['exponents']):
+        language.grammar.properties.add("case", f"case{i}")
+        language.grammar.exponents.add(
+            post=language.phonology.build_word(1, apply_rules=False)['sound'],
+            properties={'case': {f"case{i}"}},
+            pos="noun"
+        )
+
+    # vocabulary
+    language.syllables_min_max(1, 3)
+    for i in range(settings['words']):
+        language.generate(definition=f"word {i}", word_class="noun")
+
+    return language
+
+def vocabulary_sounds(language):
+    """List the underlying sounds of every vocabulary entry"""
+    return [
+        entry['sound']
+        for entries in language.vocabulary.vocabulary.values()
+        for entry in entries
+    ]
+
+def build_word(language):
+    return lambda: language.phonology.build_word(length=2)
+
+def apply_rules(language):
+    words = vocabulary_sounds(language)
+    return lambda: language.phonology.apply_rules(random.choice(words))
+
+def apply_rules_many(language):
+    words = vocabulary_sounds(language)
+    return lambda: language.phonology.apply_rules_many(words)
+
+def syllabify(language):
+    words = vocabulary_sounds(language)
+    return lambda: language.phonology.syllables.syllabify(random.choice(words))
+
+def provide(language):
+    grammemes = list(language.grammar.properties.get("case"))
+    return lambda: language.grammar.provide(
+        {'case': {random.choice(grammemes)}},
+        word_classes="noun"
+    )
+
+def attach(language):
+    headwords = list(language.vocabulary.vocabulary)
+    grammemes = list(language.grammar.properties.get("case"))
+    return lambda: language.attach(
+        base=random.choice(headwords),
+        entry_index=0,
+        properties={'case': {random.choice(grammemes)}},
+        word_classes="noun"
+    )
+
+def nested_sounds(language):
+    """Nest vocabulary sounds like attachment pieces: each word as a list of
+    single-sound lists, grouped in tens, under a chain of wrapping lists"""
+    words = [[[sound] for sound in sounds] for sounds in vocabulary_sounds(language)]
+    nested = [words[i:i + 10] for i in range(0, len(words), 10)]
+    for _ in range(50):
+        nested = [nested, ["#"]]
+    return nested
+
+def recursive_flatten(l):
+    """Flatten as flat_list.flatten did before it was iterative, for comparison"""
+    if flat_list.is_primitive(l):
+        return [l]
+    flat_l = []
+    for l_sub in l:
+        flat_l += recursive_flatten(l_sub)
+    return flat_l
+
+def flatten(language):
+    nested = nested_sounds(language)
+    return lambda: flat_list.flatten(nested)
+
+def flatten_recursive(language):
+    nested = nested_sounds(language)
+    return lambda: recursive_flatten(nested)
+
+# workload name -> workload builder
+workloads = {
+    'build_word': build_word,
+    'apply_rules': apply_rules,
+    'apply_rules_many': apply_rules_many,
+    'syllabify': syllabify,
+    'provide': provide,
+    'attach': attach,
+    'flatten': flatten,
+    'flatten_recursive': flatten_recursive
+}
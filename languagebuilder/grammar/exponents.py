@@ -1,4 +1,4 @@
-from uuid import uuid4
+from ..tools.collector import Collection
 from ..tools.functional_maps import merge_maps
 
 # TODO: consider "exponent" name
@@ -11,8 +11,8 @@ class Exponents:
         # grammar for which exponents provide properties and word classes
         # used to verify category:grammemes and parts of speech (read only)
         self.grammar = grammar
-        # exponents collection managed throughout this class
-        self.exponents = {}
+        # exponents collection by integer id managed throughout this class
+        self.exponents = Collection()
 
     def get(self, exponent_id=None):
         """Read exponent details for one entry (or all if none specified) in the exponents map"""
@@ -103,16 +103,15 @@ class Exponents:
             return
         
         # store exponent details
-        exponent_id = f"grammatical-exponent-{uuid4()}"
-        self.exponents[exponent_id] = {
-            'id': exponent_id,
+        exponent_id = self.exponents.add({
             'pre': vetted_pre,
             'mid': vetted_mid,
             'post': vetted_post,
             'bound': bound,
             'properties': recognized_properties,
             'pos': recognized_word_classes
-        }
+        })
+        self.exponents[exponent_id]['id'] = exponent_id
         return exponent_id
 
     def add_many(self, exponents_details):
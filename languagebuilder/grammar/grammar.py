@@ -432,7 +432,7 @@ class Grammar:
         return reduced_exponents
 
     # the main public method for making use of data stored in the grammar
-    def build_unit(self, base, properties=None, word_classes=None, exact_pos=False, spacing=" ", midpoint=0, all_requested=False, all_or_none=False, as_string=False):
+    def build_unit(self, base, properties=None, word_classes=None, exact_pos=False, spacing=" ", midpoint=0, all_requested=False, all_or_none=False, as_string=False, boundaries=False):
         """Build up relevant morphosyntax around a base using the given grammatical terms.
 
         Args:
@@ -445,6 +445,7 @@ class Grammar:
             all_requested (bool): Move forward only if all requested properties exist.
             all_or_none (bool): Ensure all requested properties are provided.
             as_string (bool): Return the built unit as a string instead of a list.
+            boundaries (bool): Also return offsets where each morph starts (see attach_plan).
         
         Returns:
             A list of sound symbols representing the grammatically exponented base,
@@ -456,25 +457,22 @@ class Grammar:
             print(f"Grammar build_word failed - invalid base word {base}")
             return
 
-        # determine exponents to add
-        exponents = self.provide(
+        # determine exponents and lay out their material around any base
+        plan = self.plan_unit(
             properties,
             word_classes=word_classes,
-            all_or_none=all_or_none,
+            exact_pos=exact_pos,
+            spacing=spacing,
             all_requested=all_requested,
-            exact_pos=exact_pos
-        )
-        if not exponents:
-            print(f"Grammar failed to build unit around base {base} - ")       
-
-        # add exponents to build up the word
-        # attach the best matches from the mapped and reduced exponents
-        built_word = self.attach_exponents(
-            base,
-            exponents,
-            midpoint=midpoint,
-            spacing=spacing
+            all_or_none=all_or_none
         )
+        if plan is None:
+            return
+
+        # attach the laid out exponent material around this base
+        if boundaries:
+            return self.attach_plan(base, plan, midpoint=midpoint, boundaries=True)
+        built_word = self.attach_plan(base, plan, midpoint=midpoint)
 
         # allow returning string instead of list
         if as_string:
@@ -487,8 +485,38 @@ class Grammar:
         #raise ValueError(f"list contains more than symbols: {built_word}")
         return built_word
 
+    def plan_unit(self, properties=None, word_classes=None, exact_pos=False, spacing=" ", all_requested=False, all_or_none=False):
+        """Find the exponents for grammatical terms and lay out their material as an
+        attachment plan (see plan_attachments) that builds a unit around any base.
+        Reuse the plan to build many units with the same terms."""
+        # determine exponents to add
+        exponents = self.provide(
+            properties,
+            word_classes=word_classes,
+            all_or_none=all_or_none,
+            all_requested=all_requested,
+            exact_pos=exact_pos
+        )
+        if not exponents:
+            print(f"Grammar failed to find exponents to build a unit - ")
+        return self.plan_attachments(exponents, spacing=spacing)
+
     def attach_exponents(self, base, exponent_ids, spacing=" ", midpoint=0, as_string=False, reorder=True):
         """Exponent a complex word to correctly position a root, prefixes, postfixes, prepositions, postpositions"""
+        plan = self.plan_attachments(exponent_ids, spacing=spacing, reorder=reorder)
+        if plan is None:
+            return
+        exponented_word = self.attach_plan(base, plan, midpoint=midpoint)
+
+        # return the sequence as a list or string
+        if as_string:
+            return "".join(exponented_word)
+        return exponented_word
+
+    def plan_attachments(self, exponent_ids, spacing=" ", reorder=True):
+        """Lay out exponent material in attachment order ahead of any base, as a map
+        of attachment type:sound symbols for preposition, prefix, infix, postfix
+        and postposition"""
         # expect a collection of exponent ids and a word-building map
         if not isinstance(exponent_ids, (list, set, tuple)):
             print(f"Grammar attach_exponents failed - invalid exponents collection {exponent_ids}")
@@ -511,13 +539,6 @@ class Grammar:
             attachment: []
             for attachment in attachment_sequence
         }
-        # add all base word symbols to word pieces
-        midpoint = midpoint if midpoint is not None else 0
-        base_0 = base[:midpoint]
-        base_1 = base[midpoint:]
-        [exponented_word_map['base_0'].append(sound) for sound in base_0]
-        [exponented_word_map['base_1'].append(sound) for sound in base_1]
-        
         # rearrange exponents using morphosyntax ordering
         if reorder:
             # get back innermost-to-outermost ordered ids list
@@ -587,24 +608,44 @@ class Grammar:
 
         # flatten attachment sequences and remove empty strings
         for piece_name in exponented_word_map:
-            flat_list.flatten(exponented_word_map[piece_name])
-            exponented_word_map[piece_name] = list(filter(
+            exponented_word_map[piece_name] = flat_list.flat_filter(
                 lambda symbol: symbol and isinstance(symbol, str),
                 exponented_word_map[piece_name]
-            ))
+            )
         
-        # turn exponenting map into sound sequence following order of attachments
+        # base pieces are filled in when the plan is attached to a base
+        del exponented_word_map['base_0']
+        del exponented_word_map['base_1']
+        return exponented_word_map
+
+    def attach_plan(self, base, plan, midpoint=0, boundaries=False):
+        """Build a unit around a base using an attachment plan from plan_attachments.
+        Optionally also return the offsets in the unit where each attached piece
+        of exponent or base material starts, for keeping sound changes within morphs."""
+        midpoint = midpoint if midpoint is not None else 0
+        base_0 = [symbol for symbol in base[:midpoint] if symbol and isinstance(symbol, str)]
+        base_1 = [symbol for symbol in base[midpoint:] if symbol and isinstance(symbol, str)]
         # TODO: pre, break base word, add mid material, add end base word, post
-        exponented_word = [
-            piece for attachment in attachment_sequence
-            for piece in exponented_word_map[attachment]
-        ]
-        
-        # return the sequence as a list or string
-        if as_string:
-            return "".join(exponented_word)
-        return list(exponented_word)
-    
+        pieces = (
+            plan['preposition'],
+            plan['prefix'],
+            base_0,
+            plan['infix'],
+            base_1,
+            plan['postfix'],
+            plan['postposition']
+        )
+        unit = [symbol for piece in pieces for symbol in piece]
+        if not boundaries:
+            return unit
+        starts = []
+        offset = 0
+        for piece in pieces:
+            if piece and offset:
+                starts.append(offset)
+            offset += len(piece)
+        return unit, starts
+
     def attach_exponent(self, base, exponent_id=None, midpoint=0, spacing=" ", as_string=False):
         """Attach one grammatical exponent around a root word"""
         # check for a good stem and an exponent to attach to it
@@ -155,11 +155,11 @@ class Morphosyntax:
         # write: vet and collect
         filtered_exponents = {}
 
-        # filter requested exponents allowing for single string or collection input
+        # filter requested exponents allowing for single id or collection input
         # store recognized ones and their position compared to the main exponent
         for position, exponents in requested_exponents.items():
-            # exponents collection is a single string - create a one-item set
-            if isinstance(exponents, str) and self.grammar.exponents.get(exponents):
+            # exponents collection is a single id - create a one-item set
+            if isinstance(exponents, (str, int)) and self.grammar.exponents.get(exponents):
                 filtered_exponents[position] = {exponents}
             # create set from requested exponents collection
             elif isinstance(exponents, (list, tuple, set)):
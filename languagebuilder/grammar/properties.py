@@ -1,5 +1,6 @@
 from ..tools.functional_maps import merge_maps
-from ..tools.flat_list import flatten
+from ..tools.overlay import peek
+
 class Properties:
     def __init__(self, grammar):
         # reference to parent grammar where exponents provide these properties
@@ -18,14 +19,14 @@ class Properties:
             return self.properties
         # fetch all grammemes in a single category
         elif not grammeme:
-            return self.properties.get(category)
+            return peek(self.properties, category)
         # fetch a single grammeme
         else:
-            return (None, grammeme)[grammeme in self.properties.get(category, {})]
+            return (None, grammeme)[grammeme in peek(self.properties, category, {})]
     
     def is_grammeme(self, grammeme):
         """Check if the grammeme exists in the properties map"""
-        return grammeme in flatten(self.properties.values())
+        return any(grammeme in grammemes for grammemes in self.properties.values())
 
     def is_category(self, category):
         """Check if the category exists in the properties map"""
@@ -253,12 +254,12 @@ class Properties:
         # uncategorized grammeme - return all occurrences
         elif grammeme and not category:
             return [(found_category, grammeme) for found_category in filter(
-                lambda filtered_category: grammeme in self.properties[filtered_category],
+                lambda filtered_category: grammeme in peek(self.properties, filtered_category),
                 self.properties.keys()
             )]
         # all grammemes in a single category
         elif category in self.properties:
-            return [(category, stored_grammeme) for stored_grammeme in self.properties[category]]
+            return [(category, stored_grammeme) for stored_grammeme in peek(self.properties, category)]
         # no valid category or grammeme supplied
         else:
             return
@@ -279,7 +280,7 @@ class Properties:
             if category not in self.properties:
                 return False
             # verify all grammemes exist in the grammatical properties
-            if not set(properties[category]).issubset(self.properties[category]):
+            if not set(properties[category]).issubset(peek(self.properties, category)):
                 return False
                 
         # no properties or structures fell through during checks
@@ -291,9 +292,9 @@ class Properties:
         if category in self.properties:
             # return recognized grammeme collection members inside of a set
             if isinstance(grammemes, (list, set, tuple)):
-                return set(grammemes).intersection(self.properties.get(category, set()))
+                return set(grammemes).intersection(peek(self.properties, category, set()))
             # recognized grammeme string inside of a set
-            if isinstance(grammemes, str) and grammemes in self.properties.get(category, set()):
+            if isinstance(grammemes, str) and grammemes in peek(self.properties, category, set()):
                 # only one grammeme string given
                 return {grammemes}
         # unrecognized category name or grammeme type input
@@ -1,3 +1,5 @@
+from collections.abc import Iterable
+
 # TODO: consider is this phrases and sentences?
 #   - example: DP instead of having everything attach to exponents
 
@@ -201,10 +203,7 @@ class Sentences:
 
         # expect full entries instead of tying this to dictionary with lookups
         # TODO: high-level sentence methods with lookups from the Language
-        fetched_words = [
-            entry for entry in headwords
-            if isinstance(entry, dict) and set(entry).issuperset({'pos', 'sound', 'definition'}) 
-        ]
+        fetched_words = self.fetch_words(headwords)
 
         # check that headwords match buildable sentence units
         if not isinstance(fetched_words, (list, tuple)):
@@ -213,7 +212,46 @@ class Sentences:
         if len(sentence) != len(fetched_words):
             print(f"Failed to apply sentence - number of headwords does not match fillable sentence units")
             return len(fetched_words)
-        
+
+        return self.build(sentence, translation, fetched_words, spacing=spacing)
+
+    def apply_many(self, name="", rows=None, spacing=" "):
+        """Take a named sentence and many lists of headwords, building and yielding
+        one sentence per list in turn, or None for lists that do not fit. Exponents
+        for each unit are found once and reused for every list."""
+        # check for sentence type in collection
+        sentence = self.get(name)
+        translation = self.get_translation(name)
+        if not sentence or translation is None:
+            print(f"Failed to apply unidentified sentence named {name}")
+            return
+        # expect a sequence or stream of headword lists
+        if isinstance(rows, (str, dict)) or not isinstance(rows, Iterable):
+            print(f"Failed to apply sentence - expected rows of headwords not {rows}")
+            return
+
+        # (unit index, headword word class):attachment plan shared across rows
+        plans = {}
+        for headwords in rows:
+            fetched_words = self.fetch_words(headwords)
+            if len(sentence) != len(fetched_words):
+                print(f"Failed to apply sentence - number of headwords does not match fillable sentence units")
+                yield None
+                continue
+            yield self.build(sentence, translation, fetched_words, spacing=spacing, plans=plans)
+
+    def fetch_words(self, headwords):
+        """Keep headwords given as full entries with word class, sounds and definition"""
+        return [
+            entry for entry in headwords
+            if isinstance(entry, dict) and set(entry).issuperset({'pos', 'sound', 'definition'}) 
+        ]
+
+    def build(self, sentence, translation, fetched_words, spacing=" ", plans=None):
+        """Build units for a sentence structure from headword entries. Pass a plans
+        map to keep and reuse each unit's attachment plan across sentences."""
+        plans = {} if plans is None else plans
+
         # store final built units
         applied_sentence = []
         # peel apart unit-per-unit translation strings and unit reference indexes
@@ -236,15 +274,21 @@ class Sentences:
                 #print(unit)
                 print(f"Failed to apply sentence - word {word_sounds} part of speech {word_pos} does not match expected word class {unit_pos}")
                 return
+            # find exponents for this unit and word class once
+            if (i, word_pos) not in plans:
+                plans[(i, word_pos)] = self.grammar.plan_unit(
+                    properties=unit_properties,
+                    word_classes=word_pos
+                )
+            plan = plans[(i, word_pos)]
+            if plan is None:
+                print(f"Failed to apply sentence - unable to build unit around {word_sounds}")
+                return
             # create grammatical unit with headword and sentence unit properties
-            built_unit = self.grammar.build_unit(
-                word_sounds,
-                properties=unit_properties,
-                word_classes=word_pos
-            )
+            built_unit = self.grammar.attach_plan(word_sounds, plan)
             # add spacing separator and unit to sentence
             len(applied_sentence) > 0 and applied_sentence.append(spacing) 
-            [applied_sentence.append(unit_piece) for unit_piece in built_unit]
+            applied_sentence += built_unit
 
             # Translate the unit
             # step ahead if nothing to translate
@@ -64,10 +64,11 @@ class WordClasses:
         self.word_classes.add(new_word_class)
         
         # switch pos name in all exponents that reference the old name
-        for exponent_details in self.grammar.exponents.get_values():
+        for exponent_id, exponent_details in self.grammar.exponents.get_items():
             if word_class in exponent_details['pos']:
-                exponent_details['pos'].remove(word_class)
-                exponent_details['pos'].add(new_word_class)
+                exponent_pos = self.grammar.exponents.get(exponent_id)['pos']
+                exponent_pos.remove(word_class)
+                exponent_pos.add(new_word_class)
 
         # return the renamed word class details
         return self.word_classes
@@ -82,8 +83,8 @@ class WordClasses:
         self.word_classes.remove(word_class)
 
         # remove part of speech from all exponents that reference it
-        for exponent_details in self.grammar.exponents.get_values():
-            word_class in exponent_details['pos'] and exponent_details['pos'].remove(word_class)
+        for exponent_id, exponent_details in self.grammar.exponents.get_items():
+            word_class in exponent_details['pos'] and self.grammar.exponents.get(exponent_id)['pos'].remove(word_class)
         
         # return deleted part of speech
         return word_class
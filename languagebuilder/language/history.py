@@ -0,0 +1,204 @@
+# Evolve the whole vocabulary through historical stages of sound change
+# - a stage is an ordered batch of rule ids applied at once, like one era of
+#   sound changes, and stages apply one after another in chronological order
+# - stage 0 holds each tracked word's sounds as found in the vocabulary, and
+#   stage n holds the sounds after the first n stages
+# - each stage stores only the words its rules changed, each as a delta from
+#   the word's form in the stage before: (shared prefix length, shared suffix
+#   length, new middle sounds)
+# - running evolves words through the stages they have not yet been through,
+#   so adding stages or vocabulary words only computes what is new, and a
+#   stage whose rules changed is computed again from that stage on
+# - words can be split into shards and evolved in a pool, since each word
+#   evolves on its own
+class History:
+    def __init__(self, language):
+        # reference to language for phonology and vocabulary
+        self.language = language
+
+        # stages as maps of name, rule ids and the rules as last computed
+        self.stages = []
+
+        # tracked words by word index
+        self.keys = []          # (headword, entry index) lookup pairs
+        self.indexes = {}       # map of lookup pair:word index
+        self.origins = []       # tuple of sounds at stage 0
+
+        # map of word index:delta for each computed stage
+        self.deltas = []
+        # forms after the last computed stage, by word index
+        self.latest = []
+
+    def add_stage(self, rule_ids, name=""):
+        """Add a stage of rule ids applied together after all earlier stages"""
+        rule_ids = list(rule_ids)
+        for rule_id in rule_ids:
+            if not self.language.phonology.rules.has(rule_id):
+                print(f"History add_stage failed - invalid rule id {rule_id}")
+                return
+        self.stages.append({
+            'name': name,
+            'rule_ids': rule_ids,
+            'rules': None
+        })
+        return len(self.stages)
+
+    def remove_stage(self, stage):
+        """Remove a stage, recomputing later stages on the next run"""
+        if not 1 <= stage <= len(self.stages):
+            print(f"History remove_stage failed - invalid stage {stage}")
+            return
+        self.reset(stage)
+        return self.stages.pop(stage - 1)
+
+    def read_rules(self, stage):
+        """Copy a stage's rules to tell if they changed since it was computed"""
+        rules = self.language.phonology.rules
+        return [repr(rules.get(rule_id)) for rule_id in self.stages[stage - 1]['rule_ids']]
+
+    def reset(self, stage=1):
+        """Forget forms from a stage on, rebuilding them on the next run"""
+        stage = max(1, stage)
+        if stage > len(self.deltas):
+            return
+        self.latest = [list(self.form_at(i, stage - 1)) for i in range(len(self.keys))]
+        del self.deltas[stage - 1:]
+
+    def track(self):
+        """Start tracking vocabulary entries not yet tracked"""
+        new_indexes = []
+        for headword, entries in self.language.vocabulary.vocabulary.items():
+            for entry_index, entry in enumerate(entries):
+                if not entry or (headword, entry_index) in self.indexes:
+                    continue
+                self.indexes[(headword, entry_index)] = len(self.keys)
+                new_indexes.append(len(self.keys))
+                self.keys.append((headword, entry_index))
+                self.origins.append(tuple(entry['sound']))
+                self.latest.append(list(entry['sound']))
+        return new_indexes
+
+    def run(self, executor=None, shards=1):
+        """Evolve tracked words and new vocabulary words through every stage not
+        yet computed for them, optionally in shards on a concurrent.futures executor.
+        Returns the number of stages computed."""
+        # recompute from the first stage whose rules changed
+        for stage in range(1, len(self.deltas) + 1):
+            if self.stages[stage - 1]['rules'] != self.read_rules(stage):
+                self.reset(stage)
+                break
+
+        # bring new words up to the computed stages, then everyone through the rest
+        new_indexes = self.track()
+        done = len(self.deltas)
+        if new_indexes and done:
+            self.evolve(new_indexes, 1, done, executor, shards)
+        if done < len(self.stages):
+            self.deltas += [{} for _ in range(done, len(self.stages))]
+            self.evolve(list(range(len(self.keys))), done + 1, len(self.stages), executor, shards)
+        for stage in range(done + 1, len(self.stages) + 1):
+            self.stages[stage - 1]['rules'] = self.read_rules(stage)
+        return len(self.stages) - done
+
+    def evolve(self, indexes, first_stage, last_stage, executor=None, shards=1):
+        """Run words through a range of stages, storing deltas and latest forms"""
+        stage_rule_ids = [self.stages[stage - 1]['rule_ids'] for stage in range(first_stage, last_stage + 1)]
+        words = [self.latest[i] for i in indexes]
+        if executor is None or shards < 2:
+            results = [evolve_shard(self.language.phonology, words, stage_rule_ids)]
+            shard_indexes = [indexes]
+        else:
+            size = -(-len(words) // shards)
+            shard_indexes = [indexes[i:i + size] for i in range(0, len(words), size)]
+            futures = [
+                executor.submit(evolve_shard, self.language.phonology, words[i:i + size], stage_rule_ids)
+                for i in range(0, len(words), size)
+            ]
+            results = [future.result() for future in futures]
+
+        for shard, (stage_deltas, forms) in zip(shard_indexes, results):
+            for stage_offset, deltas in enumerate(stage_deltas):
+                stage_map = self.deltas[first_stage - 1 + stage_offset]
+                for local_index, delta in deltas.items():
+                    stage_map[shard[local_index]] = delta
+            for local_index, form in enumerate(forms):
+                self.latest[shard[local_index]] = form
+
+    def form_at(self, word_index, stage):
+        """Rebuild one word's sounds at a stage from its origin and deltas"""
+        form = self.origins[word_index]
+        for deltas in self.deltas[:stage]:
+            delta = deltas.get(word_index)
+            if delta:
+                form = decode_delta(form, delta)
+        return form
+
+    def form(self, headword, entry_index=0, stage=None):
+        """Read a word's sounds at a stage, by default the last computed stage"""
+        word_index = self.indexes.get((headword, entry_index))
+        if word_index is None:
+            print(f"History form failed - untracked entry {headword},{entry_index}")
+            return
+        stage = len(self.deltas) if stage is None else stage
+        if not 0 <= stage <= len(self.deltas):
+            print(f"History form failed - stage {stage} not computed")
+            return
+        return list(self.form_at(word_index, stage))
+
+    def forms(self, stage=None):
+        """Read every tracked word's sounds at a stage as a map of lookup pair:sounds"""
+        stage = len(self.deltas) if stage is None else stage
+        if not 0 <= stage <= len(self.deltas):
+            print(f"History forms failed - stage {stage} not computed")
+            return
+        if stage == len(self.deltas):
+            return {key: list(form) for key, form in zip(self.keys, self.latest)}
+        return {key: list(self.form_at(i, stage)) for i, key in enumerate(self.keys)}
+
+    def timeline(self, headword, entry_index=0):
+        """List a word's sounds at every computed stage, starting from stage 0"""
+        word_index = self.indexes.get((headword, entry_index))
+        if word_index is None:
+            print(f"History timeline failed - untracked entry {headword},{entry_index}")
+            return
+        forms = [self.origins[word_index]]
+        for deltas in self.deltas:
+            delta = deltas.get(word_index)
+            forms.append(decode_delta(forms[-1], delta) if delta else forms[-1])
+        return [list(form) for form in forms]
+
+def encode_delta(old, new):
+    """Describe a new form as (shared prefix length, shared suffix length, middle
+    sounds) against an old form, or None if unchanged"""
+    if old == new:
+        return
+    limit = min(len(old), len(new))
+    prefix = 0
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    return (prefix, suffix, tuple(new[prefix:len(new) - suffix]))
+
+def decode_delta(old, delta):
+    """Rebuild a form from the old form and a delta"""
+    prefix, suffix, middle = delta
+    return tuple(old[:prefix]) + middle + tuple(old[len(old) - suffix:])
+
+def evolve_shard(phonology, words, stage_rule_ids):
+    """Apply each stage's rules to words in turn, returning a map of word
+    index:delta per stage and the final forms. Kept at module level so process
+    pools can send it to workers."""
+    stage_deltas = []
+    for rule_ids in stage_rule_ids:
+        changed = phonology.apply_rules_many(words, rule_ids=rule_ids) if words else []
+        stage_deltas.append({
+            i: delta for i, delta in enumerate(
+                encode_delta(tuple(word), tuple(changed_word))
+                for word, changed_word in zip(words, changed)
+            )
+            if delta
+        })
+        words = changed
+    return stage_deltas, words
@@ -5,6 +5,14 @@ from ..reference.vocabulary import Vocabulary
 from ..reference.summary import Summary
 from ..reference.corpus import Corpus
 from .paradigms import Paradigms
+from .ngrams import NGrams
+from .similarity import Similarity
+from .history import History
+from ..tools.overlay import Overlay, CollectionOverlay
+from ..tools.profiler import Profiler
+from collections.abc import Iterable
+import contextlib
+import copy
 import random
 
 # TODO: main LanguageBuilder class
@@ -99,6 +107,15 @@ class Language:
         self.syllables_max = 1
         # grammatical paradigms based on dictionary entries
         self.paradigms = Paradigms(self)
+        # sound n-gram model trained on vocabulary words as they are added
+        self.ngrams = NGrams(self)
+        # phonetic distance index over vocabulary sounds
+        self.similarity = Similarity(self)
+        # vocabulary forms through staged historical sound changes
+        self.history = History(self)
+        # language this one was forked from and languages forked from this one
+        self.parent = None
+        self.daughters = []
 
         # stored special symbols to avoid hardcoding
         # TODO: pass these down to Phonology, Grammar
@@ -116,6 +133,98 @@ class Language:
             'display_name': self.display_name
         }
 
+    def fork(self, name, display_name=""):
+        """Create a daughter language sharing this language's phonetics and reading
+        its phonemes, grammar, vocabulary and corpus through copy-on-write overlays,
+        so the daughter only stores what it changes. Changes made here after forking
+        show through wherever the daughter has not made its own, except for new
+        exponents and corpus examples, and the daughter's phoneme and vocabulary
+        versions count them so its caches rebuild. Rules and syllables are copied,
+        since the daughter keeps its own order for them, and so are n-gram counts,
+        since they are keyed by sound ids each language assigns on its own."""
+        # objects the deep copy maps to shared or layered replacements
+        memo = {
+            id(self.phonetics): self.phonetics,
+            id(self.parent): self.parent,
+            id(self.daughters): [],
+            id(self.similarity): None,
+            id(self.history): None,
+            id(self.ngrams.probabilities): {},
+            id(self.ngrams.word_spaces): {},
+        }
+        # components layered over their own parents keep those links
+        for versioned in (self.phonology.phonemes, self.vocabulary):
+            if versioned.parent is not None:
+                memo[id(versioned.parent)] = versioned.parent
+        for shared_map in (
+            self.phonology.phonemes.phonemes,
+            self.grammar.properties.properties,
+            self.vocabulary.vocabulary
+        ):
+            memo[id(shared_map)] = Overlay(shared_map)
+        for shared_collection in (self.grammar.exponents.exponents, self.corpus.corpus):
+            memo[id(shared_collection)] = CollectionOverlay(shared_collection)
+        daughter = copy.deepcopy(self, memo)
+
+        # version counters read through to the layered parent components, so
+        # caches copied from the parent stay valid until either side changes
+        for versioned, parent_versioned in (
+            (daughter.phonology.phonemes, self.phonology.phonemes),
+            (daughter.vocabulary, self.vocabulary)
+        ):
+            versioned.parent = parent_versioned
+            versioned.own_version = 0
+
+        # rule epochs and indexes of the daughter's own
+        daughter.similarity = Similarity(daughter)
+        daughter.history = History(daughter)
+        daughter.parent = self
+        daughter.name = name
+        daughter.display_name = display_name
+        self.daughters.append(daughter)
+        return daughter
+
+    @contextlib.contextmanager
+    def profile(self, profiler=None):
+        """Count calls and time spent in hot paths while inside the with block,
+        yielding the profiler. Pass a profiler to add to its existing counts."""
+        profiler = Profiler() if profiler is None else profiler
+        enabled = profiler.enable(self)
+        try:
+            yield profiler
+        finally:
+            enabled and profiler.disable()
+
+    def descendants(self):
+        """List every language forked from this one, each daughter before its own daughters"""
+        languages = []
+        for daughter in self.daughters:
+            languages.append(daughter)
+            languages += daughter.descendants()
+        return languages
+
+    def evolve_family(self, executor=None):
+        """Apply every descendant's rules to this language's vocabulary sounds,
+        optionally one descendant per task on a concurrent.futures executor.
+        Returns a map of descendant name:{lookup pair:sounds}."""
+        keys = []
+        words = []
+        for headword, entries in self.vocabulary.vocabulary.items():
+            for entry_index, entry in enumerate(entries):
+                if entry:
+                    keys.append((headword, entry_index))
+                    words.append(entry['sound'])
+        descendants = self.descendants()
+        if executor is None:
+            results = [evolve_branch(descendant.phonology, words) for descendant in descendants]
+        else:
+            futures = [executor.submit(evolve_branch, descendant.phonology, words) for descendant in descendants]
+            results = [future.result() for future in futures]
+        return {
+            descendant.name: dict(zip(keys, forms))
+            for descendant, forms in zip(descendants, results)
+        }
+
     # TODO: send built sounds back up here to store them in dictionary
     #   - otherwise must pass language/dictionary down to phonology to store
 
@@ -139,27 +248,64 @@ class Language:
             return
         return length
 
+    def build_ngram_word(self, length=None, spell_after_change=True, midpoint=None):
+        """Build a word entry like Phonology.build_word but with sounds sampled from
+        the n-gram model trained on the vocabulary"""
+        sounds = self.ngrams.sample(length)
+        if not sounds:
+            print(f"Language build_ngram_word failed - unable to sample a word of length {length}")
+            return
+        changed_sounds = self.phonology.apply_rules(sounds)
+        # count the sounds in syllables before the midpoint syllable
+        midpoint_sound_count = None
+        if midpoint:
+            syllables = self.phonology.syllables.syllabify(sounds)
+            midpoint_sound_count = sum(len(syllable) for syllable in syllables[:midpoint])
+        return {
+            'spelling': self.phonology.spell(changed_sounds, sounds) if spell_after_change else self.phonology.spell(sounds),
+            'sound': sounds,
+            'change': changed_sounds,
+            'midpoint': midpoint_sound_count
+        }
+
     # TODO: adjust midpoint for infixes like fi-n-dere
-    def create_base(self, length=None, definition="", spell_after_change=True, midpoint=None, word_class=None):
+    def create_base(self, length=None, definition="", spell_after_change=True, midpoint=None, word_class=None, ngrams=False, min_distance=None, max_attempts=100):
         """Generate a base word in the language and store it in the vocabulary,
-        returning the headword lookup pair for its vocabulary entry."""
+        returning the headword lookup pair for its vocabulary entry. Optionally
+        sample sounds resembling existing words from the n-gram model, or keep
+        sounds at least min_distance (see Similarity) from every existing word."""
         length = self.decide_length(length)
         
-        # generate a base word entry
-        word = self.phonology.build_word(
-            length=length,
-            spell_after_change=spell_after_change,
-            # build_word calculates target infix break in base word
-            # NOTE: reads input as syllables count, changes to sound count
-            midpoint=midpoint
-        )
+        # generate a base word entry, rebuilding words that sound too close
+        for _ in range(max_attempts if min_distance else 1):
+            if ngrams:
+                word = self.build_ngram_word(
+                    length=length,
+                    spell_after_change=spell_after_change,
+                    midpoint=midpoint
+                )
+                if not word:
+                    return
+            else:
+                word = self.phonology.build_word(
+                    length=length,
+                    spell_after_change=spell_after_change,
+                    # build_word calculates target infix break in base word
+                    # NOTE: reads input as syllables count, changes to sound count
+                    midpoint=midpoint
+                )
+            if not min_distance or self.similarity.is_distinct(word['sound'], min_distance):
+                break
+        else:
+            print(f"Language generate failed - no word found at least {min_distance} from existing words in {max_attempts} attempts")
+            return
         # check supplied part of speech
         if word_class and not self.grammar.word_classes.get(word_class):
             print(f"Language generate failed - invalid word class {word_class}")
             return
         
         # store created word or word piece and return lookup info
-        return self.vocabulary.add(
+        entry = self.vocabulary.add(
             sound=word['sound'],
             change=word['change'],
             spelling=word['spelling'],
@@ -168,14 +314,90 @@ class Language:
             midpoint=word['midpoint'],
             pos=word_class
         )
+        # keep the n-gram model and similarity index current with the vocabulary
+        if entry:
+            self.ngrams.train(word['sound'])
+            self.similarity.add(word['sound'], entry)
+        return entry
+
+    def import_words(self, words, word_class=None, spell_after_change=False):
+        """Store hand-made or external words given as spellings or (spelling,
+        definition) pairs, reading their sounds back from the spelling. Returns
+        headword lookup pairs, with None for words whose letters are unknown.
+        Optionally respell each word from its sounds after sound changes."""
+        words = [(word, "") if isinstance(word, str) else tuple(word) for word in words]
+        parses = [self.phonology.transcribe(spelling, max_parses=1) for spelling, _ in words]
+        sounds = [parse[0]['sound'] for parse in parses if parse]
+        changes = iter(self.phonology.apply_rules_many(sounds) if sounds else [])
+        syllabifications = iter(self.phonology.syllables.syllabify_many(sounds))
+
+        entries = []
+        for (spelling, definition), parse in zip(words, parses):
+            if not parse:
+                print(f"Language import_words failed to read sounds for unknown letters in {spelling}")
+                entries.append(None)
+                continue
+            word_sounds = parse[0]['sound']
+            change = next(changes)
+            entry = self.vocabulary.add(
+                sound=word_sounds,
+                change=change,
+                spelling=self.phonology.spell(change, word_sounds) if spell_after_change else parse[0]['spelling'],
+                syllables=next(syllabifications),
+                definition=(definition or "").strip(),
+                pos=word_class
+            )
+            if entry:
+                self.ngrams.train(word_sounds)
+                self.similarity.add(word_sounds, entry)
+            entries.append(entry)
+        return entries
 
     def set_midpoint(self, headword, entry_index, midpoint=0):
         """Change the split/infix midpoint for an existing vocabulary word"""
-        vocabulary_entry = self.vocabulary.lookup(headword, entry_index)
+        if not self.vocabulary.is_entry(headword, entry_index):
+            print(f"Language set_midpoint failed - invalid entry {headword},{entry_index}")
+            return
+        vocabulary_entry = self.vocabulary.vocabulary[headword][entry_index]
         vocabulary_entry['midpoint'] = midpoint
-        self.vocabulary.vocabulary[headword][entry_index] = vocabulary_entry
         return vocabulary_entry
 
+    def resyllabify(self, executor=None):
+        """Syllabify every vocabulary entry again, such as after syllables change,
+        optionally splitting chunks of entries in a concurrent.futures executor.
+        Entries that no longer split into syllables keep no syllables."""
+        keys = []
+        sounds = []
+        for headword, entries in self.vocabulary.vocabulary.items():
+            for entry_index, entry in enumerate(entries):
+                if entry:
+                    keys.append((headword, entry_index))
+                    sounds.append(entry['sound'])
+        syllabifications = self.phonology.syllables.syllabify_many(
+            sounds,
+            offsets=True,
+            executor=executor
+        )
+        for (headword, entry_index), offsets in zip(keys, syllabifications):
+            self.vocabulary.resyllabify(headword, entry_index, offsets)
+        return len(keys)
+
+    def count_beats(self, changed=True):
+        """Count moraic beats for every vocabulary entry, reading changed sounds
+        (where stored) or optionally the underlying sounds, as a map of headword:[beats]"""
+        vocabulary = list(self.vocabulary.vocabulary.items())
+        counts = self.phonology.morae.count_many(
+            (changed and entry['change']) or entry['sound']
+            for _, entries in vocabulary
+            for entry in entries
+        )
+        beats = {}
+        i = 0
+        for headword, entries in vocabulary:
+            beats[headword] = counts[i:i + len(entries)]
+            i += len(entries)
+        return beats
+
     # TODO: send built grammar back up here to cache in a history
     def create_grammar(self, length=None, definition="", pre=False, mid=False, post=False, bound=True, properties=None, word_class=None):
         """Generate a grammatical exponent, returning the grammatical summary of the
@@ -211,14 +433,14 @@ class Language:
         # NOTE: only base words stored in vocabulary; exponents can be summarized
         return self.summary.summarize_exponent(exponent_id)
 
-    def generate(self, length=None, definition="", spell_after_change=True, midpoint=None, pre=False, mid=False, post=False, bound=True, properties=None, word_class=None):
+    def generate(self, length=None, definition="", spell_after_change=True, midpoint=None, pre=False, mid=False, post=False, bound=True, properties=None, word_class=None, ngrams=False, min_distance=None):
         """Create a word or grammatical piece that follows the phonology and grammar"""        
         # generate grammatical word
         if pre or mid or post:
             return self.create_grammar(length, definition, pre, mid, post, bound, properties, word_class)
         # generate base word
         else:
-            return self.create_base(length, definition, spell_after_change, midpoint, word_class)
+            return self.create_base(length, definition, spell_after_change, midpoint, word_class, ngrams, min_distance)
 
     # TODO: link grammaticalized vocabulary items to associated grammatical exponent
     def grammaticalize(self, entry_headword, entry_index, pre=False, mid=False, post=False, bound=False, properties="", word_classes=""):
@@ -263,77 +485,102 @@ class Language:
             self.vocabulary.lookup(*headword)
             for headword in headwords
         ]
-        built_sentence = self.sentences.apply(name, bases)
-        sentence = {
+        built_sentence = self.sentences.apply(name, bases, spacing=self.spacing_symbol)
+        return self.change_sentence(built_sentence)
+
+    def apply_sentences(self, name, rows):
+        """Build a named sentence for many lists of headword lookup pairs, yielding
+        each built sentence with changed sounds in turn, or None for lists that
+        do not fit the sentence"""
+        if isinstance(rows, (str, dict)) or not isinstance(rows, Iterable):
+            print(f"Language apply_sentences failed - expected rows of headword lookup pairs not {rows}")
+            return
+        bases = (
+            [self.vocabulary.lookup(*headword) for headword in headwords]
+            for headwords in rows
+        )
+        for built_sentence in self.sentences.apply_many(name, bases, spacing=self.spacing_symbol):
+            yield self.change_sentence(built_sentence)
+
+    def change_sentence(self, built_sentence):
+        """Apply sound changes to a sentence built by Sentences"""
+        if not isinstance(built_sentence, dict):
+            return
+        return {
             'sound': built_sentence['sound'],
-            'change': self.change_sounds(built_sentence),
-            'definition': built_sentence['definition']
+            'change': self.change_sounds(built_sentence['sound'], spacing=self.spacing_symbol),
+            'translation': built_sentence['translation']
         }
-        return sentence
-
-    # TODO: three levels of spreading change / blocking changes
-    #   - change within morphs only
-    #       - currently needs to be done from within Sentences.apply
-    #       - requires accessing 'change' value from within Grammar.build_unit
-    #   - change within words
-    #   - change within sentence
-    def change_sounds(self, sounds, blocked_by_spacing=True, spacing=" "):
+
+    # Spreading and blocking sound changes
+    #   - change within morphs: morphs end at given boundary offsets and at spacing
+    #   - change within words: words end at spacing
+    #   - change within sentence: changes spread across spacing
+    def change_sounds(self, sounds, blocked_by_spacing=True, spacing=" ", scope=None, boundaries=None):
         """Run a sound change on a list of ipa symbols representing a string
         of sounds in the language. Originally built to change built sentences.
         Pass in spacing to recognize word boundaries. Have spacing block
-        changes from spreading beyond words."""
-        
-        # break ipa list into sublists for each word
-        grouped_words = [[],]
-        for symbol in sounds:
-            # split into a new list at spacing
+        changes from spreading beyond words, or pass a scope of "morph", "word"
+        or "sentence" to keep changes within morphs, within words or let them
+        spread across the sentence. Morphs end at spacing and at boundaries,
+        a collection of offsets in sounds where a new morph starts."""
+        scope = scope if scope else ("word" if blocked_by_spacing else "sentence")
+        if scope not in ("morph", "word", "sentence"):
+            print(f"Language change_sounds failed - unknown scope {scope}")
+            return
+        breaks = set(boundaries) if scope == "morph" and boundaries else set()
+
+        # break ipa list into runs of sounds in one pass, noting which runs
+        # start a new word after spacing
+        # NOTE: empty words are dropped, so repeated spacing collapses
+        segments = []
+        spaced = []
+        segment = []
+        after_spacing = False
+        for i, symbol in enumerate(sounds):
             if symbol == spacing:
-                grouped_words.append([])
-            # add character to end of latest split list
-            else:
-                last_i = len(grouped_words) - 1
-                grouped_words[last_i].append(symbol)
-            
-        # get rid of empty lists
-        grouped_words = list(filter(lambda x: x, grouped_words))
-
-        # Change sounds for each grouped word
-        # spread sound change up to word boundary
-        if blocked_by_spacing:
-            # change each word
-            changed_sounds = [self.phonology.apply_rules(word) for word in grouped_words]
-            # flatten the list and add spacing between words
-            changed_sounds = [
-                sound for word in changed_sounds
-                for sound in word + [spacing]
-            ][:-1]  # trim final added spacing
-        # spread sound change across entire structure
+                after_spacing = True
+            if segment and (symbol == spacing or i in breaks):
+                segments.append(segment)
+                segment = []
+            if symbol == spacing:
+                continue
+            if not segment:
+                spaced.append(after_spacing and bool(segments))
+                after_spacing = False
+            segment.append(symbol)
+        if segment:
+            segments.append(segment)
+        if not segments:
+            return []
+
+        # change each morph or word on its own
+        if scope != "sentence":
+            changed_segments = self.phonology.apply_rules_many(segments)
+        # change the unspaced sentence, then split it at the running offset of each
+        # word since rules change sounds one for one without moving word boundaries
         else:
-            # TODO: verify that length and order are left unchanged
-            changed_sounds = grouped_words
-            # flatten list, change, then restructure back following original list
-            sounds_to_change = [sound for word in grouped_words for sound in word]
-            unspaced_change = self.phonology.apply_rules(sounds_to_change)
-
-            # separate changed sounds into words following the original words list
-            changed_sounds = []
-            for i, word in enumerate(grouped_words):
-                # add spacer before words except the first word
-                if changed_sounds:
-                    changed_sounds.append(spacing)
-                # find the start and end index of each word
-                changed_start = len(grouped_words[i - 1]) if i > 0 else 0
-                changed_end = len(word) + changed_start
-                # add the changed sounds for this word
-                changed_sounds += unspaced_change[changed_start:changed_end]
-        
+            changed_sentence = self.phonology.apply_rules_many([
+                [symbol for segment in segments for symbol in segment]
+            ])[0]
+            changed_segments = []
+            offset = 0
+            for segment in segments:
+                changed_segments.append(changed_sentence[offset:offset + len(segment)])
+                offset += len(segment)
+
         # flat list of sound symbols with words separated by spacing
+        changed_sounds = []
+        for segment, is_spaced in zip(changed_segments, spaced):
+            if is_spaced:
+                changed_sounds.append(spacing)
+            changed_sounds += segment
         return changed_sounds
 
     def translate(self, definition, properties="", word_class=""):
         """Attempt to render a single base plus grammatical properties
         in the target language"""
-        words = self.vocabulary.search(definition)
+        words = self.vocabulary.search(keywords=definition)
         if not words:
             print(f"Language failed to translate - no word for {definition}")
             return
@@ -344,9 +591,10 @@ class Language:
             word_classes=word_class
         )
 
-    def attach(self, base="", entry_index=None, definition="", properties=None, word_classes=None, lookup=True, spell_after_change=True, blocked_by_spacing=True):
+    def attach(self, base="", entry_index=None, definition="", properties=None, word_classes=None, lookup=True, spell_after_change=True, blocked_by_spacing=True, scope=None):
         """Attach grammatical pieces around a base headword. Look up the base in the
-        language's dictionary and use added exponents from the language's grammar."""
+        language's dictionary and use added exponents from the language's grammar.
+        Pass a scope to keep sound changes within morphs or words (see change_sounds)."""
         # - iterate through grammar for that part of speech
         # - produce a unit
         # - or produce a table of all possible forms
@@ -374,18 +622,25 @@ class Language:
         
         # build grammatical unit with underlying sounds
         unit = {}
-        unit['sound'] = self.grammar.build_unit(
+        built_unit = self.grammar.build_unit(
             base_sounds,
             properties=vetted_properties,
             word_classes=vetted_word_classes,
             spacing=self.spacing_symbol,
-            midpoint=midpoint
+            midpoint=midpoint,
+            boundaries=True
         )
+        if not built_unit:
+            print(f"Language attach failed to build a unit around base {base_sounds}")
+            return
+        unit['sound'], boundaries = built_unit
         # compute changed sounds
         unit['change'] = self.change_sounds(
             unit['sound'],
             blocked_by_spacing=blocked_by_spacing,
-            spacing=self.spacing_symbol
+            spacing=self.spacing_symbol,
+            scope=scope,
+            boundaries=boundaries
         )
 
         # obtain and store spelling
@@ -432,3 +687,8 @@ class Language:
     #   - for grammar rely on Summary instead
     #   - should results of sound changes really be stored? or refs to the rules?
     #   - should separate spellings be stored for changes? or flag for spelling before/after change?
+
+def evolve_branch(phonology, words):
+    """Apply all of a phonology's rules to words. Kept at module level so
+    process pools can send it to workers."""
+    return phonology.apply_rules_many(words) if words else []
@@ -0,0 +1,164 @@
+import random
+
+# sound n-gram model trained on the language's words
+#   - sounds are stored as small integer ids, with id 0 marking word edges
+#   - counts map a context of up to order - 1 preceding ids to follower counts
+#   - probabilities interpolate each context with its shorter contexts
+#     (Witten-Bell), bottoming out in add-one counts of single sounds
+#   - sampling steps through the phonology's word space alongside the model,
+#     so only sounds that can still complete a valid word are ever chosen
+#   - training adds counts for one word at a time, so words can be added
+#     as the vocabulary grows
+class NGrams:
+    def __init__(self, language, order=3):
+        # reference to language for phonology and vocabulary
+        self.language = language
+        if order < 1:
+            raise ValueError(f"NGrams expected an order of at least 1 not {order}")
+        self.order = order
+
+        # interned sounds
+        self.ids = {}           # map of ipa:id
+        self.symbols = [None]   # list of ipa by id, id 0 is the word edge
+
+        # counts of context:{id:count} and context:total
+        self.counts = {}
+        self.totals = {}
+
+        # context:[probability by id] memoized until the next training
+        self.probabilities = {}
+
+        # length:(word space, word state:[(id, next word state)]) for sampling,
+        # kept until syllables, phonemes or phonetics change
+        self.word_spaces = {}
+        self.word_spaces_version = None
+
+    def intern(self, symbol):
+        """Read or assign the id representing a sound"""
+        symbol_id = self.ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = len(self.symbols)
+            self.ids[symbol] = symbol_id
+            self.symbols.append(symbol)
+            # memoized probabilities do not cover the new id
+            self.probabilities.clear()
+        return symbol_id
+
+    def train(self, sounds):
+        """Count every context and following sound in one sound sequence"""
+        if not sounds:
+            return
+        ids = [0] * (self.order - 1) + [self.intern(sound) for sound in sounds] + [0]
+        for i in range(self.order - 1, len(ids)):
+            for context_length in range(self.order):
+                context = tuple(ids[i - context_length:i])
+                followers = self.counts.setdefault(context, {})
+                followers[ids[i]] = followers.get(ids[i], 0) + 1
+                self.totals[context] = self.totals.get(context, 0) + 1
+        self.probabilities.clear()
+
+    def train_many(self, words):
+        """Count contexts in many sound sequences, such as an imported word list"""
+        for sounds in words:
+            self.train(sounds)
+
+    def retrain(self):
+        """Rebuild counts from every word in the language's vocabulary"""
+        self.counts.clear()
+        self.totals.clear()
+        self.probabilities.clear()
+        self.train_many(
+            entry['sound']
+            for entries in self.language.vocabulary.vocabulary.values()
+            for entry in entries
+        )
+
+    def get_probabilities(self, context):
+        """Compute the chance of each sound id following a context"""
+        if context in self.probabilities:
+            return self.probabilities[context]
+
+        followers = self.counts.get(context, {})
+        total = self.totals.get(context, 0)
+        # single sounds with add-one smoothing across every known id
+        if not context:
+            probabilities = [
+                (followers.get(symbol_id, 0) + 1) / (total + len(self.symbols))
+                for symbol_id in range(len(self.symbols))
+            ]
+        # interpolate seen followers with the shorter context
+        else:
+            shorter = self.get_probabilities(context[1:])
+            if not total:
+                probabilities = shorter
+            else:
+                types = len(followers)
+                probabilities = [
+                    (followers.get(symbol_id, 0) + types * probability) / (total + types)
+                    for symbol_id, probability in enumerate(shorter)
+                ]
+
+        self.probabilities[context] = probabilities
+        return probabilities
+
+    def read_word_space(self, length):
+        """Read the word space and its table of word state choices for a syllable
+        count or range, built once until the phonology changes"""
+        phonology = self.language.phonology
+        versions = (phonology.syllables.version, phonology.phonemes.version, phonology.phonetics.version)
+        if self.word_spaces_version != versions:
+            self.word_spaces.clear()
+            self.word_spaces_version = versions
+        key = tuple(length) if isinstance(length, list) else length
+        if key not in self.word_spaces:
+            word_space = phonology.word_space(length)
+            for symbol in word_space.symbols:
+                self.intern(symbol)
+            self.word_spaces[key] = (word_space, {})
+        return self.word_spaces[key]
+
+    def sample_many(self, count=1, length=None):
+        """Sample sound sequences with a syllable count or (min, max) range, by
+        default the language's range, that the phonology can build"""
+        if length is None:
+            length = (self.language.syllables_min, self.language.syllables_max)
+        word_space, choices = self.read_word_space(length)
+        if not word_space.count():
+            print(f"NGrams sample failed - the phonology cannot build words of length {length}")
+            return []
+
+        def read_choices(state):
+            if state not in choices:
+                choices[state] = [
+                    (self.ids[symbol], next_state)
+                    for symbol, next_state in (
+                        (symbol, word_space.step_symbol(state, symbol))
+                        for symbol in word_space.symbols
+                    )
+                    if next_state and word_space.count_from(next_state)
+                ]
+                if word_space.is_word(state):
+                    choices[state].append((0, None))
+            return choices[state]
+
+        words = []
+        for _ in range(count):
+            ids = [0] * (self.order - 1)
+            state = word_space.start
+            while True:
+                probabilities = self.get_probabilities(tuple(ids[len(ids) - self.order + 1:]) if self.order > 1 else ())
+                state_choices = read_choices(state)
+                symbol_id, state = random.choices(
+                    state_choices,
+                    weights=[probabilities[symbol_id] for symbol_id, _ in state_choices]
+                )[0]
+                if not symbol_id:
+                    break
+                ids.append(symbol_id)
+            words.append([self.symbols[symbol_id] for symbol_id in ids[self.order - 1:]])
+        return words
+
+    def sample(self, length=None):
+        """Sample one sound sequence the phonology can build"""
+        words = self.sample_many(1, length)
+        return words[0] if words else None
@@ -0,0 +1,187 @@
+import heapq
+
+# margin for rounding when skipping branches by distance
+slack = 1e-6
+
+# Phonetic similarity between sound sequences and an index of vocabulary sounds
+# - distance is an edit distance where adding or dropping a sound costs 1 and
+#   swapping one sound for another costs the share of their features they do
+#   not have in common (0 for the same features, 1 for no features in common)
+# - with these costs the distance is a metric, so a BK-tree can skip whole
+#   branches: every sound sequence below a node sits at a known distance from
+#   the node's sounds, and by the triangle inequality only branches with
+#   distances near the query's distance to the node can hold close matches
+# - the tree holds each distinct sound sequence once, with the vocabulary
+#   lookup pairs sharing those sounds
+# - the tree is built from the vocabulary on first search, grows as the
+#   language adds words and is rebuilt when phonetics change or when the
+#   vocabulary changes in any other way (such as removed entries shifting
+#   the entry indexes after them)
+class Similarity:
+    def __init__(self, language):
+        # reference to language for phonetics and vocabulary
+        self.language = language
+
+        # BK-tree nodes as parallel lists by node index, node 0 is the root
+        self.sounds = []        # tuple of sounds at each node
+        self.children = []      # map of distance:child node index
+        self.entries = []       # list of (headword, entry index) sharing the sounds
+        self.nodes = {}         # map of sounds tuple:node index
+
+        # phonetics version the tree and costs were built with, None if unbuilt
+        self.version = None
+        # vocabulary version the tree holds entries from
+        self.vocabulary_version = None
+        # (sound, sound):substitution cost
+        self.costs = {}
+
+    def substitution_cost(self, sound_a, sound_b):
+        """Measure how different two sounds are from 0 to 1 by their features"""
+        if sound_a == sound_b:
+            return 0
+        key = (sound_a, sound_b) if sound_a < sound_b else (sound_b, sound_a)
+        if key not in self.costs:
+            phonetics = self.language.phonetics
+            features_a = set(phonetics.get_features(sound_a)) if phonetics.has_ipa(sound_a) else set()
+            features_b = set(phonetics.get_features(sound_b)) if phonetics.has_ipa(sound_b) else set()
+            features = features_a | features_b
+            self.costs[key] = 1 - len(features_a & features_b) / len(features) if features else 1
+        return self.costs[key]
+
+    def distance(self, sounds_a, sounds_b):
+        """Measure the feature-weighted edit distance between two sound sequences,
+        rounded so that equal distances summed in different orders compare equal"""
+        if len(sounds_a) < len(sounds_b):
+            sounds_a, sounds_b = sounds_b, sounds_a
+        previous = list(range(len(sounds_b) + 1))
+        for i, sound_a in enumerate(sounds_a, 1):
+            current = [i]
+            for j, sound_b in enumerate(sounds_b, 1):
+                current.append(min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + self.substitution_cost(sound_a, sound_b)
+                ))
+            previous = current
+        return round(previous[-1], 9)
+
+    def clear(self):
+        """Forget all indexed sounds"""
+        self.sounds = []
+        self.children = []
+        self.entries = []
+        self.nodes = {}
+        self.costs = {}
+        self.version = None
+        self.vocabulary_version = None
+
+    def rebuild(self):
+        """Index every vocabulary entry's sounds again"""
+        self.clear()
+        self.version = self.language.phonetics.version
+        self.vocabulary_version = self.language.vocabulary.version
+        for headword, entries in self.language.vocabulary.vocabulary.items():
+            for entry_index, entry in enumerate(entries):
+                if entry:
+                    self.insert(entry['sound'], (headword, entry_index))
+
+    def refresh(self):
+        """Build the index if unbuilt or built with outdated phonetics or vocabulary"""
+        if self.version != self.language.phonetics.version or self.vocabulary_version != self.language.vocabulary.version:
+            self.rebuild()
+
+    def insert(self, sounds, entry):
+        """Place sounds in the tree under the node at each distance until a free slot"""
+        sounds = tuple(sounds)
+        if sounds in self.nodes:
+            self.entries[self.nodes[sounds]].append(entry)
+            return
+        new_node = len(self.sounds)
+        self.sounds.append(sounds)
+        self.children.append({})
+        self.entries.append([entry])
+        self.nodes[sounds] = new_node
+        if not new_node:
+            return
+        node = 0
+        while True:
+            distance = self.distance(sounds, self.sounds[node])
+            if distance not in self.children[node]:
+                self.children[node][distance] = new_node
+                return
+            node = self.children[node][distance]
+
+    def add(self, sounds, entry):
+        """Index the sounds of a vocabulary entry just added after the index was
+        built, leaving the index to be rebuilt if anything else changed since"""
+        if (
+            self.version is not None
+            and self.version == self.language.phonetics.version
+            and self.vocabulary_version == self.language.vocabulary.version - 1
+        ):
+            self.insert(sounds, entry)
+            self.vocabulary_version = self.language.vocabulary.version
+
+    def is_current(self, sounds, entry):
+        """Check that an indexed entry still exists with the indexed sounds"""
+        headword, entry_index = entry
+        vocabulary = self.language.vocabulary
+        return (
+            vocabulary.is_entry(headword, entry_index)
+            and vocabulary.lookup(headword, entry_index)
+            and tuple(vocabulary.lookup(headword, entry_index)['sound']) == sounds
+        )
+
+    def within(self, sounds, radius):
+        """List (distance, headword, entry index) for entries with sounds at most
+        radius away, closest first"""
+        self.refresh()
+        if not self.sounds:
+            return []
+        matches = []
+        nodes = [0]
+        while nodes:
+            node = nodes.pop()
+            distance = self.distance(sounds, self.sounds[node])
+            if distance <= radius:
+                matches += [
+                    (distance, *entry) for entry in self.entries[node]
+                    if self.is_current(self.sounds[node], entry)
+                ]
+            nodes += [
+                child for child_distance, child in self.children[node].items()
+                if distance - radius - slack <= child_distance <= distance + radius + slack
+            ]
+        return sorted(matches)
+
+    def nearest(self, sounds, count=1):
+        """List (distance, headword, entry index) for the count closest entries"""
+        self.refresh()
+        if not self.sounds or count < 1:
+            return []
+        # best matches as a heap of (-distance, headword, entry index)
+        best = []
+        nodes = [0]
+        while nodes:
+            node = nodes.pop()
+            radius = -best[0][0] if len(best) >= count else None
+            distance = self.distance(sounds, self.sounds[node])
+            if radius is None or distance < radius:
+                for entry in self.entries[node]:
+                    if self.is_current(self.sounds[node], entry):
+                        heapq.heappush(best, (-distance, *entry))
+                        if len(best) > count:
+                            heapq.heappop(best)
+            radius = -best[0][0] if len(best) >= count else None
+            nodes += [
+                child for child_distance, child in self.children[node].items()
+                if radius is None or distance - radius - slack <= child_distance <= distance + radius + slack
+            ]
+        return sorted((-distance, headword, entry_index) for distance, headword, entry_index in best)
+
+    def is_distinct(self, sounds, min_distance):
+        """Check that no entry has sounds closer than min_distance"""
+        return not any(
+            distance < min_distance
+            for distance, _, _ in self.within(sounds, min_distance)
+        )
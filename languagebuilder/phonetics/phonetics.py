@@ -23,6 +23,7 @@ class Phonetics:
     def __init__(self):
         self.features = {}  # map feature:{ipa}
         self.ipa = {}       # map ipa:{features}
+        self.version = 0    # count of changes to the maps for invalidating caches
 
     def has_ipa(self, symbol):
         """Check if the symbol exists in the ipa map"""
@@ -133,6 +134,7 @@ class Phonetics:
             # add features and symbols to their sets
             self.features.setdefault(feature, set()).add(symbol)
             self.ipa.setdefault(symbol, set()).add(feature)
+        self.version += 1
         return {symbol: self.ipa[symbol]}
 
     def update_symbol(self, symbol, new_symbol):
@@ -156,6 +158,7 @@ class Phonetics:
         for feature in features:
             self.features[feature].remove(symbol)
             feature_callback and feature_callback(feature)
+        self.version += 1
         return features
 
     def update_feature(self, feature, new_feature):
@@ -186,6 +189,7 @@ class Phonetics:
         for symbol in symbols:
             self.ipa[symbol].remove(feature)
             ipa_callback and ipa_callback(symbol)
+        self.version += 1
         # send back the deleted data
         return {feature: symbols}
 
@@ -0,0 +1,224 @@
+import random
+
+# Build words that meet constraints instead of filtering built words
+# - words are searched syllable by syllable: only syllable structures that
+#   still allow the syllable count and sound count ranges are tried, then
+#   each structure slot takes one of its candidate sounds
+# - candidates are narrowed at each position by the start pattern, avoided
+#   clusters and the spelling prefix, and the end pattern is checked once
+#   the last syllable is filled
+# - search states that cannot lead to a word are remembered, so repeated
+#   builds with the same constraints skip them
+# - only the optional word filter runs on finished words
+#
+# A pattern is a list of items, each one a phonetic symbol or a list of features.
+class Constraints():
+    def __init__(self, phonology, length=None, min_sounds=None, max_sounds=None, start=None, end=None, avoid=None, spelling_start=None, word_filter=None):
+        # reference phonology for syllables, inventory and spelling
+        self.phonology = phonology
+
+        # syllable count range
+        if length is None:
+            self.min_syllables, self.max_syllables = 1, 1
+        elif isinstance(length, int):
+            self.min_syllables, self.max_syllables = length, length
+        elif isinstance(length, (list, tuple)) and len(length) == 2:
+            self.min_syllables, self.max_syllables = length
+        else:
+            raise ValueError(f"Constraints expected syllable count or (min, max) range not {length}")
+        if self.min_syllables < 1 or self.max_syllables < self.min_syllables:
+            raise ValueError(f"Constraints found invalid syllable count range {length}")
+
+        # sound count range
+        self.min_sounds = min_sounds or 0
+        self.max_sounds = max_sounds
+
+        # symbols allowed at positions from the start and end of the word
+        self.start = self.vet_pattern(start)
+        self.end = self.vet_pattern(end)
+        # sequences of allowed symbols that cannot appear anywhere in the word
+        self.avoid = [self.vet_pattern(cluster) for cluster in avoid or []]
+        self.cluster_length = max((len(cluster) for cluster in self.avoid), default=1)
+        # number of last sounds needed to check clusters and the end pattern
+        self.tail_length = max(self.cluster_length - 1, len(self.end))
+
+        # letters the spelling must start with
+        self.spelling_start = "".join(spelling_start) if spelling_start else ""
+
+        # check on the finished word entry
+        self.word_filter = word_filter
+
+        # syllable structures as lists of sorted candidate sounds, skipping slots
+        # without any sounds in the inventory just as build_word does
+        inventory = self.phonology.inventory()
+        self.structures = []
+        for structure in self.phonology.syllables.get().values():
+            slots = [
+                sorted(self.phonology.phonetics.get_ipa(feature_set, filter_phonemes=inventory))
+                for feature_set in structure
+            ]
+            self.structures.append([slot for slot in slots if slot])
+        self.structures = [structure for structure in self.structures if structure]
+
+        # search states known not to lead to a word meeting the constraints
+        self.dead_ends = set()
+
+        # sound counts reachable with each number of remaining syllables
+        self.reachable = [{0}]
+        for _ in range(self.max_syllables):
+            self.reachable.append({
+                count + len(structure)
+                for count in self.reachable[-1]
+                for structure in self.structures
+            })
+
+    def vet_pattern(self, pattern):
+        """Turn a pattern into a list of allowed symbol sets"""
+        if not pattern:
+            return []
+        if isinstance(pattern, str):
+            pattern = [pattern]
+        allowed = []
+        for item in pattern:
+            if isinstance(item, str):
+                allowed.append({item})
+            elif isinstance(item, (list, tuple, set)):
+                allowed.append(set(self.phonology.phonetics.get_ipa(list(item))))
+            else:
+                raise TypeError(f"Constraints expected a symbol or features list not {item}")
+        return allowed
+
+    def is_length_possible(self, sound_count, syllables_left):
+        """Check if a sound count can still reach the sound count range"""
+        return any(
+            self.min_sounds <= sound_count + remaining_count
+            and (self.max_sounds is None or sound_count + remaining_count <= self.max_sounds)
+            and sound_count + remaining_count >= len(self.start)
+            and sound_count + remaining_count >= len(self.end)
+            for remaining_count in self.reachable[syllables_left]
+        )
+
+    def is_avoided(self, sounds):
+        """Check if the last sounds complete an avoided cluster"""
+        for cluster in self.avoid:
+            if len(cluster) <= len(sounds) and all(
+                sound in allowed
+                for sound, allowed in zip(sounds[-len(cluster):], cluster)
+            ):
+                return True
+        return False
+
+    def spell_options(self, sound, spelled_count):
+        """List letters for a sound that keep spelling the required prefix, with
+        the prefix letter count after each one"""
+        letters = sorted(self.phonology.phonemes.get_letters(sound) or [])
+        if spelled_count >= len(self.spelling_start):
+            return [(None, spelled_count)]
+        remaining = self.spelling_start[spelled_count:]
+        return [
+            (letter, min(len(self.spelling_start), spelled_count + len(letter)))
+            for letter in letters
+            if remaining.startswith(letter) or letter.startswith(remaining)
+        ]
+
+    def search(self, syllable_count):
+        """Choose structures, sounds and prefix letters for a word with a syllable
+        count, depth first in random order. States already known to fail are
+        skipped, and remembered across words since failing only depends on state."""
+        sounds = []
+        letters = []
+        tail_length = self.tail_length
+
+        def search_state(syllables_built, structure, slot_index, spelled_count):
+            sound_count = len(sounds)
+            tail = tuple(sounds[max(0, sound_count - tail_length):]) if tail_length else ()
+            state = (syllable_count, syllables_built, structure, slot_index, sound_count, tail, spelled_count)
+            if state in self.dead_ends:
+                return False
+
+            # between syllables - finish the word or pick a structure that fits
+            if structure is None:
+                if syllables_built == syllable_count:
+                    if self.is_finished(sounds, spelled_count):
+                        return True
+                    self.dead_ends.add(state)
+                    return False
+                structures = [
+                    i for i, candidate in enumerate(self.structures)
+                    if self.is_length_possible(sound_count + len(candidate), syllable_count - syllables_built - 1)
+                ]
+                random.shuffle(structures)
+                for i in structures:
+                    if search_state(syllables_built, i, 0, spelled_count):
+                        return True
+                self.dead_ends.add(state)
+                return False
+
+            # within a syllable - pick a sound for the next slot
+            slots = self.structures[structure]
+            candidates = slots[slot_index]
+            if sound_count < len(self.start):
+                candidates = [sound for sound in candidates if sound in self.start[sound_count]]
+            else:
+                candidates = list(candidates)
+            random.shuffle(candidates)
+            next_state = (
+                (syllables_built, structure, slot_index + 1)
+                if slot_index + 1 < len(slots) else (syllables_built + 1, None, 0)
+            )
+            for sound in candidates:
+                sounds.append(sound)
+                if not self.is_avoided(sounds):
+                    for letter, next_spelled_count in self.spell_options(sound, spelled_count):
+                        letters.append(letter)
+                        if search_state(*next_state, next_spelled_count):
+                            return True
+                        letters.pop()
+                sounds.pop()
+            self.dead_ends.add(state)
+            return False
+
+        if not search_state(0, None, 0, 0):
+            return
+        return sounds, letters
+
+    def is_finished(self, sounds, spelled_count):
+        """Check a complete word's ending and spelling prefix"""
+        if spelled_count < len(self.spelling_start) or len(sounds) < len(self.end):
+            return False
+        return all(
+            sound in allowed
+            for sound, allowed in zip(sounds[len(sounds) - len(self.end):], self.end)
+        )
+
+    def build(self, apply_rules=True, max_attempts=100):
+        """Build one word meeting the constraints, or None if no word is found"""
+        for _ in range(max_attempts):
+            # try syllable counts in random order until one fits
+            syllable_counts = [
+                count for count in range(self.min_syllables, self.max_syllables + 1)
+                if self.is_length_possible(0, count)
+            ]
+            random.shuffle(syllable_counts)
+            found = None
+            for syllable_count in syllable_counts:
+                found = self.search(syllable_count)
+                if found:
+                    break
+            if not found:
+                return
+            sounds, letters = found
+            # spell the sounds after the required prefix as spell does
+            spelling = [
+                letter if letter else self.phonology.spell_sound(sound)
+                for sound, letter in zip(sounds, letters)
+            ]
+            word = {
+                'spelling': spelling,
+                'sound': sounds,
+                'change': self.phonology.apply_rules(sounds) if apply_rules else list(sounds),
+                'midpoint': None
+            }
+            if not self.word_filter or self.word_filter(word):
+                return word
+        return
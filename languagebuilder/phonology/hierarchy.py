@@ -25,6 +25,13 @@ class Hierarchy:
         }
         self.hierarchy = ""     # set one id as the syllable scale
 
+        # compiled lookups for recommend, rebuilt on scale, dependency or inventory changes
+        self.version = 0            # count of changes to scale and dependencies
+        self.compiled_version = None
+        self.candidates = {}        # map of frozen features:sorted phonemes having them
+        self.available_scales = {}  # map of frozen right features:scale features with phonemes
+        self.transitions = {}       # map of (frozen left, frozen right features):next feature options
+
     # NOTE: latest take (see attempt 2 in Phonotactics comment)
     #
     def format_shapeset(self, shape_element):
@@ -116,6 +123,7 @@ class Hierarchy:
     def clear(self):
         """Empty the existing scale"""
         self.scale = []
+        self.version += 1
 
     def rewrite(self, scale):
         """Overwrite the scale with a new sequence"""
@@ -123,6 +131,7 @@ class Hierarchy:
         if isinstance(scale, str) or not all([isinstance(f, str) for f in scale]):
            raise TypeError(f"Hierarchy rewrite scale expected a string list not {scale}")
         self.scale = list(scale)
+        self.version += 1
 
     def add(self, *features, position=0):
         """Add one or more features to a specific slot (including -1 for left/outermost,
@@ -143,6 +152,7 @@ class Hierarchy:
 
         # add features to scale
         self.scale = self.scale[:scale_i] + list(features) + self.scale[scale_i:]
+        self.version += 1
         
         return self.scale
 
@@ -152,6 +162,7 @@ class Hierarchy:
         # remove at given index
         if position is not None:
             self.scale = self.scale[:position] + self.scale[position+1:]
+            self.version += 1
             return self.scale
         
         # find and remove occurrences of a feature
@@ -159,6 +170,7 @@ class Hierarchy:
             lambda f: f != feature,
             self.scale
         ))
+        self.version += 1
     
         return self.scale
 
@@ -176,16 +188,18 @@ class Hierarchy:
         if right_feature is not None and not self.phonology.phonetics.has_feature(right_feature):
             raise ValueError(f"Phonotactics hierarchy dependencies did not recognize feature {right_feature}")
         clusives = ('include', 'exclude')
-        include_exclude = clusives[include]
+        include_exclude = clusives[not include]
         dependencies_entry = {clusive: set() for clusive in clusives}
         self.dependencies.setdefault(left_feature, dependencies_entry)
         self.dependencies[left_feature][include_exclude].add(right_feature)
+        self.version += 1
         return {left_feature: self.dependencies[left_feature]}
 
     def undepend(self, left_feature, right_feature=None):
         """Remove one left-right feature from dependencies, or just the left feature to
         remove a whole dependencies entry."""
         dependencies_entry = self.dependencies[left_feature]
+        self.version += 1
         # delete entire left feature including entry value
         if right_feature is None and None not in dependencies_entry['inclusive'] ^ dependencies_entry['exclusive']:
             self.dependencies.pop(left_feature)
@@ -234,6 +248,68 @@ class Hierarchy:
         else:
             return set(features)
 
+    def refresh(self):
+        """Drop compiled lookups when the scale, dependencies or sounds have changed"""
+        versions = (self.version, self.phonology.phonetics.version, self.phonology.phonemes.version)
+        if self.compiled_version != versions:
+            self.candidates.clear()
+            self.available_scales.clear()
+            self.transitions.clear()
+            self.compiled_version = versions
+
+    def get_candidates(self, features):
+        """Read the phonemes having all of a set of features"""
+        features = frozenset(features)
+        if features not in self.candidates:
+            self.candidates[features] = sorted(self.phonology.get_phonemes(list(features))) if features else []
+        return self.candidates[features]
+
+    def get_available_scale(self, right_featureset):
+        """Read the scale features that have phonemes along with right features"""
+        right_featureset = frozenset(right_featureset)
+        if right_featureset not in self.available_scales:
+            self.available_scales[right_featureset] = [
+                scale_feature for scale_feature in self.scale
+                if self.get_candidates(right_featureset | {scale_feature})
+            ]
+        return self.available_scales[right_featureset]
+
+    def get_transition(self, left_featureset, right_featureset):
+        """Read the options for features following left features. Returns a map of
+        'dependencies' listing one group of included features to choose from for each
+        left feature with dependencies, or 'scale' listing the available scale features
+        after the left features (None if no left feature is on the scale)."""
+        key = (frozenset(left_featureset), frozenset(right_featureset))
+        if key in self.transitions:
+            return self.transitions[key]
+
+        # one choice group per applicable left feature dependencies entry
+        dependency_groups = []
+        for left_feature in key[0]:
+            dependencies_entry = self.dependencies.get(left_feature)
+            # apply dependencies includes unless input features are excluded
+            if dependencies_entry and dependencies_entry['include'] and not key[0] & dependencies_entry['exclude']:
+                # sort None (end the cluster) after features for repeatable choices
+                dependency_groups.append(sorted(
+                    dependencies_entry['include'],
+                    key=lambda feature: (feature is None, feature or "")
+                ))
+
+        # base hierarchy features further along the scale
+        next_features = None
+        if not dependency_groups:
+            available_scale = self.get_available_scale(key[1])
+            for i, scale_feature in enumerate(available_scale):
+                if scale_feature in key[0]:
+                    next_features = available_scale[i+1:]
+                    break
+
+        self.transitions[key] = {
+            'dependencies': dependency_groups,
+            'scale': next_features
+        }
+        return self.transitions[key]
+
     def recommend(self, left_features=None, right_features=None, random_start=True, jumps=True, length=1):
         """Pick the next (right) sound given selected (left) features and some filter
         (right) features. If no left features are given, pick a random starting position
@@ -246,14 +322,14 @@ class Hierarchy:
             jumps (bool): skip some of the scale sometimes for realistic and varied output
             cluster_length (int): leave enough right features slots for remaining sounds
         """
+        # compiled lookups stand in for searching phonemes on every call
+        self.refresh()
+
         # structure given right features for conditioning recommendations
         recommended_features = self.build_featureset(right_features)
 
         # filter scale for only features with existing sounds to the right
-        available_scale = [
-            scale_feature for scale_feature in self.scale
-            if self.phonology.get_phonemes(list(recommended_features) + [scale_feature])
-        ]
+        available_scale = self.get_available_scale(recommended_features)
 
         # pick a starting feature since no left feature input
         if not left_features:
@@ -269,51 +345,35 @@ class Hierarchy:
             
             # TODO: on empty features/phonemes, recommend a different feature/sound
             #   - see calling Phonotactics shape method
-            recommended_ipa = random.choice(self.phonology.get_phonemes(recommended_features))[0]
+            recommended_ipa = random.choice(self.get_candidates(recommended_features))
             
             return recommended_ipa
         
         # create featureset from sound symbol, single-feature string or features list
         left_featureset = self.build_featureset(left_features)
+        transition = self.get_transition(left_featureset, recommended_features)
         
         # look for next (right) features using left features dependencies
-        has_dependencies = False
         recommended_features = set()
-        for left_feature in left_featureset:
-            dependencies_entry = self.dependencies.get(left_feature)
-            if dependencies_entry:
-                # apply dependencies includes unless input features are excluded
-                if not left_featureset & dependencies_entry['exclude']:
-                    if not dependencies_entry['include']:
-                        continue
-                    # choose one right feature to include
-                    feature_choice = random.sample(dependencies_entry['include'], 1)
-                    # expect one feature option
-                    if not feature_choice:
-                        continue
-                    included_feature = feature_choice[0]
-                    has_dependencies = True
-                    # end the sound choice and the cluster
-                    if included_feature is None:
-                        return [None]
-                    # choose one feature from includes
-                    recommended_features.add(included_feature)
+        for dependency_group in transition['dependencies']:
+            # choose one right feature to include
+            included_feature = random.choice(dependency_group)
+            # end the sound choice and the cluster
+            if included_feature is None:
+                return [None]
+            recommended_features.add(included_feature)
 
         # use base hierarchy instead of dependencies
-        if not has_dependencies:
-            for i, scale_feature in enumerate(available_scale):
-                if {scale_feature} & left_featureset:
-                    next_features = available_scale[i+1:]
-                    if not next_features:
-                        raise Exception(f"Failed to choose sounds - no more features along scale")
-                    recommended_features.add(random.choice(next_features))
-                    break
+        if not transition['dependencies'] and transition['scale'] is not None:
+            if not transition['scale']:
+                raise Exception(f"Failed to choose sounds - no more features along scale")
+            recommended_features.add(random.choice(transition['scale']))
         
         if not recommended_features:
             raise KeyError(f"Hierarchy cannot recommend a sound for features {right_features} following a sound {left_features}")
 
         # take in features and recommend a new sound symbol
-        chosen_ipa = random.choice(self.phonology.get_phonemes(recommended_features))[0]
+        chosen_ipa = random.choice(self.get_candidates(recommended_features))
         if left_featureset == self.phonology.phonetics.get_features(chosen_ipa):
             return None
         # TODO: handle repeats (getting many of the last feature in scale in demos)
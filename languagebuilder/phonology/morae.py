@@ -14,6 +14,17 @@ class Morae:
     def __init__(self, phonology):
         self.phonology = phonology
         self.morae = {}         # map moraic ids to features and beat count data
+        self.version = 0        # count of changes to morae
+
+        # morae compiled for counting, rebuilt when morae change
+        self.feature_bits = {}      # map of feature:bit in feature masks
+        self.compiled_version = None
+        self.moraic_starts = 0      # bits of first slots across morae
+        self.moraic_ends = {}       # map of last slot bit:(length, order, beats)
+        self.moraic_slots = []      # feature mask by slot bit
+        self.slot_matches = {}      # map of sound mask:matched slot bits
+        self.sound_masks = {}       # map of sound:feature mask
+        self.sound_masks_version = None
     
     def get(self, moraic_id=None):
         """Return the moraic details stored under the given id key, or all items
@@ -59,10 +70,12 @@ class Morae:
             'features': moraic_list,    # list of features lists
             'beats': beats              # beat count
         }
+        self.version += 1
         return moraic_id
 
     def remove(self, moraic_id):
         """Delete one item from the morae map"""
+        self.version += 1
         return self.morae.pop(moraic_id)
 
     def find(self, mora=None, beats=None, vet_mora=True, first_only=False):
@@ -148,38 +161,81 @@ class Morae:
         ))
         return any(matches)
 
+    # Compiled morae
+    #   - each feature is a bit, so a featureset is one integer mask and a sound
+    #     fits a moraic slot when its features include every slot feature
+    #   - moraic slots are laid end to end as bits of one integer, and a sample
+    #     is counted in one pass left to right shifting every partial mora match
+    #     along at the same time (bit-parallel shift-and over all morae)
+    #   - when morae complete on a sound, the longest one counts its beats
+    #     (then the one added first) and matching starts over after it
+    def features_mask(self, features):
+        """Turn a collection of features into an integer with one bit per feature"""
+        mask = 0
+        for feature in features:
+            if feature not in self.feature_bits:
+                self.feature_bits[feature] = 1 << len(self.feature_bits)
+            mask |= self.feature_bits[feature]
+        return mask
+
+    def compile(self):
+        """Lay out moraic slot masks as bits if morae changed since the last compile"""
+        if self.compiled_version == self.version:
+            return
+        self.moraic_starts = 0
+        self.moraic_ends.clear()
+        self.moraic_slots = []
+        self.slot_matches.clear()
+        for order, moraic_details in enumerate(self.morae.values()):
+            features = moraic_details['features']
+            if not features:
+                continue
+            self.moraic_starts |= 1 << len(self.moraic_slots)
+            self.moraic_slots += [self.features_mask(featureset) for featureset in features]
+            self.moraic_ends[len(self.moraic_slots) - 1] = (len(features), order, moraic_details['beats'])
+        self.compiled_version = self.version
+
+    def match_sound(self, sound):
+        """Find the bits of every moraic slot a sound fits"""
+        # forget sound features when phonetics change
+        if self.sound_masks_version != self.phonology.phonetics.version:
+            self.sound_masks.clear()
+            self.sound_masks_version = self.phonology.phonetics.version
+        if sound not in self.sound_masks:
+            self.sound_masks[sound] = self.features_mask(self.phonology.phonetics.get_features(sound) or [])
+        sound_mask = self.sound_masks[sound]
+        if sound_mask not in self.slot_matches:
+            self.slot_matches[sound_mask] = sum(
+                1 << bit for bit, slot_mask in enumerate(self.moraic_slots)
+                if not slot_mask & ~sound_mask
+            )
+        return self.slot_matches[sound_mask]
+
     def count(self, sounds_sample):
         """Count the number of beats in a sound sample based on stored morae"""
-        # convert sounds into a list of per-sound feature collections
-        sample_features = [
-            self.phonology.phonetics.get_features(sound)
-            for sound in sounds_sample
-        ]
-        
-        # keep track of moraic windows from sample and matched moraic beats
-        tracked_morae = []
+        self.compile()
         count = 0
-        
-        # track, build and match moraic subsample windows
-        for features in sample_features:
-            # add features to all tracks and start a new track with current features
-            # (each sample sound/features list starts a new features set list)
-            tracked_morae += [[]]
-            [track.append(features) for track in tracked_morae]
-            # traverse morae looking for matches
-            for compared_details in self.morae.values():
-                compared_features = compared_details['features']
-                # compare tossable tracks for full matchups
-                # (any sample moraic window matches any existing moraic entry)
-                if self.is_superlist(tracked_morae, compared_features):
-                    # count beats and reset tracking
-                    count += compared_details['beats']
-                    tracked_morae.clear()
-                    break
-        
+        matched = 0
+        for sound in sounds_sample:
+            matched = ((matched << 1) | self.moraic_starts) & self.match_sound(sound)
+            if not matched:
+                continue
+            # count the longest mora ending here and start matching over
+            completed = [
+                moraic_end for bit, moraic_end in self.moraic_ends.items()
+                if matched >> bit & 1
+            ]
+            if completed:
+                count += min(completed, key=lambda moraic_end: (-moraic_end[0], moraic_end[1]))[2]
+                matched = 0
+
         ## TODO: figure a way to check for leftover beats
         # if leftover_beats_check():
         #    return
 
         return count
-            
\ No newline at end of file
+
+    def count_many(self, sounds_samples):
+        """Count beats in each of many sound samples, such as lines of verse"""
+        self.compile()
+        return [self.count(sounds_sample) for sounds_sample in sounds_samples]
@@ -1,7 +1,17 @@
+from ..tools.overlay import peek
+
 # TODO separate phonemes/letters/weights (language) from ipa-features (features) - do not handle features here!
 class Phonemes():
     def __init__(self):
         self.phonemes = {}
+        self.own_version = 0    # count of changes to the phonemes for invalidating caches
+        self.parent = None      # phonemes of the language this one was forked from
+
+    @property
+    def version(self):
+        """Count changes to these phonemes and to any parent phonemes showing
+        through them, so caches keyed on it also follow changes in the parent"""
+        return self.own_version + (self.parent.version if self.parent else 0)
 
     def has(self, ipa):
         return ipa in self.phonemes
@@ -10,10 +20,11 @@ class Phonemes():
         """Return one phoneme or all if no specific one requested"""
         if ipa is None:
             return self.phonemes
-        return self.phonemes.get(ipa, None)
+        return peek(self.phonemes, ipa)
 
     def add(self, ipa, letters, weight=0):
-        """Store a new phoneme object"""
+        """Store a new phoneme object. Letters may be a map of letter:weight
+        to spell the phoneme with some letters more often than others."""
         # TODO: check ipa associated features
 
         #if not type(phoneme).__name__ == 'Phoneme':
@@ -34,9 +45,12 @@ class Phonemes():
             'letters': set(letters),
             'weight': weight
         }
+        if isinstance(letters, dict):
+            phoneme['letter_weights'] = dict(letters)
 
         # create entry
         self.phonemes[ipa] = phoneme
+        self.own_version += 1
         return phoneme
     
     # TODO: ability to manage (crud) individual letters
@@ -48,8 +62,14 @@ class Phonemes():
             print(f"Phonemes failed to update unrecognized phoneme {ipa}")
             return
         # update individual properties in the phoneme
-        phoneme['letters'] = set(letters) if letters else phoneme['letters']
+        if letters:
+            phoneme['letters'] = set(letters)
+            if isinstance(letters, dict):
+                phoneme['letter_weights'] = dict(letters)
+            else:
+                phoneme.pop('letter_weights', None)
         phoneme['weight'] = weight if weight else phoneme['weight']
+        self.own_version += 1
         # also update the ipa and return the new object
         if new_ipa:
             return self.update_ipa(ipa, new_ipa)
@@ -68,10 +88,12 @@ class Phonemes():
         # modify and store the phoneme object
         phoneme['ipa'] = new_ipa
         self.phonemes[new_ipa] = phoneme
+        self.own_version += 1
         return phoneme
 
     def remove(self, ipa):
         """Delete phoneme associated with one symbol from the phonemes"""
+        self.own_version += 1
         return self.phonemes.pop(ipa, None)
 
     def symbols(self):
@@ -88,8 +110,8 @@ class Phonemes():
 
     def get_letters(self, ipa):
         """Read all letters from one stored phoneme"""
-        return self.phonemes.get(ipa, {}).get('letters')
+        return peek(self.phonemes, ipa, {}).get('letters')
 
     def get_weight(self, ipa):
         """Read the weight for one stored phoneme"""
-        return self.phonemes.get(ipa, {}).get('weight')
+        return peek(self.phonemes, ipa, {}).get('weight')
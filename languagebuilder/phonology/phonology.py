@@ -4,8 +4,13 @@ from .syllables import Syllables
 from .morae import Morae
 from .rules import Rules
 from .ruletracker import RuleTracker
+from .rulebatch import RuleBatch
+from .constraints import Constraints
+from .wordspace import WordSpace
+from .transcriber import Transcriber
 from .suprasegmentals import Suprasegmentals
 # for sound, letter and syllable generation
+import itertools
 import random
 
 # TODO: accentuation/suprasegmentals here and in Phonetics 
@@ -34,6 +39,20 @@ class Phonology:
         self.source_symbol = "_"
         self.boundary_symbol = "#"
 
+        # precomputed symbols able to match each rule, rebuilt on rule or phonetics changes
+        self.rule_filters = {}
+        self.rule_filters_version = None
+        # compiled rules for changing many words at once
+        self.rule_batch = RuleBatch(self)
+
+        # phoneme:(letters, cumulative weights, stable letter), rebuilt on phonemes changes
+        self.spelling_table = {}
+        self.spelling_version = None
+        # choose the same letter for a sound every time instead of at random
+        self.spell_deterministically = False
+        # letters trie for reading spellings back into sounds
+        self.transcriber = Transcriber(self)
+
     # inventory now managed through Phonemes (letters <> ipa) and Features (features <> ipa) instead of previous Inventory class
     def inventory(self):
         """Read all phonetic symbols stored in this inventory"""
@@ -266,6 +285,53 @@ class Phonology:
     # TODO: interact with lexicon storage, adding phonetic word and sound change alongside spelling and definition
     #   - store tracks or store the changed symbols list alongside word in lexicon
 
+    def get_rule_filter(self, rule_id):
+        """Read the sets of phonetic symbols that can fill a rule's source slot and
+        each of its featured environment slots. Filters are built once per rule and
+        rebuilt after rules or phonetics change."""
+        # drop stale filters when rules or symbol features have changed
+        versions = (self.rules.version, self.phonetics.version)
+        if self.rule_filters_version != versions:
+            self.rule_filters.clear()
+            self.rule_filters_version = versions
+
+        # read already built filter
+        if rule_id in self.rule_filters:
+            return self.rule_filters[rule_id]
+
+        rule = self.rules.get(rule_id)
+        if not rule:
+            return
+
+        # symbols (from all phonetics since changes may leave the inventory) by slot
+        environment_symbols = []
+        for slot in rule['environment']:
+            # source and boundary slots impose no extra symbol requirement
+            if isinstance(slot, str) or not slot or set(slot) <= {self.boundary_symbol}:
+                continue
+            environment_symbols.append(frozenset(self.phonetics.get_ipa(slot)))
+
+        rule_filter = {
+            'source': frozenset(self.phonetics.get_ipa(rule['source'])),
+            'environment': environment_symbols
+        }
+        self.rule_filters[rule_id] = rule_filter
+        return rule_filter
+
+    def is_rule_applicable(self, ipa, rule_id):
+        """Check if a rule could possibly apply to a word. A rule cannot fire unless the
+        word has a sound matching its source and a sound for each environment slot."""
+        rule_filter = self.get_rule_filter(rule_id)
+        if not rule_filter:
+            return False
+        word_sounds = ipa if isinstance(ipa, (set, frozenset)) else set(ipa)
+        if rule_filter['source'].isdisjoint(word_sounds):
+            return False
+        for slot_symbols in rule_filter['environment']:
+            if slot_symbols.isdisjoint(word_sounds):
+                return False
+        return True
+
     def apply_rule(self, ipa, rule_id):
         """Change a word's sounds applying one sound change rule"""
         if not isinstance(ipa, (str, list, tuple)):
@@ -277,7 +343,17 @@ class Phonology:
             word_sounds = set([c for c in ipa])
         except:
             raise ValueError(f"Phonology apply_rule failed - invalid sound sequence {ipa}")
-        
+
+        # fetch the rule object
+        rule = self.rules.get(rule_id)
+        if not rule:
+            print(f"Phonology apply_rule failed - invalid rule_id {rule_id}")
+            return
+
+        # skip tracking rules that cannot match any sound in this word
+        if not self.is_rule_applicable(word_sounds, rule_id):
+            return list(ipa)
+
         # prepare input sequence for search - add start and end markers
         ipa_sequence = [self.boundary_symbol] + list(ipa) + [self.boundary_symbol]
 
@@ -288,12 +364,6 @@ class Phonology:
         }
         word_features[self.boundary_symbol] = self.boundary_symbol
 
-        # fetch the rule object
-        rule = self.rules.get(rule_id)
-        if not rule:
-            print(f"Phonology apply_rule failed - invalid rule_id {rule_id}")
-            return
-
         # store tracks for each possible rule application
         # TODO: consider if this is one instance per rule only
         #   - originally instantiated in apply_rules
@@ -365,14 +435,14 @@ class Phonology:
 
     def apply_rules(self, ipa_sequence):
         """Change a word's sounds applying every sound change rule. This feeds the
-        result of each rule application to the next rule as sorted in Rules.order"""
+        result of each rule application to the next rule in rule order"""
 
         # set up the word
         print(f"\nApplying all rules to input ipa sequence {ipa_sequence}")
         new_ipa_sequence = [character for character in ipa_sequence]
 
-        # traverse local rules map searching for and applying rule matches
-        for rule_id in self.rules.get():
+        # traverse rule ids in order searching for and applying rule matches
+        for rule_id in self.rules.get_ordered_ids():
             new_ipa_sequence = self.apply_rule(new_ipa_sequence, rule_id)
 
         print(f"Finished applying all rules to create new ipa sequence {new_ipa_sequence}\n")
@@ -380,6 +450,15 @@ class Phonology:
         # return the changed sequence fed through all rules
         return new_ipa_sequence
 
+    def apply_rules_many(self, ipa_sequences, rule_ids=None):
+        """Change the sounds of many words at once applying every sound change rule
+        (or only the given rule ids) in order. Results match running apply_rules on
+        each word but every rule is matched across all words in a single pass."""
+        if not isinstance(ipa_sequences, (list, tuple)):
+            print(f"Phonology apply_rules_many failed - expected list of ipa sequences not {ipa_sequences}")
+            return
+        return self.rule_batch.apply(ipa_sequences, rule_ids=rule_ids)
+
     def build_word(self, length=1, apply_rules=True, spell_after_change=False, order_rules=True, as_string=False, midpoint=None):
         """Form a word following the defined inventory and syllable structure.
         Run optional syllable event on each successful syllable built.
@@ -473,51 +552,179 @@ class Phonology:
 
         return word_entry
 
+    def build_constrained_words(self, count=1, length=None, min_sounds=None, max_sounds=None, start=None, end=None, avoid=None, spelling_start=None, word_filter=None, apply_rules=True, max_attempts=100):
+        """Form words that meet constraints by searching only through sounds able
+        to meet them, instead of building words and throwing away misses.
+
+        args:
+            count (int): number of words to build
+            length (int or tuple): syllable count or (min, max) syllable count range
+            min_sounds (int): fewest sounds in each word
+            max_sounds (int): most sounds in each word
+            start (list): pattern the underlying sounds must start with
+            end (list): pattern the underlying sounds must end with
+            avoid (list): patterns that cannot appear in the underlying sounds
+            spelling_start (str): letters the spelling must start with
+            word_filter (function): check run on each finished word entry
+            apply_rules (bool): whether to apply sound change rules to each word
+            max_attempts (int): words tried against the word filter before giving up
+        return:
+            list of word entries shaped like build_word entries, with spelling
+            based on the underlying sounds, and fewer than count words if no more
+            words meeting the constraints were found
+
+        Patterns are lists of items, each one a phonetic symbol or a list of features.
+        """
+        constraints = Constraints(
+            self,
+            length=length,
+            min_sounds=min_sounds,
+            max_sounds=max_sounds,
+            start=start,
+            end=end,
+            avoid=avoid,
+            spelling_start=spelling_start,
+            word_filter=word_filter
+        )
+        words = []
+        for _ in range(count):
+            word = constraints.build(apply_rules=apply_rules, max_attempts=max_attempts)
+            if not word:
+                print(f"Phonology build_constrained_words failed - only found {len(words)} of {count} words meeting constraints")
+                break
+            words.append(word)
+        return words
+
+    def build_constrained_word(self, length=None, **constraints):
+        """Form one word meeting constraints. See build_constrained_words."""
+        words = self.build_constrained_words(count=1, length=length, **constraints)
+        return words[0] if words else None
+
+    def word_space(self, length=1):
+        """Read the space of distinct sound sequences the phonology can build with a
+        syllable count or (min, max) syllable count range, for counting, indexing
+        and listing words. Build a new word space after changing the phonology."""
+        return WordSpace(self, length=length)
+
+    def count_words(self, length=1):
+        """Count distinct sound sequences with a syllable count or range without
+        listing them"""
+        return self.word_space(length).count()
+
+    def word_sampler(self, key, length=1, shard=0, shards=1, position=None):
+        """Read a sampler that issues each sound sequence with a syllable count or
+        range at most once, in an order set by the key. Processes sampling with the
+        same key and different shards never issue the same word. Save the sampler
+        position to resume it later with an unchanged phonology."""
+        return self.word_space(length).sampler(key, shard=shard, shards=shards, position=position)
+
+    # Spelling table
+    #   - each phoneme maps to (letters, cumulative letter weights, stable letter),
+    #     with letters sorted so choices do not depend on set order
+    #   - letter weights are only kept when the phoneme was stored with them
+    #   - the stable letter is the heaviest letter, then the first sorted one, used
+    #     when spelling deterministically
+    #   - the table is rebuilt when phonemes change
+    def compile_spelling(self):
+        """Build the spelling table if phonemes changed since the last build"""
+        if self.spelling_version == self.phonemes.version:
+            return self.spelling_table
+        self.spelling_table = {}
+        for ipa, phoneme in self.phonemes.get().items():
+            letters = tuple(sorted(phoneme['letters']))
+            if not letters:
+                continue
+            letter_weights = phoneme.get('letter_weights')
+            if letter_weights:
+                weights = [letter_weights.get(letter, 0) for letter in letters]
+                stable_letter = letters[weights.index(max(weights))]
+                weights = tuple(itertools.accumulate(weights)) if any(weights) else None
+            else:
+                weights = None
+                stable_letter = letters[0]
+            self.spelling_table[ipa] = (letters, weights, stable_letter)
+        self.spelling_version = self.phonemes.version
+        return self.spelling_table
+
+    def choose_letter(self, spelling, deterministic=False):
+        """Pick a letter from one spelling table entry"""
+        letters, weights, stable_letter = spelling
+        if deterministic or len(letters) == 1:
+            return stable_letter
+        if weights:
+            return random.choices(letters, cum_weights=weights)[0]
+        return random.choice(letters)
+
+    def spell_sound(self, ipa, deterministic=None):
+        """Choose a letter for one sound, or None if the sound has no letters"""
+        spelling = self.compile_spelling().get(ipa)
+        if not spelling:
+            return
+        deterministic = self.spell_deterministically if deterministic is None else deterministic
+        return self.choose_letter(spelling, deterministic)
+
+    def transcribe(self, spelling, max_parses=None):
+        """Read a spelling back into sounds, or None if no letters fit. Pass
+        max_parses to list that many ranked readings instead, see Transcriber.parse."""
+        if max_parses:
+            return self.transcriber.parse(spelling, max_parses=max_parses)
+        return self.transcriber.transcribe(spelling)
+
+    def transcribe_many(self, spellings):
+        """Read many spellings back into their best sounds"""
+        return self.transcriber.transcribe_many(spellings)
+
     # TODO: handle spelling rules and environments
-    def spell(self, phonemes, fallback_phonemes=None):
+    def spell(self, phonemes, fallback_phonemes=None, deterministic=None):
         """Transform a list of sounds into a list of letters (including multigraphs)
         representing a spelled word. Use optional fallback list in case changed
         phonemes do not have letters. Fallback length and character indexes must match
-        the main phonemes list."""
-        # check for valid input lists
-        if not isinstance(phonemes, list):
-            raise TypeError(f"Phonology spell failed - invalid phonemes list {phonemes}")
-        if fallback_phonemes:
-            if not isinstance(fallback_phonemes, list):
-                raise TypeError(f"Phonology spell failed - expected fallback phonemes list not {fallback_phonemes}")
-            elif len(fallback_phonemes) != len(phonemes):
-                raise ValueError(f"Phonology spell failed - fallback phonemes {fallback_phonemes} list length does not match phonemes {phonemes}")
-
-        # left-to-right spelling letter storage
-        letters = []
-        # sound and letter that get spelled each pass
-        spelled_phoneme = None
-        letter = None
-        # characters that can be passed through without spelling
-        skippable_chars = ("")
-
-        print(f"These are the changed sounds to spell: {phonemes}")
-        print(f"These are the fallback sounds to spell: {fallback_phonemes}")
-
-        # traverse choosing a letter for each sound
-        for i, phoneme in enumerate(phonemes):
-            # do not attempt to respell ignored characters
-            if phoneme in skippable_chars:
-                continue
-
-            # find a valid spellable phoneme or fallback
-            if self.phonemes.has(phoneme):
-                spelled_phoneme = phoneme
-            elif fallback_phonemes and self.phonemes.has(fallback_phonemes[i]):
-                spelled_phoneme = fallback_phonemes[i]
-            else:
-                raise NameError(f"Phonology failed to spell unrecognized phoneme {phoneme} or find a fallback sound {fallback_phonemes[i]}.")
-            
-            
-            # choose a letter from possible representations
-            letter = random.choice(list(self.phonemes.get_letters(spelled_phoneme)))
-            # store the letter to spell this sound
-            letters.append(letter)
-
-        # send back a list of letters spelling the word
-        return letters
+        the main phonemes list. Spell deterministically for the same letters each time,
+        by default following spell_deterministically."""
+        return self.spell_many([phonemes], [fallback_phonemes], deterministic=deterministic)[0]
+
+    def spell_many(self, words, fallback_words=None, deterministic=None):
+        """Spell many lists of sounds in one pass over the spelling table, each
+        with an optional fallback list as in spell"""
+        table = self.compile_spelling()
+        deterministic = self.spell_deterministically if deterministic is None else deterministic
+        if fallback_words:
+            words = list(words)
+            fallback_words = list(fallback_words)
+            if len(fallback_words) != len(words):
+                raise ValueError(f"Phonology spell_many failed - {len(fallback_words)} fallback lists do not match {len(words)} words")
+        else:
+            fallback_words = itertools.repeat(None)
+
+        spellings = []
+        for phonemes, fallback_phonemes in zip(words, fallback_words):
+            # check for valid input lists
+            if not isinstance(phonemes, list):
+                raise TypeError(f"Phonology spell failed - invalid phonemes list {phonemes}")
+            if fallback_phonemes:
+                if not isinstance(fallback_phonemes, list):
+                    raise TypeError(f"Phonology spell failed - expected fallback phonemes list not {fallback_phonemes}")
+                elif len(fallback_phonemes) != len(phonemes):
+                    raise ValueError(f"Phonology spell failed - fallback phonemes {fallback_phonemes} list length does not match phonemes {phonemes}")
+
+            # traverse choosing a letter for each sound
+            letters = []
+            for i, phoneme in enumerate(phonemes):
+                # do not attempt to respell empty characters
+                if not phoneme:
+                    continue
+
+                # find a valid spellable phoneme or fallback
+                spelling = table.get(phoneme)
+                if not spelling and fallback_phonemes:
+                    spelling = table.get(fallback_phonemes[i])
+                if not spelling:
+                    fallback_phoneme = fallback_phonemes[i] if fallback_phonemes else None
+                    raise NameError(f"Phonology failed to spell unrecognized phoneme {phoneme} or find a fallback sound {fallback_phoneme}.")
+
+                # choose a letter from possible representations
+                letters.append(self.choose_letter(spelling, deterministic))
+            spellings.append(letters)
+
+        # send back a list of letters spelling each word
+        return spellings
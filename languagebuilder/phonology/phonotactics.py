@@ -54,6 +54,18 @@ class Phonotactics:
         self.nuclei = {
             # 'id': [featuresets],
         }
+        self.nuclei_version = 0     # count of changes to nuclei
+
+        # nuclei compiled for partitioning, rebuilt when nuclei change
+        self.feature_bits = {}      # map of feature:bit in feature masks
+        self.compiled_nuclei_version = None
+        self.nucleus_starts = 0     # bits of first slots across nuclei
+        self.nucleus_ends = {}      # map of last slot bit:(nucleus order, length)
+        self.nucleus_slots = []     # feature mask by slot bit
+        self.slot_matches = {}      # map of syllable slot mask:matched slot bits
+        # map of syllable structure id:(nucleus start, nucleus end)
+        self.partitions = {}
+        self.partitions_version = None
 
         # first draw likelihoods
         # TODO: how likely each is to be chosen - see nuclei weight comment above
@@ -84,6 +96,7 @@ class Phonotactics:
         # add nucleus to nuclei
         nucleus_id = f"nucleus-{uuid4()}"
         self.nuclei[nucleus_id] = nucleus
+        self.nuclei_version += 1
         return self.nuclei
 
     def get_nuclei(self):
@@ -92,12 +105,14 @@ class Phonotactics:
 
     def remove_nucleus(self, nucleus_id):
         """Delete one nucleus entry and key in the nuclei map"""
+        self.nuclei_version += 1
         return self.nuclei.pop(nucleus_id)
     
     def clear_nuclei(self, return_old=False):
         """Empty out the entire nuclei map"""
         nuclei_copy = dict(self.nuclei)
         self.nuclei.clear()
+        self.nuclei_version += 1
         if return_old:
             return nuclei_copy
         return self.nuclei
@@ -115,18 +130,85 @@ class Phonotactics:
                 return False
         return True
 
-    def partition_syllable(self, syllable_features):
+    # Compiled nuclei
+    #   - each feature is a bit, so a featureset is one integer mask and a slot
+    #     fits a nucleus slot when its mask is a nonempty subset of the nucleus mask
+    #   - nucleus slots are laid end to end as bits of one integer, and a syllable
+    #     is scanned once left to right shifting every partial nucleus match along
+    #     at the same time (bit-parallel shift-and over all nuclei)
+    #   - the slots a syllable featureset fits are memoized by its mask
+    #   - partitions are memoized by syllable structure id until nuclei or
+    #     syllables change
+    def features_mask(self, features):
+        """Turn a collection of features into an integer with one bit per feature"""
+        mask = 0
+        for feature in features:
+            if feature not in self.feature_bits:
+                self.feature_bits[feature] = 1 << len(self.feature_bits)
+            mask |= self.feature_bits[feature]
+        return mask
+
+    def compile_nuclei(self):
+        """Lay out nucleus slot masks as bits if nuclei changed since the last compile"""
+        if self.compiled_nuclei_version == self.nuclei_version:
+            return
+        self.nucleus_starts = 0
+        self.nucleus_ends.clear()
+        self.nucleus_slots = []
+        self.slot_matches.clear()
+        self.partitions.clear()
+        for nucleus_order, nucleus in enumerate(self.nuclei.values()):
+            if not nucleus:
+                continue
+            self.nucleus_starts |= 1 << len(self.nucleus_slots)
+            self.nucleus_slots += [self.features_mask(featureset) for featureset in nucleus]
+            self.nucleus_ends[len(self.nucleus_slots) - 1] = (nucleus_order, len(nucleus))
+        self.compiled_nuclei_version = self.nuclei_version
+
+    def match_slot(self, slot_mask):
+        """Find the bits of every nucleus slot a syllable slot mask fits"""
+        if slot_mask not in self.slot_matches:
+            self.slot_matches[slot_mask] = sum(
+                1 << bit for bit, nucleus_mask in enumerate(self.nucleus_slots)
+                if slot_mask and not slot_mask & ~nucleus_mask
+            )
+        return self.slot_matches[slot_mask]
+
+    def find_nucleus(self, syllable_features):
+        """Find the start and end index of the leftmost nucleus in a list of
+        featuresets, preferring nuclei in the order added, or None if none fits"""
+        self.compile_nuclei()
+        found = None
+        matched = 0
+        for i, features in enumerate(syllable_features):
+            matched = ((matched << 1) | self.nucleus_starts) & self.match_slot(self.features_mask(features))
+            for bit, (nucleus_order, length) in self.nucleus_ends.items():
+                if matched >> bit & 1:
+                    candidate = (i + 1 - length, nucleus_order, i + 1)
+                    if not found or candidate < found:
+                        found = candidate
+        return (found[0], found[2]) if found else None
+
+    def partition_syllable(self, syllable_features, structure_id=None):
         """Split syllable liss into onset, nucleus, coda.
         Params:
             syllable_features (list): list of string lists, each string representing a feature
+            structure_id (str): syllable id to remember the split by for that structure
         """
-        nucleus_indexes = []
-        for i in range(len(syllable_features)):
-            for nucleus in self.nuclei.values():
-                if self.is_features_list_overlap(syllable_features[i:i+len(nucleus)], nucleus):
-                    nucleus_indexes += [i, i+len(nucleus)]
-                    break
-        
+        # forget remembered splits when nuclei or syllables change
+        self.compile_nuclei()
+        versions = (self.nuclei_version, self.phonology.syllables.version)
+        if self.partitions_version != versions:
+            self.partitions.clear()
+            self.partitions_version = versions
+
+        if structure_id is not None and structure_id in self.partitions:
+            nucleus_indexes = self.partitions[structure_id]
+        else:
+            nucleus_indexes = self.find_nucleus(syllable_features)
+            if structure_id is not None and nucleus_indexes:
+                self.partitions[structure_id] = nucleus_indexes
+
         if not nucleus_indexes:
             raise ValueError(f"Phonotactics failed to partition syllable with unknown nucleus - {syllable_features} not in {self.nuclei}")
 
@@ -156,18 +238,20 @@ class Phonotactics:
     #   - get all dependency chains that are at least as long as cluster
     #   - apply for onset, reverse for coda
 
-    def shape(self, raw_syllable, gaps=True, doubles=True, triples=False):
+    def shape(self, raw_syllable, gaps=True, doubles=True, triples=False, structure_id=None):
         """Fill out a syllable with all defined phonotactics including dependencies
         and sonority. Features walk hierarchically down the sonority scale (with gaps)
         until a dependency chain inclusion/exclusion is found, then the dependency
         chain is followed until a sound with no dependency is found, at which point
         vetting switches back to the sonority scale.      
+
+        Pass the syllable id as structure_id to reuse its onset, nucleus and coda split.
         """
         # vet syllable for valid features
         syllable_features = self.phonology.syllables.structure(raw_syllable)
 
         # break up and check syllables
-        syllable_pieces = self.partition_syllable(syllable_features)
+        syllable_pieces = self.partition_syllable(syllable_features, structure_id=structure_id)
         if not syllable_pieces:
             raise ValueError(f"Phonotactics failed to shape syllable - unknown syllable {syllable_features}")
 
@@ -189,11 +273,12 @@ class Phonotactics:
         nucleus_id = random.choice(list(self.nuclei))
         nucleus_shape = self.nuclei[nucleus_id]
         # TODO: also recommend through Hierarchy (could recommend handle nuclei?)
+        self.hierarchy.refresh()
         for featureset in nucleus_shape:
-            if not self.phonology.get_phonemes(featureset):
+            nucleus_sounds = self.hierarchy.get_candidates(featureset)
+            if not nucleus_sounds:
                 raise Exception(f"Phonotactics failed to shape nucleus - invalid features {featureset}")
-            nucleus_sound = random.choice(self.phonology.get_phonemes(featureset))[0]
-            syllable_shape['nucleus'].append(nucleus_sound)
+            syllable_shape['nucleus'].append(random.choice(nucleus_sounds))
 
         # shape coda
         for current_features in syllable_pieces['coda']:
@@ -0,0 +1,146 @@
+import re     # compiled rule environments
+
+# Apply sound change rules to many words at once
+# - interns each phonetic symbol as a single character
+# - packs every word into one string, padding each word with boundaries
+#   and separating words so that environments never match across them
+# - compiles each rule into a pattern with one character class per environment
+#   slot: the source slot is matched between lookbehind and lookahead slots
+# - swaps each matched source character through the rule's transition table
+# - as in Phonology.apply_rule, all environments are matched against the
+#   sounds before the rule applies, then rules feed each other in order
+class RuleBatch():
+    def __init__(self, phonology):
+        # reference phonology for phonetics, rules and symbol changes
+        self.phonology = phonology
+
+        # interned symbols
+        self.characters = {}    # map of ipa:character
+        self.symbols = {}       # map of character:ipa
+
+        # characters reserved for word boundaries and between padded words
+        self.separator_character = "\x00"
+        self.boundary_character = "\x01"
+
+        # compiled rules keyed by rule id, rebuilt on rule or phonetics changes
+        self.compiled_rules = {}
+        self.compiled_version = None
+
+    def intern(self, symbol):
+        """Read or assign the single character representing a phonetic symbol"""
+        character = self.characters.get(symbol)
+        if character is None:
+            character = chr(0x100 + len(self.characters))
+            self.characters[symbol] = character
+            self.symbols[character] = symbol
+        return character
+
+    def match_characters(self, slot_features):
+        """Build a regular expression character class matching every interned
+        symbol that has all of the slot's features"""
+        slot_features = set(slot_features)
+        # a featureless slot matches any sound or boundary within a word
+        if not slot_features:
+            return f"[^{self.separator_character}]"
+        # the word boundary only fills boundary slots
+        characters = [
+            self.boundary_character
+        ] if slot_features <= {self.phonology.boundary_symbol} else []
+        characters += [
+            self.intern(symbol)
+            for symbol in self.phonology.phonetics.get_ipa(list(slot_features))
+        ]
+        if not characters:
+            return
+        return "[{0}]".format("".join(re.escape(c) for c in characters))
+
+    def compile(self, rule_id):
+        """Turn a rule into a compiled environment pattern and a map of source
+        characters to changed characters"""
+        # drop compiled rules when rules or symbol features have changed
+        versions = (self.phonology.rules.version, self.phonology.phonetics.version)
+        if self.compiled_version != versions:
+            self.compiled_rules.clear()
+            self.compiled_version = versions
+        if rule_id in self.compiled_rules:
+            return self.compiled_rules[rule_id]
+
+        rule = self.phonology.rules.get(rule_id)
+        if not rule:
+            print(f"RuleBatch compile failed - invalid rule_id {rule_id}")
+            return
+
+        # intern all phonetic symbols so every possible change is in each class
+        for symbol in self.phonology.phonetics.map_by_ipa():
+            self.intern(symbol)
+
+        # build one character class per environment slot
+        environment = rule['environment']
+        source_index = environment.index(self.phonology.source_symbol)
+        slot_classes = []
+        for i, slot in enumerate(environment):
+            slot_class = self.match_characters(rule['source'] if i == source_index else slot)
+            # rule can never match when any slot has no matching sounds
+            if not slot_class:
+                self.compiled_rules[rule_id] = (None, {})
+                return self.compiled_rules[rule_id]
+            slot_classes.append(slot_class)
+
+        # match only the source slot, checking the surrounding slots without consuming them
+        before = "".join(slot_classes[:source_index])
+        after = "".join(slot_classes[source_index + 1:])
+        pattern = "{0}{1}{2}".format(
+            f"(?<={before})" if before else "",
+            slot_classes[source_index],
+            f"(?={after})" if after else ""
+        )
+
+        # change each source match candidate once
+        transitions = {}
+        for symbol in self.phonology.phonetics.get_ipa(rule['source']):
+            changed_symbol = self.phonology.change_symbol(rule['source'], rule['target'], symbol)
+            transitions[self.intern(symbol)] = self.intern(changed_symbol if changed_symbol else symbol)
+
+        self.compiled_rules[rule_id] = (re.compile(pattern), transitions)
+        return self.compiled_rules[rule_id]
+
+    def pack(self, words):
+        """Join sound sequences into one string of boundary-padded interned words"""
+        characters = self.characters
+        boundary = self.boundary_character
+        packed_words = []
+        for word in words:
+            try:
+                packed_word = "".join(map(characters.__getitem__, word))
+            except KeyError:
+                packed_word = "".join(self.intern(symbol) for symbol in word)
+            packed_words.append(f"{boundary}{packed_word}{boundary}")
+        return self.separator_character.join(packed_words)
+
+    def unpack(self, packed_words):
+        """Split a packed string back into lists of sound symbols"""
+        symbols = self.symbols
+        return [
+            list(map(symbols.__getitem__, packed_word[1:-1]))
+            for packed_word in packed_words.split(self.separator_character)
+        ]
+
+    def apply(self, words, rule_ids=None):
+        """Change sounds in every word by applying rules in order, defaulting to
+        all rules in the phonology's rule order"""
+        words = list(words)
+        if not words:
+            return []
+        rule_ids = self.phonology.rules.get_ordered_ids() if rule_ids is None else rule_ids
+
+        packed_words = self.pack(words)
+        for rule_id in rule_ids:
+            compiled_rule = self.compile(rule_id)
+            if not compiled_rule:
+                continue
+            pattern, transitions = compiled_rule
+            if not pattern:
+                continue
+            packed_words = pattern.sub(lambda match: transitions[match.group()], packed_words)
+
+        return self.unpack(packed_words)
@@ -1,12 +1,19 @@
-import uuid
+from ..tools.collector import Collection
 
 # TODO: move single Rule methods and map/attrs here
 # find a rule based on source/target/environment
 
 class Rules():
     def __init__(self):
-        self.rules = {}     # map of rule objects
-        self.order = []     # ids sequence representing rule order or chronology
+        # map of rule objects by integer id, iterated in rule order or chronology
+        self.rules = Collection()
+        self.version = 0    # count of changes to rules for invalidating caches
+
+        # ordered views read from the rules and the version they were read at
+        self.ordered_ids = ()       # tuple of rule ids in rule order
+        self.ordered_rules = ()     # tuple of (rule id, rule) pairs in rule order
+        self.positions = {}         # map of rule id:position in rule order
+        self.ordered_version = None
 
     # Rule objects cruds and checks
 
@@ -19,9 +26,7 @@ class Rules():
         # fetch all if no rule id given
         if not rule_id:
             # order or unordered rule objects
-            rules = self.rules if not ordered else {
-                r: self.rules[r] for r in self.order
-            }
+            rules = self.rules if not ordered else dict(self.get_ordered())
             return rules
         # rule does not exist in rules store
         if not self.has(rule_id):
@@ -63,15 +68,13 @@ class Rules():
         #   - handled at the Phonology level
         #   - do you also want to tie Phonetics into Rules to perform the check?
 
-        # store the rule 
-        rule_id = uuid.uuid4()
-        self.rules[rule_id] = {
+        # store the rule as latest in rule ordering
+        rule_id = self.rules.add({
             'source': source,
             'target': target,
             'environment': environment_structure
-        }
-        # add as latest to rule ordering
-        self.order.append(rule_id)
+        })
+        self.version += 1
         # send back key identifying rule
         return rule_id
 
@@ -92,6 +95,7 @@ class Rules():
                 if v is not None
             }
         }
+        self.version += 1
         return rule_id
 
     def remove(self, rule_id):
@@ -99,13 +103,39 @@ class Rules():
         if not self.has(rule_id):
             print(f"Rules remove failed - invalid rule_id: {rule_id}")
             return
-        # remove rule object from rules map and id from ordering
+        # remove rule object from rules map and ordering
         rule = self.rules.pop(rule_id)
-        i = self.order.index(rule_id)
-        self.order.pop(i)
+        self.version += 1
         return rule
     
 
+    # Ordered views
+
+    def refresh_order(self):
+        """Read the rule order into cached views if rules changed since last read"""
+        if self.ordered_version == self.version:
+            return
+        self.ordered_rules = tuple(self.rules.items())
+        self.ordered_ids = tuple(rule_id for rule_id, _ in self.ordered_rules)
+        self.positions = {rule_id: i for i, rule_id in enumerate(self.ordered_ids)}
+        self.ordered_version = self.version
+
+    def get_ordered(self):
+        """Read a tuple of (rule id, rule) pairs in rule order. Do not mutate it."""
+        self.refresh_order()
+        return self.ordered_rules
+
+    def get_ordered_ids(self):
+        """Read a tuple of rule ids in rule order"""
+        self.refresh_order()
+        return self.ordered_ids
+
+    def get_position(self, rule_id):
+        """Read the position of a rule in the rule order, or None if not found"""
+        self.refresh_order()
+        return self.positions.get(rule_id)
+
+
     # Manage environments
 
     # TODO: allow more complex environments including specific consonant/vowel features
@@ -187,10 +217,18 @@ class Rules():
         apply in reverse order"""
         # swap position of ids
         if self.has(rule_a) and self.has(rule_b):
-            a_i = self.order.index(rule_a)
-            b_i = self.order.index(rule_b)
-            self.order[a_i] = rule_b
-            self.order[b_i] = rule_a
+            after_a = self.rules.next_key(rule_a)
+            after_b = self.rules.next_key(rule_b)
+            # neighboring rules only need the later one moved
+            if after_a == rule_b:
+                self.rules.move(rule_b, before=rule_a)
+            elif after_b == rule_a:
+                self.rules.move(rule_a, before=rule_b)
+            # move each rule to where the other one was
+            elif rule_a != rule_b:
+                self.rules.move(rule_a, before=after_b)
+                self.rules.move(rule_b, before=after_a)
+            self.version += 1
             return True
         # unrecognized rules
         return False
@@ -199,9 +237,9 @@ class Rules():
         """Fetch the ordering of all rule ids optionally reversing their order"""
         # back-to-front rule ordering
         if reverse:
-            return list(reversed(self.order))
+            return list(reversed(self.get_ordered_ids()))
         # front-to-back rule ordering
-        return self.order
+        return list(self.get_ordered_ids())
 
     def order_before(self, rule_id_before, rule_id_after):
         """Change a rule index to apply before another rule"""
@@ -210,14 +248,14 @@ class Rules():
             return
         
         # get rule order positions
-        before_i = self.order.index(rule_id_before)
-        after_i = self.order.index(rule_id_after)
+        before_i = self.get_position(rule_id_before)
+        after_i = self.get_position(rule_id_after)
         
         # only perform swap if first precedes second
         if after_i <= before_i:
             self.order_swap(rule_id_before, rule_id_after)
         
-        return self.order
+        return self.get_order()
     
     def order_absolute(self, rule_id, order_i=0):
         """Set the index of a rule within the relative rule order sequence"""
@@ -225,12 +263,14 @@ class Rules():
             print(f"Failed to reorder invalid rule {rule_id}")
             return
         # calculate new position in cut list
-        new_i = order_i - 1 if self.order.index(rule_id) > order_i else order_i
-        # remove rule id from list
-        filtered_order = list(filter(
-            lambda x: x != rule_id,
-            self.order[:]
-        ))
-        # add rule id at new position
-        self.order = filtered_order[:new_i] + [rule_id] + filtered_order[new_i:]
-        return self.order
\ No newline at end of file
+        order = self.get_ordered_ids()
+        rule_i = self.get_position(rule_id)
+        new_i = order_i - 1 if rule_i > order_i else order_i
+        # move rule id before the rule now at the new position in the order
+        # without it, reading negative positions from the end like slice indexes
+        if new_i < 0:
+            new_i = max(0, len(order) - 1 + new_i)
+        before_i = new_i + 1 if new_i >= rule_i else new_i
+        self.rules.move(rule_id, before=order[before_i] if before_i < len(order) else None)
+        self.version += 1
+        return self.get_order()
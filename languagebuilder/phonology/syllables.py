@@ -1,12 +1,19 @@
 from .phonotactics import Phonotactics
-from uuid import uuid4
+from ..tools.collector import Collection
 from ..tools import redacc
+from array import array
 import random
 
 class Syllables():
     def __init__(self, phonology):
-        # map of syllable structures
-        self.syllables = {}
+        # map of syllable structures by integer id
+        self.syllables = Collection()
+        self.version = 0    # count of changes to syllables
+        # map of sounds tuple:is syllable shared across syllabified words,
+        # dropped when syllables or phonetics change
+        self.fragments = {}
+        self.fragments_version = None
+        self.longest = 0    # most slots in any one syllable
         # special syllable character abbreviations
         self.syllable_characters = {
             '_': "_",
@@ -117,9 +124,8 @@ class Syllables():
         # add created syllables to the map
         syllable_ids = []
         for vetted_structure in vetted_structures:
-            syllable_id = f"syllable-{uuid4()}"
-            self.syllables[syllable_id] = vetted_structure
-            syllable_ids.append(syllable_id)
+            syllable_ids.append(self.syllables.add(vetted_structure))
+        self.version += 1
 
         # return created syllable ids
         if len(syllable_ids) < 2:
@@ -143,10 +149,12 @@ class Syllables():
         
         # store the updated structure
         self.syllables[syllable_id] = new_structure
+        self.version += 1
         return syllable_id
 
     def remove(self, syllable_id):
         """Remove one syllable from the syllables map"""
+        self.version += 1
         return self.syllables.pop(syllable_id, None)
 
     def clear(self):
@@ -155,6 +163,7 @@ class Syllables():
         def read_cache():
             return syllables_cache
         self.syllables.clear()
+        self.version += 1
         return read_cache
 
     def is_syllable(self, syllable_fragment):
@@ -185,8 +194,8 @@ class Syllables():
 
     def count(self, sounds, minimally=False):
         """Count the number of syllables in a sound sample"""
-        syllables = self.syllabify_min(sounds) if minimally else self.syllabify(sounds)
-        if not isinstance(syllables, list):
+        syllables = self.syllabify_min(sounds) if minimally else self.split(self._vet_sounds(sounds))
+        if not syllables:
             raise ValueError(f"Could not count syllables - invalid syllables list {syllables}")
         return len(syllables)
 
@@ -202,16 +211,46 @@ class Syllables():
     #   - build out every letter right to however many syllables it can be a part of
     #   - compare potential non-overlapping syllables
     #   - return one possible non-overlapping split for the whole sample
-    def _find_left_syllable(self, sounds):
+    #
+    # Splits are found right to left: each position keeps the longest syllable
+    # starting there that leads to a full split of the rest. This picks the same
+    # split as trying the longest syllable first from the left and backtracking,
+    # but checks each fragment once. Checked fragments are remembered across words.
+    def refresh_fragments(self):
+        """Forget checked fragments if syllables or phonetics changed since checking"""
+        versions = (self.version, self.phonology.phonetics.version)
+        if self.fragments_version != versions:
+            self.fragments.clear()
+            self.fragments_version = versions
+            self.longest = max((len(syllable) for syllable in self.syllables.values()), default=0)
+
+    def split(self, sounds):
+        """Find the syllable end offsets splitting vetted sounds into whole
+        syllables, or None if they cannot be split"""
+        sounds = tuple(sounds)
         if not sounds:
-            return []
-        for i in reversed(range(len(sounds) + 1)):
-            if self.is_syllable(sounds[:i]):
-                syllabified_sounds = [sounds[:i]] + self._find_left_syllable(sounds[i:])
-                if None in syllabified_sounds:
+            return
+        self.refresh_fragments()
+        # next split offset after each start position, or None if no split
+        next_offsets = [None] * len(sounds) + [len(sounds)]
+        for start in reversed(range(len(sounds))):
+            for end in reversed(range(start + 1, min(len(sounds), start + self.longest) + 1)):
+                if next_offsets[end] is None:
                     continue
-                return syllabified_sounds
-        return [None]
+                fragment = sounds[start:end]
+                if fragment not in self.fragments:
+                    self.fragments[fragment] = self.is_syllable(fragment)
+                if self.fragments[fragment]:
+                    next_offsets[start] = end
+                    break
+        if next_offsets[0] is None:
+            return
+        offsets = array('H')
+        offset = 0
+        while offset < len(sounds):
+            offset = next_offsets[offset]
+            offsets.append(offset)
+        return offsets
 
     def syllabify(self, sounds):
         """Separate sounds into a list of syllables, linearly closing out one syllable
@@ -226,15 +265,31 @@ class Syllables():
         if not vetted_sample:
             raise ValueError(f"Invalid sounds in sample {sounds}")
 
-        # Loop through building maximally valid syllables from the left
-        syllabification = self._find_left_syllable(vetted_sample)
+        # Split into maximally valid syllables from the left
+        offsets = self.split(vetted_sample)
 
         # TODO: handle uncut or imperfectly cut samples
-        if not syllabification or None in syllabification:
+        if not offsets:
             print(f"Could not find valid syllable in {vetted_sample}")
             return
 
-        return syllabification
+        return [
+            vetted_sample[start:end]
+            for start, end in zip([0] + list(offsets), offsets)
+        ]
+
+    def syllabify_many(self, samples, offsets=False, executor=None, chunk_size=1000):
+        """Syllabify many sound lists, giving None for any that cannot be split.
+        Optionally return syllable end offsets instead of syllable lists, and
+        pass a concurrent.futures executor to split chunks of samples in a pool."""
+        samples = [list(sample) for sample in samples]
+        if executor is None:
+            return syllabify_chunk(self, samples, offsets)
+        chunks = [
+            executor.submit(syllabify_chunk, self, samples[i:i + chunk_size], offsets)
+            for i in range(0, len(samples), chunk_size)
+        ]
+        return [syllabification for chunk in chunks for syllabification in chunk.result()]
 
     def syllabify_min(self, sample):
         """Break sound sample into smallest possible syllables sequentially from
@@ -260,15 +315,15 @@ class Syllables():
         
         # filter possible syllable options
         possible_syllables = [
-            s for i, s in self.syllables.items()
+            (i, s) for i, s in self.syllables.items()
             if not filter_syllables or i in filter_syllables
         ]
 
         # Syllable Type: choose one syllable
-        syllable = random.choice(possible_syllables)
+        syllable_id, syllable = random.choice(possible_syllables)
 
         # Syllable Shape: fill out features for each element in the syllable
-        syllable_features = self.phonotactics.shape(syllable)
+        syllable_features = self.phonotactics.shape(syllable, structure_id=syllable_id)
 
         # Sound Shape: select a sound for each set of features
         syllable_sounds = [
@@ -280,4 +335,20 @@ class Syllables():
         ]
         
         return syllable_sounds
-    
\ No newline at end of file
+    
+
+def syllabify_chunk(syllables, samples, offsets=False):
+    """Syllabify a chunk of sound lists, kept at module level so process pools
+    can send it to workers"""
+    syllabifications = []
+    for sample in samples:
+        vetted_sample = syllables._vet_sounds(sample)
+        split_offsets = syllables.split(vetted_sample)
+        if split_offsets is None or offsets:
+            syllabifications.append(split_offsets)
+        else:
+            syllabifications.append([
+                vetted_sample[start:end]
+                for start, end in zip([0] + list(split_offsets), split_offsets)
+            ])
+    return syllabifications
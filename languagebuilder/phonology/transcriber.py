@@ -0,0 +1,113 @@
+import heapq
+
+# Read spellings back into sounds
+# - a trie holds every letter (including multigraphs like "th") stored for any
+#   phoneme, each ending node listing the phonemes that letter spells
+# - a spelling parses into letters the trie knows, and each letter into one of
+#   its phonemes, so one spelling can have many parses
+# - parses rank by fewest letters first, which prefers longest matches, then
+#   by how likely each letter is to spell its phoneme: the letter weight given
+#   to Phonemes, or an even share when the letter carries no weights
+# - the best parses of each remaining spelling are kept from the right end
+#   leftwards, so ranked parses come without listing every combination
+# - the trie is rebuilt when phonemes change
+class Transcriber():
+    def __init__(self, phonology):
+        # reference phonology for stored phonemes and letters
+        self.phonology = phonology
+
+        # trie as a list of nodes, each a map of character:next node index
+        self.nodes = [{}]
+        # node index:[(phoneme, chance the letter spells the phoneme)]
+        self.endings = {}
+        self.version = None
+
+    def compile(self):
+        """Build the letters trie if phonemes changed since the last build"""
+        if self.version == self.phonology.phonemes.version:
+            return
+        self.nodes = [{}]
+        self.endings = {}
+        # letter:{phoneme:weight}
+        letter_phonemes = {}
+        for ipa, phoneme in self.phonology.phonemes.get().items():
+            letter_weights = phoneme.get('letter_weights')
+            for letter in phoneme['letters']:
+                weight = letter_weights.get(letter, 0) if letter_weights else 1
+                letter_phonemes.setdefault(letter, {})[ipa] = weight
+        for letter, phonemes in letter_phonemes.items():
+            if not letter:
+                continue
+            node = 0
+            for character in letter:
+                if character not in self.nodes[node]:
+                    self.nodes[node][character] = len(self.nodes)
+                    self.nodes.append({})
+                node = self.nodes[node][character]
+            total = sum(phonemes.values())
+            self.endings[node] = sorted(
+                ((ipa, weight / total if total else 1 / len(phonemes)) for ipa, weight in phonemes.items()),
+                key=lambda ending: (-ending[1], ending[0])
+            )
+        self.version = self.phonology.phonemes.version
+
+    def match(self, spelling, start):
+        """List (end, phonemes) for every known letter starting at an index, longest first"""
+        matches = []
+        node = 0
+        for end in range(start, len(spelling)):
+            node = self.nodes[node].get(spelling[end])
+            if node is None:
+                break
+            if node in self.endings:
+                matches.append((end + 1, self.endings[node]))
+        return matches[::-1]
+
+    def parse(self, spelling, max_parses=10):
+        """Rank ways to read a spelling string or letters list as sounds, best
+        first, as maps of sound list, letters list and chance. Keep all parses
+        if max_parses is None."""
+        self.compile()
+        spelling = "".join(spelling)
+        if not spelling:
+            return []
+        # ranked parses of the spelling from each index, each as
+        # (letter count, negated chance, sounds, letters) so they sort best first
+        parses = [None] * len(spelling) + [[(0, -1.0, (), ())]]
+        for start in reversed(range(len(spelling))):
+            candidates = [
+                (count + 1, negated_chance * probability, (ipa,) + sounds, (spelling[start:end],) + letters)
+                for end, endings in self.match(spelling, start)
+                for ipa, probability in endings
+                for count, negated_chance, sounds, letters in parses[end]
+            ]
+            if max_parses is None:
+                parses[start] = sorted(candidates)
+            else:
+                parses[start] = heapq.nsmallest(max_parses, candidates)
+        return [
+            {
+                'sound': list(sounds),
+                'spelling': list(letters),
+                'chance': -negated_chance
+            }
+            for _, negated_chance, sounds, letters in parses[0]
+        ]
+
+    def transcribe(self, spelling):
+        """Read the best sounds for a spelling, or None if it cannot be read"""
+        parses = self.parse(spelling, max_parses=1)
+        return parses[0]['sound'] if parses else None
+
+    def transcribe_many(self, spellings):
+        """Read the best sounds for many spellings, reading repeated spellings once"""
+        self.compile()
+        transcriptions = {}
+        results = []
+        for spelling in spellings:
+            spelling = "".join(spelling)
+            if spelling not in transcriptions:
+                transcriptions[spelling] = self.transcribe(spelling)
+            sounds = transcriptions[spelling]
+            results.append(list(sounds) if sounds else None)
+        return results
@@ -0,0 +1,259 @@
+from ..tools.permutation import Permutation
+import math
+import random
+
+# Count and list the distinct words a phonology can build
+# - a word is a sequence of sounds filling a sequence of syllable structures,
+#   and different structure sequences can build the same sounds (CV.CV and
+#   CVC.V both build CVCV), so words are tracked as sets of possible parses
+# - a parse state is (syllables,) between syllables or (syllables, structure,
+#   slot) within one; a word state is the set of parse states its sounds allow
+# - sounds sharing the same slots move word states the same way, so states
+#   are stepped once per group of sounds rather than once per sound
+# - counting the words that can follow each state, memoized, gives the total
+#   count and maps each word to its index in lexicographic order and back
+# - this captures sound sequences before sound changes and spelling
+class WordSpace():
+    def __init__(self, phonology, length=1):
+        # reference phonology for syllables and inventory
+        self.phonology = phonology
+
+        # syllable count range
+        if isinstance(length, int):
+            self.min_syllables, self.max_syllables = length, length
+        elif isinstance(length, (list, tuple)) and len(length) == 2:
+            self.min_syllables, self.max_syllables = length
+        else:
+            raise ValueError(f"WordSpace expected syllable count or (min, max) range not {length}")
+        if self.min_syllables < 1 or self.max_syllables < self.min_syllables:
+            raise ValueError(f"WordSpace found invalid syllable count range {length}")
+
+        # syllable structures as candidate sound sets per slot, skipping slots
+        # without any sounds in the inventory just as build_word does
+        inventory = self.phonology.inventory()
+        self.structures = []
+        for structure in self.phonology.syllables.get().values():
+            slots = [
+                frozenset(self.phonology.phonetics.get_ipa(feature_set, filter_phonemes=inventory))
+                for feature_set in structure
+            ]
+            slots = [slot for slot in slots if slot]
+            if slots:
+                self.structures.append(slots)
+
+        # sounds in lexicographic order, each with the slots it can fill
+        self.symbols = sorted(set().union(*(slot for slots in self.structures for slot in slots)))
+        self.slot_groups = {
+            symbol: frozenset(
+                (structure_index, slot_index)
+                for structure_index, slots in enumerate(self.structures)
+                for slot_index, slot in enumerate(slots)
+                if symbol in slot
+            )
+            for symbol in self.symbols
+        }
+        # slot group:number of sounds sharing it
+        self.group_sizes = {}
+        for slot_group in self.slot_groups.values():
+            self.group_sizes[slot_group] = self.group_sizes.get(slot_group, 0) + 1
+
+        # word state before any sounds
+        self.start = frozenset([(0,)])
+
+        # memoized (word state, slot group):next word state and word state:words count
+        self.steps = {}
+        self.counts = {}
+
+    def advance(self, syllable_count, structure_index, slot_index):
+        """Make the parse state after filling a slot, closing the syllable if full"""
+        if slot_index == len(self.structures[structure_index]):
+            return (syllable_count + 1,)
+        return (syllable_count, structure_index, slot_index)
+
+    def step(self, state, slot_group):
+        """Find the word state after adding a sound able to fill the slot group"""
+        key = (state, slot_group)
+        if key in self.steps:
+            return self.steps[key]
+        next_state = set()
+        for parse in state:
+            # between syllables - start any structure whose first slot fits
+            if len(parse) == 1:
+                if parse[0] >= self.max_syllables:
+                    continue
+                for structure_index in range(len(self.structures)):
+                    if (structure_index, 0) in slot_group:
+                        next_state.add(self.advance(parse[0], structure_index, 1))
+            # within a syllable - fill the next slot if it fits
+            elif (parse[1], parse[2]) in slot_group:
+                next_state.add(self.advance(parse[0], parse[1], parse[2] + 1))
+        self.steps[key] = frozenset(next_state)
+        return self.steps[key]
+
+    def step_symbol(self, state, symbol):
+        """Find the word state after adding a sound, or an empty state if it cannot follow"""
+        slot_group = self.slot_groups.get(symbol)
+        return self.step(state, slot_group) if slot_group else frozenset()
+
+    def is_word(self, state):
+        """Check if a word state can end as a word with enough syllables"""
+        return any(
+            len(parse) == 1 and self.min_syllables <= parse[0] <= self.max_syllables
+            for parse in state
+        )
+
+    def count_from(self, state):
+        """Count distinct words starting with sounds that reach a word state,
+        counting the sounds themselves if they already make a word"""
+        if state in self.counts:
+            return self.counts[state]
+        count = 1 if self.is_word(state) else 0
+        for slot_group, group_size in self.group_sizes.items():
+            next_state = self.step(state, slot_group)
+            if next_state:
+                count += group_size * self.count_from(next_state)
+        self.counts[state] = count
+        return count
+
+    def count(self):
+        """Count the distinct sound sequences in the word space"""
+        return self.count_from(self.start)
+
+    def contains(self, sounds):
+        """Check if the phonology can build a sound sequence in this word space"""
+        state = self.start
+        for sound in sounds:
+            state = self.step_symbol(state, sound)
+            if not state:
+                return False
+        return self.is_word(state)
+
+    def index_of(self, sounds):
+        """Find a word's position in lexicographic order, or None if not in the space"""
+        index = 0
+        state = self.start
+        for sound in sounds:
+            # words ending here, then words continuing with earlier sounds, come first
+            index += 1 if self.is_word(state) else 0
+            for symbol in self.symbols:
+                if symbol == sound:
+                    break
+                next_state = self.step_symbol(state, symbol)
+                if next_state:
+                    index += self.count_from(next_state)
+            state = self.step_symbol(state, sound)
+            if not state:
+                return
+        return index if self.is_word(state) else None
+
+    def word_at(self, index):
+        """Read the word at a position in lexicographic order"""
+        if not 0 <= index < self.count():
+            raise IndexError(f"WordSpace index {index} out of range for {self.count()} words")
+        sounds = []
+        state = self.start
+        while True:
+            if self.is_word(state):
+                if index == 0:
+                    return sounds
+                index -= 1
+            for symbol in self.symbols:
+                next_state = self.step_symbol(state, symbol)
+                if not next_state:
+                    continue
+                count = self.count_from(next_state)
+                if index < count:
+                    sounds.append(symbol)
+                    state = next_state
+                    break
+                index -= count
+
+    def words(self, shuffle=False):
+        """Lazily list every word in lexicographic order, or once each in a random
+        order walking indexes with a random step coprime to the count"""
+        if shuffle:
+            count = self.count()
+            if not count:
+                return
+            step = random.randrange(1, count) if count > 1 else 1
+            while math.gcd(step, count) != 1:
+                step = random.randrange(1, count)
+            offset = random.randrange(count)
+            for i in range(count):
+                yield self.word_at((offset + i * step) % count)
+            return
+
+        # depth-first through sounds in order, each word before its continuations
+        yield from self.walk(self.start, [])
+
+    def walk(self, state, sounds):
+        """List words continuing sounds that reached a word state"""
+        if self.is_word(state):
+            yield list(sounds)
+        for symbol in self.symbols:
+            next_state = self.step_symbol(state, symbol)
+            if next_state and self.count_from(next_state):
+                sounds.append(symbol)
+                yield from self.walk(next_state, sounds)
+                sounds.pop()
+
+    def coverage(self, words):
+        """Measure the share of the word space used by a pool of sound sequences"""
+        count = self.count()
+        if not count:
+            return 0.0
+        used = set(tuple(sounds) for sounds in words if self.contains(sounds))
+        return len(used) / count
+
+    def sampler(self, key, shard=0, shards=1, position=None):
+        """Read a sampler listing words once each in a keyed random order. Shards
+        with the same key and phonology never list the same word."""
+        return WordSampler(self, key, shard=shard, shards=shards, position=position)
+
+# Sample a word space without replacement in a keyed random order
+# - a keyed permutation maps each position to a word index, so a word is
+#   never issued twice without storing the words already issued
+# - shards split the positions into disjoint ranges, letting processes
+#   sample the same space at once without coordinating
+# - the only changing state is the next position, which can be saved and
+#   passed back in to resume, provided the key and phonology are unchanged
+class WordSampler():
+    def __init__(self, word_space, key, shard=0, shards=1, position=None):
+        self.word_space = word_space
+        count = word_space.count()
+        if not count:
+            raise ValueError("WordSampler found no words in the word space")
+        if not 0 <= shard < shards:
+            raise ValueError(f"WordSampler expected shard from 0 to {shards - 1} not {shard}")
+        self.permutation = Permutation(count, key=key)
+
+        # this shard's range of positions in the permutation
+        self.start = count * shard // shards
+        self.stop = count * (shard + 1) // shards
+        self.position = self.start if position is None else position
+        if not self.start <= self.position <= self.stop:
+            raise ValueError(f"WordSampler position {position} is outside shard positions {self.start} to {self.stop}")
+
+    def remaining(self):
+        """Count words left to sample in this shard"""
+        return self.stop - self.position
+
+    def word_at(self, position):
+        """Read the word at a position in the keyed order"""
+        return self.word_space.word_at(self.permutation.forward(position))
+
+    def position_of(self, sounds):
+        """Find the keyed position of a word, or None if not in the word space"""
+        index = self.word_space.index_of(sounds)
+        return None if index is None else self.permutation.backward(index)
+
+    def sample(self, count=1):
+        """Take the next words in this shard, fewer if the shard runs out"""
+        stop = min(self.stop, self.position + count)
+        words = [self.word_at(position) for position in range(self.position, stop)]
+        self.position = stop
+        return words
+
+    def __iter__(self):
+        while self.position < self.stop:
+            yield self.sample()[0]
@@ -1,8 +1,8 @@
-from uuid import uuid4
+from ..tools.collector import Collection
 
 class Corpus:
     def __init__(self):
-        self.corpus = {}    # example entry storage - see add() for entry shape
+        self.corpus = Collection()  # example entry storage by integer id - see add() for entry shape
 
     def add(self, sound="", change="", spelling="", definition="", exponents=None, properties=None, pos=None):
         """Create corpus entry containing this example, including three possible levels
@@ -18,16 +18,15 @@ class Corpus:
         if pos:
             pos = set([pos]) if isinstance(pos, str) else set(pos)
         # add entry to corpus
-        entry_id = f"corpus-{uuid4()}"
-        self.corpus[entry_id] = {
+        entry_id = self.corpus.add({
             'sound': sound,             # list of strings
             'change': change,           # list of strings
             'spelling': spelling,       # list of strings
             'definition': definition,   # string
-            'exponents': exponents,     # list of string ids
+            'exponents': exponents,     # list of exponent ids
             'properties': properties,   # dict
             'pos': pos                  # set of strings
-        }
+        })
         return entry_id
 
     def get(self, entry_id):
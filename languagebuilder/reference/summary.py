@@ -1,7 +1,19 @@
+# Display summaries of the language
+# - exponent summaries are cached per exponent and recomputed only for exponents
+#   whose details changed since they were summarized
+# - all cached summaries are dropped when phonetics, phonemes or rules change,
+#   since sound changes and spellings depend on them
+# - exponents are spelled deterministically so the summary stays the same
+#   between renders
 class Summary:
     def __init__(self, language):
         self.language = language
 
+        # exponent id:(exponent details fingerprint, spell after change, summary)
+        self.exponent_summaries = {}
+        # phonology versions and rule order the cached summaries were made with
+        self.summary_versions = None
+
     def print_inventory(self):
         phonemes = self.language.phonology.phonemes.get()
         print("Phonemes")
@@ -58,113 +70,120 @@ class Summary:
 
         return pieces
 
-    def summarize_exponent(self, exponent_id, spell_after_change=True):
-        exponent = self.language.grammar.exponents.get(exponent_id)
-        # get sounds and spellings for grammatical pieces
-        pre_sound = exponent['pre']
-        mid_sound = exponent['mid']
-        post_sound = exponent['post']
-        pre_change = self.language.phonology.apply_rules(pre_sound)
-        mid_change = self.language.phonology.apply_rules(mid_sound)
-        post_change = self.language.phonology.apply_rules(post_sound)
-        pre_spelling = self.language.phonology.spell(
-            pre_change if spell_after_change else pre_sound,
-            fallback_phonemes=pre_sound
-        )
-        mid_spelling = self.language.phonology.spell(
-            mid_change if spell_after_change else mid_sound,
-            mid_sound
-        )
-        post_spelling = self.language.phonology.spell(
-            post_change if spell_after_change else post_sound,
-            post_sound
-        )
-        definition = self.language.grammar.autodefine(exponent_id)
-
-        # string pieces together
-        sound = self.combine_exponent_pieces(
-            pre_sound,
-            mid_sound,
-            post_sound,
-            bound=exponent['bound']
+    def read_versions(self):
+        """Read what cached exponent summaries depend on in the phonology"""
+        phonology = self.language.phonology
+        return (
+            self.language.phonetics.version,
+            phonology.phonemes.version,
+            phonology.rules.version,
+            phonology.rules.get_ordered_ids()
         )
-        change = self.combine_exponent_pieces(
-            pre_change,
-            mid_change,
-            post_change,
-            bound=exponent['bound']
-        )
-        spelling = self.combine_exponent_pieces(
-            pre_spelling,
-            mid_spelling,
-            post_spelling,
-            bound=exponent['bound']
+
+    def refresh_exponents(self, exponent_ids, spell_after_change=True):
+        """Summarize exponents not yet summarized or changed since summarized"""
+        versions = self.read_versions()
+        if self.summary_versions != versions:
+            self.exponent_summaries = {}
+            self.summary_versions = versions
+
+        # find exponents missing or outdated in the cache
+        exponents = self.language.grammar.exponents
+        stale = []
+        for exponent_id in exponent_ids:
+            exponent = exponents.get(exponent_id)
+            if not exponent:
+                continue
+            fingerprint = repr(exponent)
+            cached = self.exponent_summaries.get(exponent_id)
+            if not cached or cached[0] != fingerprint or cached[1] != spell_after_change:
+                stale.append((exponent_id, exponent, fingerprint))
+        if not stale:
+            return
+
+        # change and spell pieces of all outdated exponents in one batch
+        sounds = [
+            exponent[piece] or []
+            for _, exponent, _ in stale
+            for piece in ('pre', 'mid', 'post')
+        ]
+        changes = self.language.phonology.apply_rules_many(sounds)
+        spellings = self.language.phonology.spell_many(
+            changes if spell_after_change else sounds,
+            fallback_words=sounds,
+            deterministic=True
         )
+        for i, (exponent_id, exponent, fingerprint) in enumerate(stale):
+            pieces = slice(i * 3, i * 3 + 3)
+            summary = {
+                'id': exponent_id,
+                # string pieces together
+                'sound': self.combine_exponent_pieces(*sounds[pieces], bound=exponent['bound']),
+                'change': self.combine_exponent_pieces(*changes[pieces], bound=exponent['bound']),
+                'spelling': self.combine_exponent_pieces(*spellings[pieces], bound=exponent['bound']),
+                'definition': self.language.grammar.autodefine(exponent_id),
+                'properties': exponent['properties'],
+                'bound': exponent['bound'],
+                'pos': exponent['pos']
+            }
+            self.exponent_summaries[exponent_id] = (fingerprint, spell_after_change, summary)
 
-        return {
-            'id': exponent_id,
-            'sound': sound,
-            'change': change,
-            'spelling': spelling,
-            'definition': definition,
-            'properties': exponent['properties'],
-            'bound': exponent['bound'],
-            'pos': exponent['pos']
-        }
+    def summarize_exponent(self, exponent_id, spell_after_change=True):
+        """Summarize one exponent's sounds, changed sounds, spelling and definition"""
+        if not self.language.grammar.exponents.get(exponent_id):
+            print(f"Summary summarize_exponent failed - unknown exponent {exponent_id}")
+            return
+        self.refresh_exponents([exponent_id], spell_after_change=spell_after_change)
+        return self.exponent_summaries[exponent_id][2]
 
     def summarize_exponents(self, spell_after_change=True):
-        summary = {}
-        for exponent_id in self.language.grammar.exponents.get():
-            summary[exponent_id] = self.summarize_exponent(exponent_id)
-        return summary
+        """Summarize every exponent as a map of exponent id:summary"""
+        exponent_ids = list(self.language.grammar.exponents.get())
+        self.refresh_exponents(exponent_ids, spell_after_change=spell_after_change)
+        # forget removed exponents
+        if len(self.exponent_summaries) > len(exponent_ids):
+            self.exponent_summaries = {
+                exponent_id: self.exponent_summaries[exponent_id]
+                for exponent_id in exponent_ids
+            }
+        return {
+            exponent_id: self.exponent_summaries[exponent_id][2]
+            for exponent_id in exponent_ids
+        }
 
     def print_grammar(self, spell_after_change=True, print_display=True):
         """Build a display text summary of the language's grammatical words and
         word pieces, return the text and optionally log the text out."""
         exponents = self.summarize_exponents(spell_after_change=spell_after_change)
 
-        # build map of exponent ids nested under pos:category:grammemes
+        # build map of exponent ids nested under pos:category:[ids]
         # NOTE: None entry for zero word class    
         exponents_by_pos = {}
         for exponent_id, exponent_entry in exponents.items():
-            exponent_pos = exponent_entry['pos'] if exponent_entry['pos'] else None
             # TODO: place each exponent once only
             #   - make optimal decisions about multiproperty exponents
             #   - determine which property should be top
             #   - nest others below that one
-            exponents_by_pos.setdefault(exponent_pos, {})
-            for category in exponent_entry['properties']:
-                exponents_by_pos[exponent_pos].setdefault(category, {})
-                for grammeme in exponent_entry['properties'][category]:
-                    exponents_by_pos[exponent_pos][category].setdefault(grammeme, set())
-                    exponents_by_pos[exponent_pos][category][grammeme].add(exponent_id)
-
-        # use exponents by word class to print display text
-        display = "-- Grammar Summary --"
-        for pos in exponents_by_pos:
-            if not pos:
-                display += "General:\n"
-            else:
-                display += f"{pos}:\n"
-            for category in exponents_by_pos[pos]:
+            for exponent_pos in sorted(exponent_entry['pos']) or [None]:
+                categories = exponents_by_pos.setdefault(exponent_pos, {})
+                for category in exponent_entry['properties']:
+                    categories.setdefault(category, []).append(exponent_id)
+
+        # use exponents by word class to collect display lines
+        lines = ["-- Grammar Summary --"]
+        for pos, categories in exponents_by_pos.items():
+            lines.append(f"{pos}:" if pos else "General:")
+            for category, exponent_ids in categories.items():
                 # split affixes from adpositions
-                affixes = set()
-                adpositions = set()
-                for exponent_id in exponents_by_pos[pos][category].values():
-                    if exponents[exponent_id]['bound']:
-                        affixes.add(exponent_id)
-                    else:
-                        adpositions.add(exponent_id)
-                display += f"{category} affixes:\n"
-                for affix_id in affixes:
-                    exponent = exponents[affix_id]
-                    display += f"{exponent['spelling']}\t{exponent['definition']}\n"
-                display += f"{category} adpositions/particles:"
-                for adposition_id in adpositions:
-                    exponent = exponents[adposition_id]
-                    display += f"{exponent['spelling']}\t{exponent['definition']}\n"
-        
-        display += "-- End Grammar Summary --"
+                affixes = [exponents[exponent_id] for exponent_id in exponent_ids if exponents[exponent_id]['bound']]
+                adpositions = [exponents[exponent_id] for exponent_id in exponent_ids if not exponents[exponent_id]['bound']]
+                lines.append(f"{category} affixes:")
+                lines += [f"{''.join(exponent['spelling'])}\t{exponent['definition']}" for exponent in affixes]
+                lines.append(f"{category} adpositions/particles:")
+                lines += [f"{''.join(exponent['spelling'])}\t{exponent['definition']}" for exponent in adpositions]
+        lines.append("-- End Grammar Summary --")
+
+        display = "\n".join(lines)
         print_display and print(display)
 
         return display
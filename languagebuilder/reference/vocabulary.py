@@ -1,5 +1,7 @@
 from ..tools import string_list
 from ..tools import flat_list
+from ..tools.overlay import peek
+from array import array
 
 # NOTE: vocabulary manages a map of {headword: [entries], }
 # - Headwords have a spelling that each entry for a headword shares
@@ -10,6 +12,14 @@ from ..tools import flat_list
 #   - vocabulary defines and gives sounds, spellings for headwords
 #   - grammatical pieces are meant to be used alongside base headwords
 
+# NOTE: entry syllables are stored compactly as an array of syllable end offsets
+#   into the entry sounds, e.g. array('H', [2, 5]) for ['k', 'a', 't', 'a', 'k']
+#   - read them back as lists of sounds with get_syllables
+
+# NOTE: a forked language's vocabulary is an overlay on its parent's, copying
+#   entries on indexed access - read-only methods go through read_entries so
+#   that only changed headwords are copied into the daughter
+
 # TODO: consider attributes as arrays of options
 # String vs array:
 #   - should noun "ache" vs verb "ache" be separate entries or options under one entry?
@@ -18,6 +28,19 @@ from ..tools import flat_list
 class Vocabulary():
     def __init__(self):
         self.vocabulary = {}         # map of headword:[entries]
+        self.own_version = 0         # count of changes to entry sounds or positions for invalidating caches
+        self.parent = None           # vocabulary of the language this one was forked from
+
+    @property
+    def version(self):
+        """Count changes to entries here and in any parent vocabulary showing
+        through this one, so caches keyed on it also follow the parent"""
+        return self.own_version + (self.parent.version if self.parent else 0)
+
+    def read_entries(self, headword):
+        """Read the entries list for a headword without copying it out of a
+        parent language's vocabulary, or None if unknown. Do not mutate it."""
+        return peek(self.vocabulary, headword)
 
     def is_word(self, word):
         """Check if entries exist for a spelled word"""
@@ -27,7 +50,7 @@ class Vocabulary():
 
     def is_entry(self, word, index=0):
         """Check if an indexed entry exists for the spelled word"""
-        return self.is_word(word) and index < len(self.vocabulary[word])
+        return self.is_word(word) and index < len(self.read_entries(word))
 
     # TODO: exact match (see _search_definitions)
     def search(self, spelling=None, keywords=None, sound=None, change=None, exact=False, max_results=10):
@@ -48,7 +71,8 @@ class Vocabulary():
             return matching_definitions
 
         # list sequences of letters and sounds
-        spelling = string_list.string_listify(spelling) if spelling else []
+        # compare spellings as whole strings since letters may be multigraphs
+        spelling = "".join(string_list.string_listify(spelling)) if spelling else ""
         sound = string_list.string_listify(sound) if sound else []
         change = string_list.string_listify(change) if change else []
 
@@ -62,7 +86,7 @@ class Vocabulary():
                 compared = {
                     'sound': not sound or sound == entry['sound'],
                     'change': not change or change == entry['change'],
-                    'spelling': not spelling or spelling == entry['spelling']
+                    'spelling': not spelling or spelling == "".join(entry['spelling'])
                 }
                 if False not in compared.values():
                     matches.append((headword, i))
@@ -84,8 +108,8 @@ class Vocabulary():
         scored_matches = []
 
         # traverse entries searching for relevant matches
-        for headword in self.vocabulary:
-            for entry_index, entry in enumerate(self.vocabulary[headword]):
+        for headword, entries in self.vocabulary.items():
+            for entry_index, entry in enumerate(entries):
                 # definitions are stored under headword entries inside the dictionary
                 definition = entry['definition']
                 # keep track of keyword matches
@@ -127,15 +151,15 @@ class Vocabulary():
             print (f"Dictionary lookup failed - unknown or invalid headword {headword}")
             return
         if entry_index is None:
-            return self.vocabulary[headword]
-        return self.vocabulary[headword][entry_index]
+            return self.read_entries(headword)
+        return self.read_entries(headword)[entry_index]
 
     def define(self, headword, entry_index=0):
         """Read the definition for a single entry under one headword"""
         if not self.is_entry(headword, index=entry_index):
             print(f"Failed to define invalid headword {headword} with entry index {entry_index}")
             return
-        return self.vocabulary[headword][entry_index]['definition']
+        return self.read_entries(headword)[entry_index]['definition']
 
     def add(self, sound=None, spelling=None, change=None, syllables=None, midpoint=None, definition=None, pos=None):
         """Create a dictionary entry and list it under the spelled headword"""
@@ -164,9 +188,9 @@ class Vocabulary():
             # representation of entry in sounds
             'sound': sound,
             # sound representation after sound changes applied
-            'change': change if isinstance(change, str) else "",
+            'change': (string_list.string_listify(change, True) or "") if change else "",
             # syllabification initially done automatically by phonology but adjustable
-            'syllables': syllables if syllables else [],
+            'syllables': self.compact_syllables(syllables),
             # passed-in definition
             'definition': definition if isinstance(definition, str) else "",
             # place where word may be split (used for infixes)
@@ -176,6 +200,7 @@ class Vocabulary():
         }
         # structure lists of entries (homographs) per spelling
         self.vocabulary.setdefault(headword, []).append(entry)
+        self.own_version += 1
         # return entry lookup format
         return (headword, len(self.vocabulary[headword])-1)
 
@@ -195,6 +220,8 @@ class Vocabulary():
             spelling = string_list.string_listify(spelling, True)
         if change:
             change = string_list.string_listify(change, True)
+        if syllables:
+            syllables = self.compact_syllables(syllables)
     
         # modifications adding any new strings
         modified_attributes = {
@@ -219,6 +246,7 @@ class Vocabulary():
         # replace same-spelling entry
         else:
             self.vocabulary[headword][entry_index] = modified_entry
+        self.own_version += 1
 
         return ((spelling, headword)[not spelling], entry_index)
 
@@ -243,9 +271,37 @@ class Vocabulary():
         """Provide a custom syllabification. Caution - overwrites syllabification
         automatically applied by the phonology!"""
         if self.is_entry(headword, index=entry_index):
-            self.vocabulary[headword][entry_index]['syllables'] = syllabification
+            self.vocabulary[headword][entry_index]['syllables'] = self.compact_syllables(syllabification)
         return self.lookup(headword, entry_index)
 
+    def compact_syllables(self, syllables):
+        """Turn a list of syllable sound lists, or syllable end offsets, into an
+        array of syllable end offsets"""
+        if not syllables:
+            return array('H')
+        if isinstance(syllables, array):
+            return syllables
+        if all(isinstance(offset, int) for offset in syllables):
+            return array('H', syllables)
+        offsets = array('H')
+        offset = 0
+        for syllable in syllables:
+            offset += len(syllable)
+            offsets.append(offset)
+        return offsets
+
+    def get_syllables(self, headword, entry_index=0):
+        """Read the syllables of one entry as lists of sounds"""
+        if not self.is_entry(headword, index=entry_index):
+            print(f"Failed to get syllables for invalid entry {headword},{entry_index}")
+            return
+        entry = self.read_entries(headword)[entry_index]
+        offsets = entry['syllables']
+        return [
+            entry['sound'][start:end]
+            for start, end in zip([0] + list(offsets), offsets)
+        ]
+
     def redefine(self, headword, entry_index=0, definition=""):
         """Change the definition of one entry under a spelled headword"""
         if not self.is_entry(headword, index=entry_index):
@@ -262,6 +318,7 @@ class Vocabulary():
         if not self.is_entry(headword, index=entry_index):
             print(f"Remove failed - unrecognized entry index {entry_index} for headword {headword}")
             return
+        self.own_version += 1
         return self.vocabulary[headword].pop(entry_index)
 
     def remove_headword(self, headword):
@@ -270,4 +327,5 @@ class Vocabulary():
         if not self.is_word(headword):
             print(f"Remove - unknown headword {headword}")
             return
+        self.own_version += 1
         return self.vocabulary.pop(headword)
@@ -0,0 +1,49 @@
+from .server import GenerationServer
+import argparse
+import asyncio
+import pickle
+import sys
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m languagebuilder.server",
+        description="Serve generate, attach, translate and search requests as JSON lines over TCP"
+    )
+    parser.add_argument("languages", nargs="+", help="language files saved with the command line, as path or name=path")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8642, help="port to listen on")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU, 0 to run in process)")
+    parser.add_argument("--batch-size", type=int, default=16, help="most requests sent to a worker at once")
+    parser.add_argument("--batch-delay", type=float, default=0.005, help="seconds to wait for a batch to fill")
+    parser.add_argument("--queue-size", type=int, default=256, help="queued requests before connections stop being read")
+    return parser.parse_args(args)
+
+def load_languages(language_paths):
+    """Read name=path or path arguments into a map of name:Language"""
+    languages = {}
+    for language_path in language_paths:
+        name, _, path = language_path.rpartition("=")
+        with open(path, "rb") as language_file:
+            languages[name or path] = pickle.load(language_file)
+    return languages
+
+def main(args=None):
+    options = parse_args(args)
+    server = GenerationServer(
+        load_languages(options.languages),
+        host=options.host,
+        port=options.port,
+        workers=options.workers,
+        batch_size=options.batch_size,
+        batch_delay=options.batch_delay,
+        queue_size=options.queue_size
+    )
+    print(f"Serving {', '.join(server.snapshots)} on {options.host}:{options.port}", file=sys.stderr)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
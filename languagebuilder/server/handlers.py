@@ -0,0 +1,112 @@
+import contextlib
+import os
+import pickle
+import random
+
+# Worker side of the generation server
+# - each worker loads pickled language snapshots once when it starts
+# - requests arrive in batches and each one runs on its named snapshot
+# - a request seed makes its result repeatable on any worker
+# - snapshots are read-only for requests: generated words are not stored
+#   and units attached during a batch are removed from the corpus after it
+
+# language name:Language snapshots loaded in this worker
+languages = {}
+
+def load_snapshots(snapshots):
+    """Unpickle language snapshots into this worker. Used as the pool initializer."""
+    languages.clear()
+    for name, snapshot in snapshots.items():
+        languages[name] = pickle.loads(snapshot)
+
+def vet_properties(properties):
+    """Turn JSON category:grammemes lists into the grammar's category:grammemes sets"""
+    if not properties:
+        return None
+    if not isinstance(properties, dict):
+        raise TypeError(f"Expected properties map not {properties}")
+    return {
+        category: set([grammemes] if isinstance(grammemes, str) else grammemes)
+        for category, grammemes in properties.items()
+    }
+
+def generate(language, length=None, count=1, spell_after_change=True):
+    """Build words without storing them in the snapshot's vocabulary"""
+    words = []
+    for _ in range(count):
+        word = language.phonology.build_word(
+            length=language.decide_length(length),
+            spell_after_change=spell_after_change
+        )
+        word['syllables'] = language.phonology.syllables.syllabify(word['sound'])
+        words.append(word)
+    return words
+
+def attach(language, base="", entry_index=None, properties=None, word_classes=None):
+    return language.attach(
+        base=base,
+        entry_index=entry_index,
+        properties=vet_properties(properties),
+        word_classes=word_classes
+    )
+
+def translate(language, definition="", properties=None, word_class=None):
+    return language.translate(
+        definition,
+        properties=vet_properties(properties),
+        word_class=word_class
+    )
+
+def search(language, spelling=None, keywords=None, sound=None, change=None, exact=False, max_results=10):
+    """Find vocabulary entries, returning each entry with its lookup pair"""
+    matches = language.vocabulary.search(
+        spelling=spelling,
+        keywords=keywords,
+        sound=sound,
+        change=change,
+        exact=exact,
+        max_results=max_results
+    ) or []
+    return [
+        dict(language.vocabulary.lookup(headword, entry_index), headword=headword, entry_index=entry_index)
+        for headword, entry_index in matches
+    ]
+
+# request method name -> handler taking a language and request params
+methods = {
+    'generate': generate,
+    'attach': attach,
+    'translate': translate,
+    'search': search
+}
+
+def run_request(request):
+    """Run one request map with id, method, params and optional language and seed"""
+    method = methods.get(request.get('method'))
+    if not method:
+        raise ValueError(f"Unknown method {request.get('method')}")
+    name = request.get('language') or next(iter(languages), None)
+    language = languages.get(name)
+    if not language:
+        raise ValueError(f"Unknown language {name}")
+    # seed per request so results do not depend on earlier requests in the worker
+    random.seed(request.get('seed'))
+    return method(language, **(request.get('params') or {}))
+
+def run_batch(requests):
+    """Run a batch of requests, returning one response map per request"""
+    responses = []
+    # first corpus id each language will hand out during this batch
+    first_ids = {name: language.corpus.corpus.next_id for name, language in languages.items()}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for request in requests:
+            try:
+                responses.append({'id': request.get('id'), 'result': run_request(request)})
+            except Exception as error:
+                responses.append({'id': request.get('id'), 'error': f"{type(error).__name__}: {error}"})
+        # keep snapshots unchanged between batches
+        for name, language in languages.items():
+            corpus = language.corpus.corpus
+            for entry_id in range(first_ids[name], corpus.next_id):
+                corpus.pop(entry_id, None)
+    return responses
@@ -0,0 +1,183 @@
+from . import handlers
+from array import array
+import asyncio
+import concurrent.futures
+import json
+import os
+import pickle
+
+# Serve language requests as JSON lines over TCP
+# - each request line is a map with id, method, params and optional language
+#   and seed, or a list of such maps; each response line is a map with the
+#   request id and either a result or an error
+# - requests wait in a bounded queue, so a full queue stops reading from
+#   connections until workers catch up
+# - queued requests are grouped into batches for the worker pool, sending a
+#   batch as soon as it is full or once the batch delay has passed
+# - workers are processes holding preloaded language snapshots, or a single
+#   in-process thread when workers is 0
+class GenerationServer():
+    def __init__(self, languages, host="127.0.0.1", port=0, workers=None, batch_size=16, batch_delay=0.005, queue_size=256, max_batches=None):
+        # language name:pickled snapshot sent to each worker
+        self.snapshots = {
+            name: pickle.dumps(language, protocol=pickle.HIGHEST_PROTOCOL)
+            for name, language in languages.items()
+        }
+        if not self.snapshots:
+            raise ValueError("GenerationServer expected at least one language")
+
+        # connection settings - port 0 picks any free port
+        self.host = host
+        self.port = port
+
+        # worker pool and batching settings
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.queue_size = queue_size
+        self.max_batches = max_batches
+
+        # running state set on start
+        self.executor = None
+        self.queue = None
+        self.batch_slots = None
+        self.batcher = None
+        self.server = None
+
+    async def start(self):
+        """Start the worker pool, batcher and TCP listener"""
+        if self.workers == 0:
+            handlers.load_snapshots(self.snapshots)
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+            worker_count = 1
+        else:
+            worker_count = self.workers or os.cpu_count() or 1
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=worker_count,
+                initializer=handlers.load_snapshots,
+                initargs=(self.snapshots,)
+            )
+        # keep every worker busy with one batch waiting behind it
+        self.batch_slots = asyncio.Semaphore(self.max_batches or worker_count * 2)
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.batcher = asyncio.ensure_future(self.batch_requests())
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        """Stop listening, cancel batching and shut down the worker pool"""
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.batcher:
+            self.batcher.cancel()
+            try:
+                await self.batcher
+            except asyncio.CancelledError:
+                pass
+        if self.executor:
+            self.executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exception_info):
+        await self.close()
+
+    async def serve_forever(self):
+        await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+
+    async def handle_connection(self, reader, writer):
+        """Read request lines from a connection and write back response lines as
+        they finish, which may be out of request order"""
+        loop = asyncio.get_running_loop()
+        pending = set()
+        write_lock = asyncio.Lock()
+
+        async def write_line(response):
+            async with write_lock:
+                writer.write(json.dumps(response, default=format_json).encode() + b"\n")
+                await writer.drain()
+
+        async def respond(response):
+            await write_line(await response)
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    requests = json.loads(line)
+                except ValueError as error:
+                    await write_line({'id': None, 'error': f"Invalid JSON: {error}"})
+                    continue
+                for request in requests if isinstance(requests, list) else [requests]:
+                    if not isinstance(request, dict):
+                        await write_line({'id': None, 'error': f"Expected request map not {request}"})
+                        continue
+                    response = loop.create_future()
+                    # stops reading from the connection while the queue is full
+                    await self.queue.put((request, response))
+                    task = asyncio.ensure_future(respond(response))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+        except (ConnectionError, asyncio.CancelledError):
+            for task in pending:
+                task.cancel()
+        finally:
+            writer.close()
+
+    async def batch_requests(self):
+        """Group queued requests into batches and dispatch them to the workers"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_delay
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # hold batches back while every slot is busy
+            await self.batch_slots.acquire()
+            asyncio.ensure_future(self.dispatch(batch))
+
+    async def dispatch(self, batch):
+        """Run one batch in the worker pool and resolve each request's response"""
+        try:
+            responses = await asyncio.get_running_loop().run_in_executor(
+                self.executor,
+                handlers.run_batch,
+                [request for request, _ in batch]
+            )
+        except Exception as error:
+            responses = [
+                {'id': request.get('id'), 'error': f"{type(error).__name__}: {error}"}
+                for request, _ in batch
+            ]
+        finally:
+            self.batch_slots.release()
+        for (_, response), result in zip(batch, responses):
+            if not response.done():
+                response.set_result(result)
+
+def format_json(value):
+    """Write sets within responses as sorted lists and arrays as lists"""
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, array):
+        return list(value)
+    raise TypeError(f"Cannot write {type(value).__name__} as JSON")
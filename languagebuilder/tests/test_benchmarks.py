@@ -0,0 +1,39 @@
+import unittest
+
+from ..benchmarks import runner
+
+def setUpModule():
+    print("Setting up the Benchmarks test module")
+
+def tearDownModule():
+    print("Shutting down the Benchmarks test module")
+
+class BenchmarkRuns(unittest.TestCase):
+    def test_run_reports_workloads(self):
+        report = runner.run_benchmarks(
+            sizes=["small"],
+            workloads=["build_word", "syllabify"],
+            iterations=2,
+            repeat=1
+        )
+        self.assertEqual(
+            [(result['workload'], result['size']) for result in report['results']],
+            [("build_word", "small"), ("syllabify", "small")],
+            "Failed to report one result per workload and size"
+        )
+        self.assertTrue(
+            all(result['seconds_per_iteration'] >= 0 and result['peak_memory'] >= 0 for result in report['results']),
+            "Failed to measure time and memory for each workload"
+        )
+
+    def test_compare_flags_regression(self):
+        baseline = {'results': [{'workload': "attach", 'size': "small", 'seconds_per_iteration': 1.0}]}
+        report = {'results': [{'workload': "attach", 'size': "small", 'seconds_per_iteration': 1.5}]}
+        self.assertTrue(
+            runner.compare(report, baseline, threshold=0.2)[0]['regression'],
+            "Failed to flag a slowdown beyond the threshold"
+        )
+        self.assertFalse(
+            runner.compare(report, baseline, threshold=0.6)[0]['regression'],
+            "Failed to allow a slowdown within the threshold"
+        )
@@ -0,0 +1,71 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from .. import __main__ as cli
+from ..benchmarks.workloads import build_language
+
+def setUpModule():
+    print("Setting up the CLI test module")
+
+def tearDownModule():
+    print("Shutting down the CLI test module")
+
+class CommandLine(unittest.TestCase):
+    def setUp(self):
+        self.language = build_language("small")
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = cli.save_language(self.language, os.path.join(self.directory.name, "language.pickle"))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_command(self, *args):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            cli.main(list(args))
+        return [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def test_parse_properties(self):
+        self.assertEqual(
+            cli.parse_properties("case:nominative, number:plural,case:genitive"),
+            {'case': {"nominative", "genitive"}, 'number': {"plural"}},
+            "Failed to read properties formatted as category:grammeme pairs"
+        )
+
+    def test_generate_lines(self):
+        results = self.run_command("generate", self.path, "--count", "3", "--word-class", "noun")
+        self.assertEqual(
+            len(results),
+            3,
+            "Failed to write one JSON line per generated word"
+        )
+        self.assertTrue(
+            all(result['pos'] == "noun" and result['sound'] for result in results),
+            "Failed to generate words with the requested word class"
+        )
+
+    def test_generate_save(self):
+        headword = self.run_command("generate", self.path, "--save")[0]['headword']
+        self.assertTrue(
+            cli.load_language(self.path).vocabulary.is_word(headword),
+            "Failed to save generated words back to the language file"
+        )
+
+    def test_apply_rules_and_syllabify(self):
+        word = self.language.phonology.build_word(length=2, apply_rules=False)['sound']
+        changed = self.run_command("apply-rules", self.path, " ".join(word))[0]
+        self.assertEqual(
+            changed['change'],
+            self.language.phonology.apply_rules(word),
+            "Failed to apply the saved language's rules to a word"
+        )
+        syllabified = self.run_command("syllabify", self.path, json.dumps(word))[0]
+        self.assertEqual(
+            syllabified['syllables'],
+            self.language.phonology.syllables.syllabify(word),
+            "Failed to syllabify a word with the saved language"
+        )
@@ -708,6 +708,40 @@ class GrammarOrderSentences(GrammarFixture):
             "grammar failed to build (add and apply) a basic sentence"
         )
 
+    def test_build_many_sentences(self):
+        self.grammar.sentences.add(
+            name = "perfective_intransitive",
+            structure = [
+                ["noun", "subject"],
+                ["verb", "perfective active"]
+            ]
+        )
+        rows = [
+            [
+                {'sound': subject, 'definition': subject, 'pos': 'noun'},
+                {'sound': verb, 'definition': verb, 'pos': 'verb'}
+            ]
+            for subject, verb in (("kata", "tota"), ("data", "pata"))
+        ]
+        rows.append([{'sound': "kata", 'definition': "cat", 'pos': 'noun'}])
+        sentences = list(self.grammar.sentences.apply_many("perfective_intransitive", rows))
+        self.assertEqual(
+            ["".join(sentence['sound']) for sentence in sentences[:2]],
+            ["uk kata atota", "uk data apata"],
+            "grammar failed to build many sentences with the same structure"
+        )
+        self.assertEqual(
+            sentences[:2],
+            [self.grammar.sentences.apply("perfective_intransitive", row) for row in rows[:2]],
+            "grammar failed to build the same sentences one at a time and in batch"
+        )
+        self.assertIsNone(sentences[2], "grammar failed to skip a row not matching the sentence")
+        self.assertEqual(
+            list(self.grammar.sentences.apply_many("perfective_intransitive")),
+            [],
+            "grammar failed to build no sentences without rows"
+        )
+
     def test_add_sentence(self):
         self.grammar.sentences.add(
             name = "indefinite_perfective_transitive",
@@ -1,5 +1,7 @@
+import concurrent.futures
 import unittest
 from ..language.language import Language
+from ..language.history import History
 
 def setUpModule():
     print("Setting up the Language test module")
@@ -624,6 +626,14 @@ class LanguageSoundChanges(LanguageFixture):
             "failed to change a word containing only a single sound"
         )
 
+    def test_change_many_words(self):
+        words = [["a", "a", "gʰ"], ["gʰ", "a", "a"], ["a", "gʰ", "gʰ", "a"], ["a", "gʰ", "a"], ["gʰ"]]
+        self.assertEqual(
+            self.language.phonology.apply_rules_many(words),
+            [self.language.phonology.apply_rules(word) for word in words],
+            "failed to apply sound changes to many words the same as to each word"
+        )
+
     # TODO: compound change applications
     #   - see if various rule orders work
 
@@ -650,5 +660,599 @@ class LanguageSoundChanges(LanguageFixture):
             ["a", "k", "a", "k", " ", "a", "g"],
             "failed to spread sound changes across an entire sentence"
         )
+
+    def test_change_sounds_across_many_words(self):
+        changed_sounds = self.language.change_sounds(
+            ["a", "gʰ", " ", "a", "gʰ", "a", "gʰ", " ", " ", "gʰ", "a", " "],
+            scope="sentence"
+        )
+        self.assertEqual(
+            changed_sounds,
+            ["a", "k", " ", "a", "k", "a", "g", " ", "gʰ", "a"],
+            "failed to keep word boundaries when spreading changes across many words"
+        )
+
+    def test_change_sounds_within_morphs(self):
+        changed_sounds = self.language.change_sounds(
+            ["a", "gʰ", "a", "gʰ", " ", "a", "gʰ"],
+            scope="morph",
+            boundaries=[2]
+        )
+        self.assertEqual(
+            changed_sounds,
+            ["a", "g", "a", "g", " ", "a", "g"],
+            "failed to block sound changes at morph boundaries"
+        )
         
 
+
+class LanguageNGrams(LanguageFixture):
+    @classmethod
+    def setUpClass(this_class):
+        super(LanguageNGrams, this_class).setUpClass()
+        this_class.language.phonetics.add_map({
+            'a': ['vowel', 'front', 'open', 'unrounded'],
+            'i': ['vowel', 'front', 'close', 'unrounded'],
+            'k': ['consonant', 'voiceless', 'velar', 'stop'],
+            't': ['consonant', 'voiceless', 'alveolar', 'stop']
+        })
+        this_class.language.phonology.add_sounds({
+            'a': ['a'],
+            'i': ['i'],
+            'k': ['k'],
+            't': ['t']
+        })
+        this_class.language.phonology.add_syllable("CV")
+        this_class.language.phonology.add_syllable("CVC")
+
+    def test_ngrams_train_on_generate(self):
+        total = self.language.ngrams.totals.get((), 0)
+        headword, entry_index = self.language.generate(length=2, definition="trained")
+        sounds = self.language.vocabulary.lookup(headword, entry_index)['sound']
+        self.assertEqual(
+            self.language.ngrams.totals.get(()),
+            total + len(sounds) + 1,
+            "failed to train the n-gram model on a generated vocabulary word"
+        )
+
+    def test_ngrams_sample_valid(self):
+        words = self.language.ngrams.sample_many(50, length=2)
+        word_space = self.language.phonology.word_space(2)
+        self.assertTrue(
+            len(words) == 50 and all(word_space.contains(word) for word in words),
+            "failed to sample words the phonology can build"
+        )
+
+    def test_ngrams_reuse_word_space(self):
+        word_space, _ = self.language.ngrams.read_word_space(2)
+        self.language.ngrams.sample_many(5, length=2)
+        self.assertIs(
+            self.language.ngrams.read_word_space(2)[0],
+            word_space,
+            "failed to reuse the word space between samples"
+        )
+        self.language.phonology.update_sound('t', letters=['t'])
+        self.assertIsNot(
+            self.language.ngrams.read_word_space(2)[0],
+            word_space,
+            "failed to rebuild the word space after phonemes changed"
+        )
+
+    def test_ngrams_sample_trained(self):
+        self.language.ngrams.train_many([["k", "a", "t", "a"]] * 500)
+        words = self.language.ngrams.sample_many(50, length=2)
+        self.assertGreater(
+            sum(word == ["k", "a", "t", "a"] for word in words),
+            25,
+            "failed to favor sound sequences seen in training"
+        )
+
+    def test_generate_ngram_word(self):
+        headword, entry_index = self.language.generate(length=1, definition="sampled", ngrams=True)
+        self.assertEqual(
+            self.language.vocabulary.lookup(headword, entry_index)['definition'],
+            "sampled",
+            "failed to store a word sampled from the n-gram model"
+        )
+
+class LanguageBeats(LanguageFixture):
+    @classmethod
+    def setUpClass(this_class):
+        super(LanguageBeats, this_class).setUpClass()
+        this_class.language.phonetics.add_map({
+            'a': ['vowel', 'front', 'open', 'unrounded'],
+            'k': ['consonant', 'voiceless', 'velar', 'stop']
+        })
+        this_class.language.phonology.add_sounds({'a': ['a'], 'k': ['k']})
+        this_class.language.phonology.add_syllable("CV")
+        this_class.language.phonology.morae.add(["V"], beats=1)
+
+    def test_count_beats(self):
+        headword, entry_index = self.language.generate(length=3, definition="three beats")
+        beats = self.language.count_beats()
+        self.assertEqual(
+            beats[headword][entry_index],
+            3,
+            "failed to count moraic beats for a vocabulary entry"
+        )
+
+    def test_count_changed_beats(self):
+        headword, entry_index = self.language.vocabulary.add(
+            sound=['k', 'a', 'k', 'a'],
+            change=['a', 'k', 'a', 'a'],
+            spelling=['k', 'a', 'k', 'a', 'a'],
+            definition="changed beats"
+        )
+        self.assertEqual(
+            (self.language.count_beats()[headword][entry_index], self.language.count_beats(changed=False)[headword][entry_index]),
+            (3, 2),
+            "failed to count beats in changed sounds and underlying sounds"
+        )
+
+class LanguageSyllables(LanguageFixture):
+    @classmethod
+    def setUpClass(this_class):
+        super(LanguageSyllables, this_class).setUpClass()
+        this_class.language.phonetics.add_map({
+            'a': ['vowel', 'front', 'open', 'unrounded'],
+            'k': ['consonant', 'voiceless', 'velar', 'stop']
+        })
+        this_class.language.phonology.add_sounds({'a': ['a'], 'k': ['k']})
+        this_class.language.phonology.add_syllable("CV")
+
+    def test_store_syllable_offsets(self):
+        headword, entry_index = self.language.generate(length=2, definition="two syllables")
+        self.assertEqual(
+            self.language.vocabulary.get_syllables(headword, entry_index),
+            [['k', 'a'], ['k', 'a']],
+            "failed to read stored syllable offsets back as syllables"
+        )
+
+    def test_resyllabify(self):
+        headword, entry_index = self.language.generate(length=2, definition="resyllabified")
+        syllable_id = self.language.phonology.add_syllable("CVCV")
+        self.language.resyllabify()
+        self.language.phonology.syllables.remove(syllable_id)
+        self.assertEqual(
+            list(self.language.vocabulary.lookup(headword, entry_index)['syllables']),
+            [4],
+            "failed to resyllabify vocabulary entries after syllables changed"
+        )
+
+class LanguageImport(LanguageFixture):
+    @classmethod
+    def setUpClass(this_class):
+        super(LanguageImport, this_class).setUpClass()
+        this_class.language.phonetics.add_map({
+            'a': ['vowel', 'front', 'open', 'unrounded'],
+            'k': ['consonant', 'voiceless', 'velar', 'stop'],
+            'θ': ['consonant', 'voiceless', 'dental', 'fricative']
+        })
+        this_class.language.phonology.add_sounds({'a': ['a'], 'k': ['k'], 'θ': ['th']})
+        this_class.language.phonology.add_syllable("CV")
+
+    def test_import_words_without_definition(self):
+        headword, entry_index = self.language.import_words([("katha", None)])[0]
+        self.assertEqual(
+            self.language.vocabulary.lookup(headword, entry_index)['definition'],
+            "",
+            "failed to import a word given without a definition"
+        )
+
+    def test_import_words(self):
+        entries = self.language.import_words([("katha", "imported"), "xa"])
+        self.assertEqual(entries[1], None, "failed to skip a word with unknown letters")
+        entry = self.language.vocabulary.lookup(*entries[0])
+        self.assertEqual(
+            (entry['sound'], entry['spelling'], entry['definition']),
+            (['k', 'a', 'θ', 'a'], ['k', 'a', 'th', 'a'], "imported"),
+            "failed to import a spelled word with its sounds read back"
+        )
+        self.assertIn(
+            entries[0],
+            self.language.vocabulary.search(spelling="katha"),
+            "failed to search a multigraph spelling as typed"
+        )
+
+class LanguageSimilarity(LanguageFixture):
+    @classmethod
+    def setUpClass(this_class):
+        super(LanguageSimilarity, this_class).setUpClass()
+        this_class.language.phonetics.add_map({
+            'a': ['vowel', 'front', 'open', 'unrounded'],
+            'i': ['vowel', 'front', 'close', 'unrounded'],
+            'k': ['consonant', 'voiceless', 'velar', 'stop'],
+            'g': ['consonant', 'voiced', 'velar', 'stop'],
+            't': ['consonant', 'voiceless', 'alveolar', 'stop'],
+            's': ['consonant', 'voiceless', 'alveolar', 'sibilant']
+        })
+        this_class.language.phonology.add_sounds({
+            'a': ['a'], 'i': ['i'], 'k': ['k'], 'g': ['g'], 't': ['t'], 's': ['s']
+        })
+        this_class.language.phonology.add_syllable("CV")
+        this_class.language.syllables_min_max(1, 2)
+
+    def test_similarity_after_vocabulary_changes(self):
+        vocabulary = self.language.vocabulary
+        # other tests may have generated words under the same headword
+        headword, first_index = vocabulary.add(sound=['t', 'i', 's', 'i'], spelling="tisi", definition="first")
+        headword, second_index = vocabulary.add(sound=['t', 'i', 's', 'a'], spelling="tisi", definition="second")
+        self.language.similarity.within(['t', 'i', 's', 'a'], 0)
+        vocabulary.remove_entry(headword, first_index)
+        self.assertIn(
+            (0, headword, second_index - 1),
+            self.language.similarity.within(['t', 'i', 's', 'a'], 0),
+            "failed to find an entry whose index shifted after a removal"
+        )
+        vocabulary.update(headword, second_index - 1, sound=['g', 'i', 's', 'a'])
+        self.assertIn(
+            (0, headword, second_index - 1),
+            self.language.similarity.within(['g', 'i', 's', 'a'], 0),
+            "failed to find an entry after its sounds were updated"
+        )
+
+    def test_distance(self):
+        similarity = self.language.similarity
+        self.assertEqual(
+            (similarity.distance(['k', 'a'], ['k', 'a']), similarity.distance(['k', 'a'], ['k', 'a', 't'])),
+            (0, 1),
+            "failed to measure same and one added sound distances"
+        )
+        self.assertLess(
+            similarity.distance(['k', 'a'], ['g', 'a']),
+            similarity.distance(['k', 'a'], ['s', 'a']),
+            "failed to measure sounds sharing more features as closer"
+        )
+
+    def test_search_matches_brute_force(self):
+        for _ in range(30):
+            self.language.generate(length=2)
+        similarity = self.language.similarity
+        query = ['k', 'i', 't', 'a']
+        entries = [
+            (similarity.distance(query, entry['sound']), headword, entry_index)
+            for headword, headword_entries in self.language.vocabulary.vocabulary.items()
+            for entry_index, entry in enumerate(headword_entries)
+        ]
+        self.assertEqual(
+            similarity.within(query, 1.5),
+            sorted(entry for entry in entries if entry[0] <= 1.5),
+            "failed to find the same entries within a radius as comparing every entry"
+        )
+        self.assertEqual(
+            [entry[0] for entry in similarity.nearest(query, 3)],
+            sorted(entry[0] for entry in entries)[:3],
+            "failed to find the nearest entries"
+        )
+
+    def test_generate_min_distance(self):
+        for _ in range(10):
+            entry = self.language.generate(length=2, min_distance=1)
+            if not entry:
+                continue
+            sounds = self.language.vocabulary.lookup(*entry)['sound']
+            closest = [
+                distance for distance, headword, entry_index in self.language.similarity.within(sounds, 1)
+                if (headword, entry_index) != entry and distance < 1
+            ]
+            self.assertFalse(closest, "failed to keep a generated word away from existing words")
+
+class LanguageHistory(LanguageFixture):
+    @classmethod
+    def setUpClass(this_class):
+        super(LanguageHistory, this_class).setUpClass()
+        this_class.language.phonetics.add_map({
+            'a': ['vowel', 'front', 'open', 'unrounded'],
+            'k': ['consonant', 'voiceless', 'velar', 'stop'],
+            'g': ['consonant', 'voiced', 'velar', 'stop'],
+            'ɣ': ['consonant', 'voiced', 'velar', 'fricative']
+        })
+        this_class.language.phonology.add_sounds({'a': ['a'], 'k': ['k'], 'g': ['g'], 'ɣ': ['gh']})
+        this_class.language.phonology.add_syllable("CV")
+
+    def setUp(self):
+        self.language.vocabulary.vocabulary.clear()
+        self.language.history = History(self.language)
+        self.entry = self.language.vocabulary.add(sound=['k', 'a', 'k', 'a'], spelling=['k', 'a', 'k', 'a'])
+        self.voicing = self.language.phonology.add_rule(['voiceless'], ['voiced'], "V_V")
+        self.spirants = self.language.phonology.add_rule(['stop'], ['fricative'], "V_V")
+
+    def tearDown(self):
+        self.language.phonology.rules.remove(self.voicing)
+        self.language.phonology.rules.remove(self.spirants)
+
+    def test_run_stages(self):
+        self.language.history.add_stage([self.voicing], name="voicing")
+        self.language.history.add_stage([self.spirants], name="spirantization")
+        self.language.history.run()
+        self.assertEqual(
+            self.language.history.timeline(*self.entry),
+            [['k', 'a', 'k', 'a'], ['k', 'a', 'g', 'a'], ['k', 'a', 'ɣ', 'a']],
+            "failed to keep a word's forms at every historical stage"
+        )
+        self.assertEqual(
+            self.language.history.form(*self.entry, stage=1),
+            ['k', 'a', 'g', 'a'],
+            "failed to read a word at an earlier stage"
+        )
+
+    def test_run_incrementally(self):
+        self.language.history.add_stage([self.voicing])
+        self.assertEqual(self.language.history.run(), 1, "failed to compute the first stage")
+        self.language.history.add_stage([self.spirants])
+        entry = self.language.vocabulary.add(sound=['g', 'a', 'k', 'a'], spelling=['g', 'a', 'k', 'a'])
+        self.assertEqual(self.language.history.run(), 1, "failed to compute only the added stage")
+        self.assertEqual(
+            self.language.history.forms(),
+            {self.entry: ['k', 'a', 'ɣ', 'a'], entry: ['g', 'a', 'ɣ', 'a']},
+            "failed to evolve added words through earlier and added stages"
+        )
+
+    def test_run_sharded(self):
+        for i in range(20):
+            self.language.vocabulary.add(sound=['k', 'a'] * (i % 3 + 1), spelling=['k', 'a'] * (i % 3 + 1))
+        self.language.history.add_stage([self.voicing])
+        self.language.history.add_stage([self.spirants])
+        self.language.history.run()
+        expected = self.language.history.forms()
+        self.language.history = History(self.language)
+        self.language.history.add_stage([self.voicing])
+        self.language.history.add_stage([self.spirants])
+        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+            self.language.history.run(executor=executor, shards=3)
+        self.assertEqual(
+            self.language.history.forms(),
+            expected,
+            "failed to evolve vocabulary shards to the same forms"
+        )
+
+    def test_rerun_changed_stage(self):
+        self.language.history.add_stage([self.voicing])
+        self.language.history.run()
+        self.language.phonology.rules.update(self.voicing, target=['voiceless'])
+        self.language.history.run()
+        self.assertEqual(
+            self.language.history.form(*self.entry),
+            ['k', 'a', 'k', 'a'],
+            "failed to recompute a stage after its rules changed"
+        )
+
+class LanguageFamily(unittest.TestCase):
+    def setUp(self):
+        self.language = Language("Proto")
+        self.language.phonetics.add_map({
+            'a': ['vowel', 'front', 'open', 'unrounded'],
+            'k': ['consonant', 'voiceless', 'velar', 'stop'],
+            'g': ['consonant', 'voiced', 'velar', 'stop'],
+            'ɣ': ['consonant', 'voiced', 'velar', 'fricative']
+        })
+        self.language.phonology.add_sounds({'a': ['a'], 'k': ['k'], 'g': ['g'], 'ɣ': ['gh']})
+        self.language.phonology.add_syllable("CV")
+        self.entry = self.language.vocabulary.add(sound=['k', 'a', 'k', 'a'], spelling=['k', 'a', 'k', 'a'], definition="thing")
+
+    def test_fork_shares_parent_data(self):
+        daughter = self.language.fork("Daughter")
+        self.assertIs(daughter.phonetics, self.language.phonetics, "failed to share phonetics with a daughter")
+        self.assertEqual(
+            daughter.vocabulary.lookup(*self.entry)['sound'],
+            ['k', 'a', 'k', 'a'],
+            "failed to read parent vocabulary from a daughter"
+        )
+        self.assertEqual(
+            (daughter.parent, self.language.daughters),
+            (self.language, [daughter]),
+            "failed to link a daughter with its parent"
+        )
+
+    def test_fork_copies_on_write(self):
+        daughter = self.language.fork("Daughter")
+        daughter.vocabulary.redefine(*self.entry, definition="other thing")
+        daughter.phonology.add_rule(['voiceless'], ['voiced'], "V_V")
+        self.assertEqual(
+            self.language.vocabulary.lookup(*self.entry)['definition'],
+            "thing",
+            "failed to keep daughter vocabulary changes out of the parent"
+        )
+        self.assertEqual(len(self.language.phonology.rules.get()), 0, "failed to keep daughter rules out of the parent")
+        self.assertEqual(daughter.vocabulary.vocabulary.changes(), 1, "failed to store only changed words in the daughter")
+
+    def test_fork_layers_grammar(self):
+        self.language.grammar.properties.add("tense", "past")
+        parent_id = self.language.grammar.exponents.add(post=['k', 'a'], properties="past")
+        example_id = self.language.corpus.add(sound=['k', 'a'], definition="example")
+        daughter = self.language.fork("Daughter")
+        daughter_id = daughter.grammar.exponents.add(post=['g', 'a'], properties="past")
+        self.assertNotEqual(daughter_id, parent_id, "failed to add a daughter exponent under a new id")
+        self.assertEqual(
+            (daughter.grammar.exponents.get(parent_id)['post'], daughter.corpus.get(example_id)['definition']),
+            (['k', 'a'], "example"),
+            "failed to read parent exponents and examples from a daughter"
+        )
+        self.assertEqual(
+            (list(self.language.grammar.exponents.get_keys()), daughter.grammar.exponents.exponents.changes()),
+            ([parent_id], 2),
+            "failed to keep daughter exponents layered apart from the parent"
+        )
+
+    def test_fork_reads_without_copying(self):
+        daughter = self.language.fork("Daughter")
+        for _ in range(50):
+            daughter.vocabulary.lookup(*self.entry)
+            daughter.vocabulary.define(*self.entry)
+            daughter.vocabulary.get_syllables(*self.entry)
+        daughter.vocabulary.search(spelling="kaka")
+        daughter.similarity.nearest(['k', 'a', 'k', 'a'])
+        daughter.phonology.build_word(length=2, apply_rules=False)
+        self.assertEqual(daughter.vocabulary.vocabulary.changes(), 0, "failed to read parent words without copying them")
+        self.assertEqual(daughter.phonology.phonemes.phonemes.changes(), 0, "failed to read parent phonemes without copying them")
+
+    def test_fork_keeps_ngrams_apart(self):
+        self.language.ngrams.retrain()
+        daughter = self.language.fork("Daughter")
+        self.language.ngrams.train(['g', 'a'])
+        daughter.ngrams.train(['ɣ', 'a'])
+        self.assertEqual(
+            (self.language.ngrams.counts[()].get(self.language.ngrams.ids['g']), daughter.ngrams.counts[()].get(daughter.ngrams.ids['ɣ'])),
+            (1, 1),
+            "failed to count sounds interned after forking apart in parent and daughter"
+        )
+        self.assertNotIn('g', daughter.ngrams.ids, "failed to keep parent training out of a daughter")
+
+    def test_fork_follows_parent_changes(self):
+        self.language.phonetics.add_map({'ʃ': ['consonant', 'voiceless', 'postalveolar', 'fricative']})
+        daughter = self.language.fork("Daughter")
+        daughter.phonology.spell(['k', 'a'])
+        daughter.similarity.nearest(['k', 'a', 'k', 'a'])
+        self.language.phonology.add_sounds({'ʃ': ['sh']})
+        added = self.language.vocabulary.add(sound=['ʃ', 'a'], spelling=['sh', 'a'], definition="new thing")
+        self.assertTrue(daughter.phonology.phonemes.has('ʃ'), "failed to read parent phonemes added after forking")
+        self.assertEqual(daughter.phonology.spell(['ʃ', 'a']), ['sh', 'a'], "failed to spell parent phonemes added after forking")
+        self.assertEqual(
+            [match[1:] for match in daughter.similarity.nearest(['ʃ', 'a'])],
+            [added],
+            "failed to index parent words added after forking"
+        )
+
+    def test_evolve_family(self):
+        voiced = self.language.fork("Voiced")
+        voiced.phonology.add_rule(['voiceless'], ['voiced'], "V_V")
+        spirant = voiced.fork("Spirant")
+        spirant.phonology.add_rule(['stop'], ['fricative'], "V_V")
+        unchanged = self.language.fork("Unchanged")
+        expected = {
+            'Voiced': {self.entry: ['k', 'a', 'g', 'a']},
+            'Spirant': {self.entry: ['k', 'a', 'ɣ', 'a']},
+            'Unchanged': {self.entry: ['k', 'a', 'k', 'a']}
+        }
+        self.assertEqual(self.language.evolve_family(), expected, "failed to apply each branch's rules to the parent words")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+            self.assertEqual(
+                self.language.evolve_family(executor=executor),
+                expected,
+                "failed to evolve branches in an executor"
+            )
+
+class LanguageSentences(unittest.TestCase):
+    def setUp(self):
+        self.language = Language("Sentential")
+        self.language.phonetics.add_map({
+            'a': ['vowel', 'front', 'open', 'unrounded'],
+            'k': ['consonant', 'voiceless', 'velar', 'stop'],
+            'g': ['consonant', 'voiced', 'velar', 'stop'],
+            't': ['consonant', 'voiceless', 'alveolar', 'stop'],
+            'd': ['consonant', 'voiced', 'alveolar', 'stop']
+        })
+        self.language.phonology.add_sounds({'a': ['a'], 'k': ['k'], 'g': ['g'], 't': ['t'], 'd': ['d']})
+        self.language.phonology.add_rule(['voiceless'], ['voiced'], "V_V")
+        self.language.grammar.properties.add("case", "subject")
+        self.language.grammar.word_classes.add("noun")
+        self.language.grammar.exponents.add(pre=['k', 'a'], bound=True, properties="subject", pos="noun")
+        self.language.sentences.add(name="naming", structure=[["noun", "subject"]], translation=[("the {}", 0)])
+        self.words = [
+            self.language.vocabulary.add(sound=sounds, spelling=sounds, definition=definition, pos="noun")
+            for sounds, definition in ((['t', 'a'], "one"), (['k', 'a'], "two"))
+        ]
+
+    def test_apply_sentences(self):
+        sentences = list(self.language.apply_sentences("naming", [[word] for word in self.words]))
+        self.assertEqual(
+            [(sentence['change'], sentence['translation']) for sentence in sentences],
+            [(['k', 'a', 'd', 'a'], ["the one"]), (['k', 'a', 'g', 'a'], ["the two"])],
+            "failed to build and change many sentences from vocabulary words"
+        )
+        self.assertEqual(
+            sentences[0],
+            self.language.apply_sentence("naming", [self.words[0]]),
+            "failed to build the same sentence one at a time and in batch"
+        )
+
+class LanguageGrammarSummary(unittest.TestCase):
+    def setUp(self):
+        self.language = Language("Summarized")
+        self.language.phonetics.add_map({
+            'a': ['vowel', 'front', 'open', 'unrounded'],
+            'k': ['consonant', 'voiceless', 'velar', 'stop'],
+            't': ['consonant', 'voiceless', 'alveolar', 'stop']
+        })
+        self.language.phonology.add_sounds({'a': ['a', 'à'], 'k': ['k'], 't': ['t']})
+        self.language.grammar.properties.add("number", "plural")
+        self.language.grammar.properties.add("case", "subject")
+        self.language.grammar.word_classes.add("noun")
+        self.plural = self.language.grammar.exponents.add(post=['k', 'a'], bound=True, properties="plural", pos="noun")
+        self.subject = self.language.grammar.exponents.add(pre=['t', 'a'], bound=False, properties="subject", pos="noun")
+
+    def test_print_grammar(self):
+        display = self.language.summary.print_grammar(print_display=False)
+        self.assertEqual(
+            display,
+            self.language.summary.print_grammar(print_display=False),
+            "failed to render the same grammar summary each time"
+        )
+        self.assertIn("number affixes:\n-ka\t", display, "failed to list a spelled affix under its category")
+
+    def test_summarize_changed_exponents(self):
+        summaries = self.language.summary.summarize_exponents()
+        self.language.grammar.exponents.update(self.plural, post=['t', 'a'])
+        updated_summaries = self.language.summary.summarize_exponents()
+        self.assertIs(
+            updated_summaries[self.subject],
+            summaries[self.subject],
+            "failed to keep the summary of an unchanged exponent"
+        )
+        self.assertEqual(
+            updated_summaries[self.plural]['sound'],
+            ['-', 't', 'a'],
+            "failed to summarize an exponent again after it changed"
+        )
+
+class LanguageProfile(unittest.TestCase):
+    def setUp(self):
+        self.language = Language("Profiled")
+        self.language.phonetics.add_map({
+            'a': ['vowel', 'front', 'open', 'unrounded'],
+            'k': ['consonant', 'voiceless', 'velar', 'stop'],
+            'g': ['consonant', 'voiced', 'velar', 'stop']
+        })
+        self.language.phonology.add_sounds({'a': ['a'], 'k': ['k'], 'g': ['g']})
+        self.language.phonology.add_syllable("CV")
+        self.language.phonology.add_rule(['voiceless'], ['voiced'], "V_V")
+
+    def test_profile_counts_stages(self):
+        with self.language.profile() as profiler:
+            self.language.phonology.build_word(length=2, spell_after_change=True)
+            self.language.phonology.apply_rule(['a', 'k', 'a'], 1)
+        snapshot = profiler.snapshot()
+        self.assertEqual(
+            (snapshot['build_word']['calls'], snapshot['apply_rule']['calls']),
+            (1, 2),
+            "failed to count calls to profiled stages including nested calls"
+        )
+        self.assertGreater(snapshot['build_word']['seconds'], 0, "failed to time a profiled stage")
+
+    def test_profile_counts_batch_stages(self):
+        self.language.grammar.properties.add("tense", "past")
+        self.language.grammar.exponents.add(post=['k', 'a'], properties="past")
+        with self.language.profile() as profiler:
+            self.language.attach(['k', 'a'], properties="past", lookup=False)
+            self.language.change_sounds(['a', 'k', 'a'])
+        snapshot = profiler.snapshot()
+        self.assertTrue(
+            all(snapshot[stage]['calls'] for stage in ('plan_unit', 'attach_plan', 'provide', 'apply_rules_many', 'spell')),
+            f"failed to count calls on batch paths in {snapshot}"
+        )
+
+    def test_profile_restores_methods(self):
+        with self.language.profile() as profiler:
+            pass
+        self.language.phonology.build_word(length=1)
+        self.assertNotIn("build_word", vars(self.language.phonology), "failed to unwrap methods after profiling")
+        self.assertEqual(profiler.snapshot()['build_word']['calls'], 0, "failed to stop counting after profiling")
+
+    def test_profile_prometheus_text(self):
+        with self.language.profile() as profiler:
+            self.language.phonology.apply_rule(['a', 'k', 'a'], 1)
+        self.assertIn(
+            'languagebuilder_stage_calls_total{stage="apply_rule"} 1',
+            profiler.format_prometheus().splitlines(),
+            "failed to format stage counts as Prometheus text"
+        )
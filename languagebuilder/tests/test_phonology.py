@@ -1,6 +1,9 @@
+import concurrent.futures
+import itertools
 import unittest
 from ..phonology.phonology import Phonology
 from ..phonetics.phonetics import Phonetics
+from ..phonology.rules import Rules
 from ..tools.flat_list import flatten
 
 def setUpModule():
@@ -185,6 +188,42 @@ class PhonologySyllables(PhonologyFixture):
             "failed to syllabify a word skipping smaller cuts and opting for one long syllable"
         )
     
+    def test_syllabify_many(self):
+        self.phonology.syllables.clear()
+        self.phonology.syllables.add("CV")
+        self.phonology.syllables.add("CVV")
+        self.phonology.syllables.add("V")
+        words = [
+            ["kʰ", "a", "a", "gʰ", "a", "gʰ", "a"],
+            ["a", "g", "a"],
+            ["g", "g"]
+        ]
+        expected = [[["kʰ", "a", "a"], ["gʰ", "a"], ["gʰ", "a"]], [["a"], ["g", "a"]], None]
+        self.assertEqual(
+            self.phonology.syllables.syllabify_many(words),
+            expected,
+            "failed to split many words into syllables"
+        )
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            offsets = self.phonology.syllables.syllabify_many(words, offsets=True, executor=executor, chunk_size=1)
+        self.assertEqual(
+            [list(word_offsets) if word_offsets else None for word_offsets in offsets],
+            [[3, 5, 7], [1, 3], None],
+            "failed to split many words into syllable end offsets in a pool"
+        )
+
+    def test_syllabify_after_syllables_change(self):
+        self.phonology.syllables.clear()
+        self.phonology.syllables.add("CV")
+        word = ["g", "a", "a"]
+        self.phonology.syllables.syllabify(word)
+        self.phonology.syllables.add("V")
+        self.assertEqual(
+            self.phonology.syllables.syllabify(word),
+            [["g", "a"], ["a"]],
+            "failed to syllabify with syllables added since the last split"
+        )
+
     def test_syllabify_maintain_length(self):
         self.phonology.syllables.clear()
         self.phonology.syllables.add("CV")
@@ -670,7 +709,25 @@ class PhonologyWords(PhonologyFixture):
             entry['sound'],
             "ka",
             "applied rule to inapplicable sound"
-        )    
+        )
+
+    def test_rule_filter_skips_missing_source(self):
+        rule_id = self.phonology.add_rule(["fricative"], ["stop"], "V_V")
+        is_applicable = self.phonology.is_rule_applicable(["a", "k", "a"], rule_id)
+        self.phonology.remove_rule(rule_id)
+        self.assertFalse(
+            is_applicable,
+            "failed to rule out a rule whose source features are not in the word"
+        )
+
+    def test_rule_filter_skips_missing_environment(self):
+        rule_id = self.phonology.add_rule(["stop"], ["fricative"], "V_V")
+        is_applicable = self.phonology.is_rule_applicable(["k", "k"], rule_id)
+        self.phonology.remove_rule(rule_id)
+        self.assertFalse(
+            is_applicable,
+            "failed to rule out a rule whose environment features are not in the word"
+        )
 
 class PhonologySpelling(PhonologyFixture):
     @classmethod
@@ -707,6 +764,45 @@ class PhonologySpelling(PhonologyFixture):
             "failed to use fallback phonemes correctly when spelling a word"
         )
 
+    def test_spell_many(self):
+        words = [['ts', 'o'], ['g', 'o'], ['o']]
+        fallback_words = [None, ['dz', 'o'], None]
+        self.assertEqual(
+            ["".join(spelling) for spelling in self.phonology.spell_many(words, fallback_words)],
+            ["co", "zo", "o"],
+            "failed to spell many words with fallbacks in one pass"
+        )
+
+    def test_spell_many_mismatched_fallbacks(self):
+        with self.assertRaises(ValueError, msg="failed to reject fewer fallback lists than words"):
+            self.phonology.spell_many([['ts', 'o'], ['g', 'o']], [None])
+
+    def test_spell_weighted_letters(self):
+        if not self.phonology.phonemes.has("a"):
+            self.phonology.phonemes.add("a", ["a"])
+        self.phonology.phonemes.update("a", letters={'a': 1, 'á': 0})
+        self.assertEqual(
+            set("".join(self.phonology.spell(['a'])) for _ in range(20)),
+            {"a"},
+            "failed to skip letters without weight when spelling"
+        )
+
+    def test_spell_deterministic(self):
+        if not self.phonology.phonemes.has("a"):
+            self.phonology.phonemes.add("a", ["a"])
+        self.phonology.phonemes.update("a", letters={'a': 1, 'à': 3, 'á': 2})
+        self.assertEqual(
+            set("".join(self.phonology.spell(['a', 'ts'], deterministic=True)) for _ in range(10)),
+            {"àc"},
+            "failed to spell the heaviest letter every time when spelling deterministically"
+        )
+        self.phonology.phonemes.update("a", letters=['a', 'á'])
+        self.assertEqual(
+            self.phonology.spell(['a'], deterministic=True),
+            ['a'],
+            "failed to respell deterministically after phoneme letters changed"
+        )
+
     def test_spell_word_sound_change(self):
         self.phonology.add_rule("voiceless", "voiced", "V_")
         # spell changed sounds but fall back on pre-change sounds
@@ -975,3 +1071,404 @@ class PhonologyMorae(PhonologyFixture):
     ## + taθika
     ## ?   ^
     ## : failed to generate a new root + grammatical unit in the language
+
+class PhonologyConstrainedWords(PhonologyFixture):
+    @classmethod
+    def setUpClass(this_class):
+        super(PhonologyConstrainedWords, this_class).setUpClass()
+        this_class.phonology.phonemes.add("a", ["a"])
+        this_class.phonology.phonemes.add("k", ["k", "c"])
+        this_class.phonology.phonemes.add("g", ["g"])
+        this_class.phonology.phonemes.add("x", ["kh"])
+        this_class.phonology.syllables.add("CV")
+        this_class.phonology.syllables.add("V")
+        this_class.phonology.syllables.add("CVC")
+
+    def test_constrained_start_end(self):
+        words = self.phonology.build_constrained_words(
+            count=20,
+            length=(1, 3),
+            start=["g"],
+            end=[["vowel"], "x"],
+            apply_rules=False
+        )
+        self.assertEqual(
+            len(words),
+            20,
+            "failed to build the requested number of constrained words"
+        )
+        self.assertTrue(
+            all(word['sound'][0] == "g" and word['sound'][-2:] == ["a", "x"] for word in words),
+            "failed to build words with the required start and end sounds"
+        )
+
+    def test_constrained_avoid_and_length(self):
+        words = self.phonology.build_constrained_words(
+            count=20,
+            length=3,
+            min_sounds=5,
+            avoid=[[["consonant"], ["consonant"]]],
+            apply_rules=False
+        )
+        self.assertTrue(
+            all(
+                len(word['sound']) >= 5
+                and "".join("C" if sound != "a" else "V" for sound in word['sound']).find("CC") < 0
+                for word in words
+            ) and words,
+            "failed to build words of the required length avoiding a cluster"
+        )
+
+    def test_constrained_spelling_start(self):
+        words = self.phonology.build_constrained_words(count=10, spelling_start="kh", apply_rules=False)
+        self.assertTrue(
+            words and all("".join(word['spelling']).startswith("kh") for word in words),
+            "failed to build words with a required spelling prefix"
+        )
+
+    def test_constrained_impossible(self):
+        self.assertEqual(
+            self.phonology.build_constrained_words(count=5, length=1, start=["x", "x"], apply_rules=False),
+            [],
+            "failed to return no words for unmeetable constraints"
+        )
+
+class PhonologyWordSpace(PhonologyFixture):
+    @classmethod
+    def setUpClass(this_class):
+        super(PhonologyWordSpace, this_class).setUpClass()
+        this_class.phonology.phonemes.add("a", ["a"])
+        this_class.phonology.phonemes.add("k", ["k"])
+        this_class.phonology.phonemes.add("x", ["h"])
+        this_class.phonology.syllables.add("CV")
+        this_class.phonology.syllables.add("V")
+        this_class.phonology.syllables.add("CVC")
+
+    def list_words(self, syllable_count):
+        """Build every sound sequence by trying every structure and sound"""
+        inventory = self.phonology.inventory()
+        structures = [
+            [self.phonetics.get_ipa(features, filter_phonemes=inventory) for features in structure]
+            for structure in self.phonology.syllables.get().values()
+        ]
+        return set(
+            word
+            for chosen_structures in itertools.product(structures, repeat=syllable_count)
+            for word in itertools.product(*[slot for structure in chosen_structures for slot in structure])
+        )
+
+    def test_count_words_distinct(self):
+        self.assertEqual(
+            self.phonology.count_words(3),
+            len(self.list_words(3)),
+            "failed to count distinct words built by different syllable structures"
+        )
+
+    def test_word_space_index(self):
+        word_space = self.phonology.word_space((1, 2))
+        words = list(word_space.words())
+        self.assertEqual(
+            words,
+            sorted(list(word) for word in self.list_words(1) | self.list_words(2)),
+            "failed to list every word in lexicographic order"
+        )
+        self.assertTrue(
+            all(word_space.word_at(i) == word and word_space.index_of(word) == i for i, word in enumerate(words)),
+            "failed to map words to and from their indexes"
+        )
+
+    def test_word_space_shuffled(self):
+        word_space = self.phonology.word_space(2)
+        self.assertEqual(
+            sorted(word_space.words(shuffle=True)),
+            list(word_space.words()),
+            "failed to list every word once in random order"
+        )
+
+    def test_word_sampler_unique(self):
+        samplers = [self.phonology.word_sampler("names", length=2, shard=shard, shards=3) for shard in range(3)]
+        words = [tuple(word) for sampler in samplers for word in sampler]
+        self.assertEqual(
+            sorted(words),
+            sorted(tuple(word) for word in self.phonology.word_space(2).words()),
+            "failed to sample every word exactly once across shards"
+        )
+
+    def test_word_sampler_resume(self):
+        sampler = self.phonology.word_sampler("names", length=2)
+        first_words = sampler.sample(5)
+        resumed = self.phonology.word_sampler("names", length=2, position=sampler.position)
+        self.assertEqual(
+            first_words + resumed.sample(5),
+            self.phonology.word_sampler("names", length=2).sample(10),
+            "failed to resume sampling from a saved position"
+        )
+        self.assertEqual(
+            resumed.position_of(first_words[2]),
+            2,
+            "failed to find the sampled position of a word"
+        )
+
+class HierarchyRecommend(unittest.TestCase):
+    def setUp(self):
+        self.phonetics = Phonetics()
+        self.phonetics.add("a", ["vowel", "front", "open", "unrounded"])
+        self.phonetics.add("s", ["consonant", "voiceless", "alveolar", "sibilant"])
+        self.phonetics.add("t", ["consonant", "voiceless", "alveolar", "stop"])
+        self.phonetics.add("l", ["consonant", "voiced", "alveolar", "liquid"])
+        self.phonetics.add("r", ["consonant", "voiced", "alveolar", "liquid", "trill"])
+        self.phonology = Phonology(self.phonetics)
+        for ipa in ("a", "s", "t", "l"):
+            self.phonology.phonemes.add(ipa, [ipa])
+        self.hierarchy = self.phonology.syllables.phonotactics.hierarchy
+        self.hierarchy.add("sibilant", "stop", "liquid", position=0)
+
+    def test_recommend_along_scale(self):
+        self.assertEqual(
+            set(self.hierarchy.recommend("s") for _ in range(30)),
+            {"t", "l"},
+            "failed to recommend sounds further along the scale"
+        )
+
+    def test_recommend_dependencies(self):
+        self.hierarchy.depend("sibilant", "liquid")
+        self.assertEqual(
+            set(self.hierarchy.recommend("s") for _ in range(10)),
+            {"l"},
+            "failed to recommend sounds following dependencies over the scale"
+        )
+
+    def test_recommend_inventory_changes(self):
+        self.hierarchy.depend("sibilant", "liquid")
+        self.hierarchy.recommend("s")
+        self.phonology.phonemes.remove("l")
+        self.phonology.phonemes.add("r", ["r"])
+        self.assertEqual(
+            set(self.hierarchy.recommend("s") for _ in range(10)),
+            {"r"},
+            "failed to update recommended sounds after the inventory changed"
+        )
+
+class PhonotacticsPartition(unittest.TestCase):
+    def setUp(self):
+        self.phonetics = Phonetics()
+        self.phonetics.add("a", ["vowel", "open"])
+        self.phonetics.add("i", ["vowel", "close"])
+        self.phonetics.add("j", ["consonant", "glide"])
+        self.phonetics.add("n", ["consonant", "nasal"])
+        self.phonetics.add("t", ["consonant", "stop"])
+        self.phonology = Phonology(self.phonetics)
+        self.phonotactics = self.phonology.syllables.phonotactics
+        self.phonotactics.add_nucleus(["vowel"], ["glide"])
+        self.phonotactics.add_nucleus(["vowel"])
+
+    def brute_force(self, syllable_features):
+        for i in range(len(syllable_features)):
+            for nucleus in self.phonotactics.nuclei.values():
+                if self.phonotactics.is_features_list_overlap(syllable_features[i:i+len(nucleus)], nucleus):
+                    return i, i + len(nucleus)
+
+    def test_partition_prefers_earliest_nucleus(self):
+        syllable = [['consonant'], ['nasal'], ['vowel'], ['glide'], ['stop', 'consonant']]
+        self.assertEqual(
+            self.phonotactics.partition_syllable(syllable),
+            {
+                'onset': [['consonant'], ['nasal']],
+                'nucleus': [['vowel'], ['glide']],
+                'coda': [['stop', 'consonant']]
+            },
+            "failed to split syllable around the first added nucleus"
+        )
+
+    def test_partition_matches_brute_force(self):
+        features = [['vowel'], ['glide'], ['consonant'], ['vowel', 'close'], ['nasal'], ['glide', 'consonant']]
+        syllables = [
+            [features[i], features[j], features[k]]
+            for i in range(len(features))
+            for j in range(len(features))
+            for k in range(len(features))
+        ]
+        for syllable in syllables:
+            expected = self.brute_force(syllable)
+            found = self.phonotactics.find_nucleus(syllable)
+            self.assertEqual(
+                found, expected,
+                f"failed to find the same nucleus as comparing every nucleus in {syllable}"
+            )
+
+    def test_partition_cached_by_structure(self):
+        syllable_id = self.phonology.syllables.add("CV")
+        structure = self.phonology.syllables.get(syllable_id)
+        self.phonotactics.partition_syllable(structure, structure_id=syllable_id)
+        self.assertIn(syllable_id, self.phonotactics.partitions, "failed to remember partition for syllable id")
+        self.phonology.syllables.update(syllable_id, "VC")
+        structure = self.phonology.syllables.get(syllable_id)
+        self.assertEqual(
+            self.phonotactics.partition_syllable(structure, structure_id=syllable_id)['coda'],
+            [['consonant']],
+            "failed to split again after syllable structure changed"
+        )
+
+    def test_partition_nuclei_changes(self):
+        syllable = [['consonant'], ['vowel'], ['glide']]
+        self.phonotactics.partition_syllable(syllable)
+        self.phonotactics.clear_nuclei()
+        with self.assertRaises(ValueError):
+            self.phonotactics.partition_syllable(syllable)
+
+class MoraeCounting(unittest.TestCase):
+    def setUp(self):
+        self.phonetics = Phonetics()
+        self.phonetics.add("o", ["vowel", "back", "mid", "rounded"])
+        self.phonetics.add("k", ["consonant", "voiceless", "velar", "stop"])
+        self.phonetics.add("n", ["consonant", "voiced", "alveolar", "nasal"])
+        self.phonology = Phonology(self.phonetics)
+        self.morae = self.phonology.morae
+
+    def test_count_longest_mora(self):
+        self.morae.add(["V", "C"], beats=1)
+        self.morae.add(["V", "V", "C"], beats=2)
+        self.assertEqual(
+            self.morae.count(['k', 'o', 'o', 'k', 'o', 'n']),
+            3,
+            "failed to count the longest mora ending at a sound"
+        )
+
+    def test_count_skips_unmatched_sounds(self):
+        self.morae.add([["nasal"]], beats=1)
+        self.assertEqual(
+            self.morae.count(['k', 'o', 'n', 'o', 'n', 'k']),
+            2,
+            "failed to count only sounds matching moraic features"
+        )
+
+    def test_count_after_morae_change(self):
+        moraic_id = self.morae.add(["V"], beats=1)
+        self.morae.count(['o', 'k'])
+        self.morae.remove(moraic_id)
+        self.morae.add(["C"], beats=2)
+        self.assertEqual(
+            self.morae.count(['o', 'k', 'n']),
+            4,
+            "failed to count with morae changed since the last count"
+        )
+
+    def test_count_many(self):
+        self.morae.add(["V"], beats=1)
+        self.assertEqual(
+            self.morae.count_many([['k', 'o'], ['o', 'o', 'n'], []]),
+            [1, 2, 0],
+            "failed to count beats for many sound samples"
+        )
+
+class PhonologyTranscription(unittest.TestCase):
+    def setUp(self):
+        self.phonetics = Phonetics()
+        self.phonetics.add("a", ["vowel", "open"])
+        self.phonetics.add("t", ["consonant", "stop"])
+        self.phonetics.add("h", ["consonant", "glottal"])
+        self.phonetics.add("θ", ["consonant", "fricative"])
+        self.phonetics.add("k", ["consonant", "velar"])
+        self.phonetics.add("s", ["consonant", "sibilant"])
+        self.phonology = Phonology(self.phonetics)
+        self.phonology.add_sounds({'a': ['a'], 't': ['t'], 'h': ['h'], 'θ': ['th']})
+
+    def test_transcribe_multigraph(self):
+        self.assertEqual(
+            self.phonology.transcribe("atha"),
+            ['a', 'θ', 'a'],
+            "failed to prefer reading a multigraph as one sound"
+        )
+
+    def test_transcribe_ranked_parses(self):
+        parses = self.phonology.transcribe("tha", max_parses=5)
+        self.assertEqual(
+            [parse['sound'] for parse in parses],
+            [['θ', 'a'], ['t', 'h', 'a']],
+            "failed to list every reading ranked by fewest letters"
+        )
+
+    def test_transcribe_letter_weights(self):
+        self.phonology.phonemes.add("k", {'c': 3})
+        self.phonology.phonemes.add("s", {'c': 1, 's': 1})
+        parses = self.phonology.transcribe("ca", max_parses=5)
+        self.assertEqual(
+            [(parse['sound'], parse['chance']) for parse in parses],
+            [(['k', 'a'], 0.75), (['s', 'a'], 0.25)],
+            "failed to rank readings of an ambiguous letter by letter weights"
+        )
+
+    def test_transcribe_many(self):
+        self.assertEqual(
+            self.phonology.transcribe_many(["tat", "x", "tat"]),
+            [['t', 'a', 't'], None, ['t', 'a', 't']],
+            "failed to read many spellings back into sounds"
+        )
+
+    def test_transcribe_after_letters_change(self):
+        self.phonology.transcribe("ta")
+        self.phonology.phonemes.update("t", letters=["d"])
+        self.assertEqual(
+            self.phonology.transcribe("da"),
+            ['t', 'a'],
+            "failed to read spellings with letters changed since the last reading"
+        )
+
+class PhonologyRuleOrder(unittest.TestCase):
+    def setUp(self):
+        self.rules = Rules()
+        self.ids = [self.rules.add(['voiceless'], ['voiced'], "V_V") for _ in range(4)]
+
+    def test_swap_rules(self):
+        self.rules.order_swap(self.ids[1], self.ids[2])
+        self.rules.order_swap(self.ids[0], self.ids[3])
+        self.assertEqual(
+            self.rules.get_order(),
+            [self.ids[3], self.ids[2], self.ids[1], self.ids[0]],
+            "failed to swap neighboring and distant rules"
+        )
+
+    def test_remove_rule(self):
+        self.rules.remove(self.ids[1])
+        added_id = self.rules.add(['stop'], ['fricative'], "V_V")
+        self.assertEqual(
+            self.rules.get_order(),
+            [self.ids[0], self.ids[2], self.ids[3], added_id],
+            "failed to keep rule order after removing and adding rules"
+        )
+
+    def test_ordered_view_refreshes(self):
+        ordered_ids = self.rules.get_ordered_ids()
+        self.assertIs(
+            self.rules.get_ordered_ids(),
+            ordered_ids,
+            "failed to reuse the ordered view of unchanged rules"
+        )
+        self.rules.order_absolute(self.ids[0], 2)
+        self.assertEqual(
+            self.rules.get_ordered_ids(),
+            (self.ids[1], self.ids[2], self.ids[0], self.ids[3]),
+            "failed to refresh the ordered view after reordering rules"
+        )
+        self.assertEqual(
+            self.rules.get_position(self.ids[0]),
+            2,
+            "failed to find the position of a reordered rule"
+        )
+
+    def test_order_absolute_outside_range(self):
+        self.assertEqual(
+            self.rules.order_absolute(self.ids[3], -1),
+            [self.ids[0], self.ids[3], self.ids[1], self.ids[2]],
+            "failed to place a rule at a position counted from the end"
+        )
+        self.assertEqual(
+            self.rules.order_absolute(self.ids[2], -9),
+            [self.ids[2], self.ids[0], self.ids[3], self.ids[1]],
+            "failed to place a rule first for a position before the start"
+        )
+        self.assertEqual(
+            self.rules.order_absolute(self.ids[2], 9),
+            [self.ids[0], self.ids[3], self.ids[1], self.ids[2]],
+            "failed to place a rule last for a position past the end"
+        )
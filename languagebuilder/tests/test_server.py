@@ -0,0 +1,110 @@
+import asyncio
+import json
+import unittest
+
+from ..benchmarks.workloads import build_language
+from ..server import handlers
+from ..server.server import GenerationServer
+
+def setUpModule():
+    print("Setting up the Server test module")
+
+def tearDownModule():
+    print("Shutting down the Server test module")
+
+async def send_requests(port, requests):
+    """Send request lines to a localhost server and read one response per request"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for request in requests:
+        writer.write(json.dumps(request).encode() + b"\n")
+    await writer.drain()
+    responses = [json.loads(await reader.readline()) for _ in requests]
+    writer.close()
+    return {response['id']: response for response in responses}
+
+class ServerRequests(unittest.TestCase):
+    def setUp(self):
+        self.language = build_language("small")
+        self.headword = next(iter(self.language.vocabulary.vocabulary))
+
+    def serve(self, requests, workers=0, **settings):
+        async def run():
+            async with GenerationServer({'small': self.language}, workers=workers, **settings) as server:
+                return await send_requests(server.port, requests)
+        return asyncio.run(run())
+
+    def test_generate_seeded(self):
+        responses = self.serve([
+            {'id': 1, 'method': "generate", 'params': {'count': 3}, 'seed': 7},
+            {'id': 2, 'method': "generate", 'params': {'count': 3}, 'seed': 7}
+        ])
+        self.assertEqual(
+            len(responses[1]['result']),
+            3,
+            "Failed to generate the requested number of words"
+        )
+        self.assertEqual(
+            responses[1]['result'],
+            responses[2]['result'],
+            "Failed to repeat generated words for the same seed"
+        )
+
+    def test_batch_keeps_loaded_corpus(self):
+        example_id = self.language.corpus.add(sound=['a'], definition="loaded example")
+        handlers.languages.clear()
+        handlers.languages['small'] = self.language
+        handlers.run_batch([{'id': 1, 'language': "small", 'method': "attach", 'params': {
+            'base': self.headword,
+            'entry_index': 0,
+            'properties': {'case': ["case1"]},
+            'word_classes': "noun"
+        }}])
+        handlers.languages.clear()
+        self.assertEqual(
+            list(self.language.corpus.corpus),
+            [example_id],
+            "Failed to keep the loaded corpus while removing units attached in a batch"
+        )
+
+    def test_attach_and_search(self):
+        responses = self.serve([
+            {'id': "attach", 'method': "attach", 'params': {
+                'base': self.headword,
+                'entry_index': 0,
+                'properties': {'case': ["case1"]},
+                'word_classes': "noun"
+            }},
+            {'id': "search", 'method': "search", 'params': {'keywords': "word"}}
+        ])
+        self.assertEqual(
+            responses['attach']['result']['properties'],
+            {'case': ["case1"]},
+            "Failed to attach requested properties to a base word"
+        )
+        self.assertTrue(
+            responses['search']['result'] and all("word" in entry['definition'] for entry in responses['search']['result']),
+            "Failed to search the language vocabulary"
+        )
+
+    def test_request_errors(self):
+        responses = self.serve([
+            {'id': 1, 'method': "unknown"},
+            {'id': 2, 'method': "generate", 'language': "missing"}
+        ])
+        self.assertTrue(
+            "error" in responses[1] and "error" in responses[2],
+            "Failed to report errors for invalid requests"
+        )
+
+    def test_process_pool_batches(self):
+        requests = [{'id': i, 'method': "generate", 'seed': i} for i in range(20)]
+        responses = self.serve(requests, workers=1, batch_size=4, queue_size=2)
+        self.assertEqual(
+            sorted(responses),
+            list(range(20)),
+            "Failed to answer every request through a worker process"
+        )
+        self.assertTrue(
+            all(len(response['result']) == 1 for response in responses.values()),
+            "Failed to generate words in a worker process"
+        )
@@ -1,6 +1,9 @@
 import unittest
 
 from ..tools import flat_list, string_list
+from ..tools.permutation import Permutation
+from ..tools.overlay import Overlay, CollectionOverlay
+from ..tools.collector import Collection
 
 def setUpModule():
     print("Setting up the Tools test module")
@@ -76,6 +79,30 @@ class FlatList(unittest.TestCase):
             [1, 3, 5, 7]
         )
 
+    def test_flatten_past_recursion_limit(self):
+        a = [1]
+        for n in range(2, 5001):
+            a = [a, n]
+        self.assertEqual(
+            flat_list.flatten(a),
+            list(range(1, 5001)),
+            "Failed to flatten lists nested deeper than the recursion limit"
+        )
+
+    def test_iter_flatten_lazily(self):
+        a = [[1, [2]], ([3], 4), 5]
+        flattened = flat_list.iter_flat_map(lambda n: n * 10, a)
+        self.assertEqual(next(flattened), 10, "Failed to yield the first element before the rest")
+        self.assertEqual(list(flattened), [20, 30, 40, 50], "Failed to yield the remaining elements")
+
+    def test_flat_filter_depth(self):
+        a = [[1, [2]], [[3], 4]]
+        self.assertEqual(
+            flat_list.flat_filter(lambda n: n > 1, a, depth=1),
+            [1, [2], [3], 4],
+            "Failed to leave sublists below the depth unfiltered"
+        )
+
 class StringList(unittest.TestCase):
     def test_string_listify_string(self):
         s = "string"
@@ -100,3 +127,125 @@ class StringList(unittest.TestCase):
             ["a string", "another string", "third string"],
             "Failed to treat string list as a list of strings"
         )
+
+class KeyedPermutation(unittest.TestCase):
+    def test_permutation_one_to_one(self):
+        permutation = Permutation(1000, key="test")
+        numbers = [permutation.forward(i) for i in range(1000)]
+        self.assertEqual(
+            sorted(numbers),
+            list(range(1000)),
+            "Failed to map every position to a different number"
+        )
+        self.assertTrue(
+            all(permutation.backward(number) == i for i, number in enumerate(numbers)),
+            "Failed to map numbers back to their positions"
+        )
+
+    def test_permutation_keyed(self):
+        self.assertNotEqual(
+            [Permutation(1000, key="one").forward(i) for i in range(10)],
+            [Permutation(1000, key="two").forward(i) for i in range(10)],
+            "Failed to order numbers differently for different keys"
+        )
+
+    def test_permutation_long_keys(self):
+        self.assertNotEqual(
+            [Permutation(1000, key="k" * 64 + "one").forward(i) for i in range(10)],
+            [Permutation(1000, key="k" * 64 + "two").forward(i) for i in range(10)],
+            "Failed to order numbers differently for keys differing past 64 bytes"
+        )
+
+class CopyOnWriteOverlay(unittest.TestCase):
+    def setUp(self):
+        self.base = {'a': [1], 'b': [2]}
+        self.overlay = Overlay(self.base)
+
+    def test_overlay_reads_through(self):
+        self.assertEqual(
+            dict(self.overlay.items()),
+            self.base,
+            "Failed to read base keys and values through the overlay"
+        )
+        self.assertEqual(self.overlay.changes(), 0, "Failed to read without copying")
+
+    def test_overlay_copies_on_write(self):
+        self.overlay['a'].append(3)
+        self.overlay['c'] = [4]
+        del self.overlay['b']
+        self.assertEqual(
+            dict(self.overlay.items()),
+            {'a': [1, 3], 'c': [4]},
+            "Failed to change values and keys in the overlay"
+        )
+        self.assertEqual(
+            self.base,
+            {'a': [1], 'b': [2]},
+            "Failed to leave the base map unchanged"
+        )
+
+    def test_overlay_shows_base_changes(self):
+        self.base['d'] = [5]
+        self.assertIn('d', self.overlay, "Failed to show keys added to the base")
+
+    def test_overlay_stacks(self):
+        overlay = Overlay(self.overlay)
+        overlay['a'].append(3)
+        self.assertEqual(self.overlay['a'], [1], "Failed to keep a stacked overlay's changes to itself")
+        self.assertEqual(len(overlay), 2, "Failed to count keys through stacked overlays")
+
+class CopyOnWriteCollection(unittest.TestCase):
+    def setUp(self):
+        self.base = Collection([[1], [2]])
+        self.overlay = CollectionOverlay(self.base)
+
+    def test_overlay_adds_new_ids(self):
+        overlay_id = self.overlay.add([3])
+        base_id = self.base.add([4])
+        self.assertEqual(
+            list(self.overlay.items()),
+            [(1, [1]), (2, [2]), (overlay_id, [3])],
+            "Failed to add values after base values without reading later base ids"
+        )
+        self.assertEqual(
+            (overlay_id, base_id, 3 in self.base),
+            (3, 3, True),
+            "Failed to allocate ids in the overlay apart from the base"
+        )
+        self.assertEqual(self.base[3], [4], "Failed to keep the base value under a shared id")
+
+    def test_overlay_stacks_collections(self):
+        self.overlay.add([3])
+        overlay = CollectionOverlay(self.overlay)
+        self.assertEqual(
+            (overlay.add([4]), len(overlay)),
+            (4, 4),
+            "Failed to add values through stacked collection overlays"
+        )
+
+class IdCollection(unittest.TestCase):
+    def setUp(self):
+        self.collection = Collection()
+        self.ids = [self.collection.add(value) for value in "abcd"]
+
+    def test_collection_allocates_ids(self):
+        self.assertEqual(self.ids, [1, 2, 3, 4], "Failed to count ids up from 1")
+        del self.collection[2]
+        self.assertEqual(self.collection.add("e"), 5, "Failed to avoid reusing a removed id")
+        self.assertEqual(
+            len(self.collection.values_by_slot),
+            4,
+            "Failed to reuse the slot of a removed value"
+        )
+
+    def test_collection_keeps_order(self):
+        del self.collection[2]
+        self.collection.add("e", before=1)
+        self.collection.move(4, before=3)
+        self.assertEqual(
+            list(self.collection.items()),
+            [(5, "e"), (1, "a"), (4, "d"), (3, "c")],
+            "Failed to iterate ids in order after removing, inserting and moving"
+        )
+        self.collection.move(5)
+        self.assertEqual(list(self.collection), [1, 4, 3, 5], "Failed to move an id last")
@@ -1,4 +1,147 @@
-import uuid
+from collections.abc import MutableMapping
+
+# Map of integer ids to values, kept in an ordered sequence
+# - ids are allocated counting up from 1, so they stay truthy and are never reused
+# - values sit in dense lists by slot, and the slots of removed values are
+#   kept in a free list and filled by later additions
+# - the order of ids is a doubly linked list of slots, so adding, removing and
+#   moving an id is constant time
+# - iterating reads ids in order, and other keys can be set directly too
+class Collection(MutableMapping):
+    def __init__(self, values=None):
+        # values and ids by slot, None in free slots
+        self.values_by_slot = []
+        self.ids_by_slot = []
+        # map of id:slot
+        self.slots = {}
+        # slots free for reuse
+        self.free_slots = []
+        # next id to allocate
+        self.next_id = 1
+        # linked order as the next and previous slot by slot, -1 at the ends
+        self.next_slots = []
+        self.previous_slots = []
+        self.head = -1
+        self.tail = -1
+        for value in values or []:
+            self.add(value)
+
+    def allocate(self, key, value):
+        """Store a value under a key in a free or new slot, unlinked"""
+        if self.free_slots:
+            slot = self.free_slots.pop()
+            self.values_by_slot[slot] = value
+            self.ids_by_slot[slot] = key
+        else:
+            slot = len(self.values_by_slot)
+            self.values_by_slot.append(value)
+            self.ids_by_slot.append(key)
+            self.next_slots.append(-1)
+            self.previous_slots.append(-1)
+        self.slots[key] = slot
+        if isinstance(key, int) and key >= self.next_id:
+            self.next_id = key + 1
+        return slot
+
+    def link(self, slot, before=-1):
+        """Place a slot in the order before another slot, or last"""
+        previous_slot = self.tail if before == -1 else self.previous_slots[before]
+        self.previous_slots[slot] = previous_slot
+        self.next_slots[slot] = before
+        if previous_slot == -1:
+            self.head = slot
+        else:
+            self.next_slots[previous_slot] = slot
+        if before == -1:
+            self.tail = slot
+        else:
+            self.previous_slots[before] = slot
+
+    def unlink(self, slot):
+        """Take a slot out of the order"""
+        previous_slot = self.previous_slots[slot]
+        next_slot = self.next_slots[slot]
+        if previous_slot == -1:
+            self.head = next_slot
+        else:
+            self.next_slots[previous_slot] = next_slot
+        if next_slot == -1:
+            self.tail = previous_slot
+        else:
+            self.previous_slots[next_slot] = previous_slot
+
+    def add(self, value, before=None):
+        """Store a value under a new id, last or before another id, and return the id"""
+        if before is not None and before not in self.slots:
+            raise KeyError(before)
+        key = self.next_id
+        slot = self.allocate(key, value)
+        self.link(slot, -1 if before is None else self.slots[before])
+        return key
+
+    def move(self, key, before=None):
+        """Move an id before another id, or last"""
+        if key == before:
+            return
+        slot = self.slots[key]
+        before_slot = -1 if before is None else self.slots[before]
+        self.unlink(slot)
+        self.link(slot, before_slot)
+
+    def next_key(self, key):
+        """Read the id after an id in the order, or None at the end"""
+        slot = self.next_slots[self.slots[key]]
+        return None if slot == -1 else self.ids_by_slot[slot]
+
+    def previous_key(self, key):
+        """Read the id before an id in the order, or None at the start"""
+        slot = self.previous_slots[self.slots[key]]
+        return None if slot == -1 else self.ids_by_slot[slot]
+
+    def __getitem__(self, key):
+        return self.values_by_slot[self.slots[key]]
+
+    def __setitem__(self, key, value):
+        if key in self.slots:
+            self.values_by_slot[self.slots[key]] = value
+        else:
+            self.link(self.allocate(key, value))
+
+    def __delitem__(self, key):
+        slot = self.slots.pop(key)
+        self.unlink(slot)
+        self.values_by_slot[slot] = None
+        self.ids_by_slot[slot] = None
+        self.free_slots.append(slot)
+
+    def __contains__(self, key):
+        return key in self.slots
+
+    def __iter__(self):
+        slot = self.head
+        while slot != -1:
+            yield self.ids_by_slot[slot]
+            slot = self.next_slots[slot]
+
+    def __len__(self):
+        return len(self.slots)
+
+    def __repr__(self):
+        return f"Collection({dict(self.items())})"
+
+    def clear(self):
+        """Remove every id, without resetting id allocation"""
+        next_id = self.next_id
+        self.__init__()
+        self.next_id = next_id
+
+    def copy(self):
+        """Copy the collection sharing its values"""
+        collection = Collection()
+        for key, value in self.items():
+            collection[key] = value
+        collection.next_id = self.next_id
+        return collection
 
 # NOTE: abstracted class storing and managing a map of typed objects
 #   - built based on Rules class
@@ -12,7 +155,7 @@ import uuid
 
 class Collector():
     def __init__(self, accepted_types=[], read_types_from_classes=False):
-        self.map = {}
+        self.map = Collection()
         # leave blank to accept any
         if read_types_from_classes and accepted_types:
             self.accepted_types = [t for t in type(accepted_types).__name__]
@@ -72,9 +215,10 @@ class Collector():
         if not self.is_valid(object):
             print("Collector add failed - invalid object {0}".format(object))
             return
-        object_id = key if key else uuid.uuid4()
-        self.map[object_id] = object
-        return object_id
+        if not key:
+            return self.map.add(object)
+        self.map[key] = object
+        return key
 
     def update(self, object_id, object):
         """Modify an existing object"""
@@ -97,5 +241,5 @@ class Collector():
         map_cache = self.map.copy()
         def read_cache():
             return map_cache
-        self.map = {}
+        self.map = Collection()
         return read_cache
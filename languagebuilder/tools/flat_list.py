@@ -1,40 +1,110 @@
 from collections import deque
 
+# NOTE: flattening walks nested sequences with a stack of iterators instead of
+# recursing, so no intermediate lists are built and deep nesting never reaches
+# the recursion limit - flatten appends straight to one list, while iter_flatten
+# yields elements one at a time and can stop at a depth
+
+def iter_flatten(l, depth=None, map_expression=None, filter_expression=None):
+    """Take a nested sequence and yield its elements with no subcollections.
+    Supports mapping or filtering elements as they are yielded. Pass a depth
+    to unnest only that many levels, yielding deeper subcollections whole."""
+    # reached individual list item
+    if is_primitive(l):
+        if not filter_expression or filter_expression(l):
+            yield map_expression(l) if map_expression else l
+        return
+
+    # optionally break at specific depth
+    if isinstance(depth, int):
+        if depth <= 0:
+            yield from l
+            return
+        depth -= 1
+
+    # stack of sublist iterators, with levels left to unnest below each one
+    # kept alongside only when stopping at a depth
+    stack = []
+    depths = [] if depth is not None else None
+    items = iter(l)
+    while True:
+        for item in items:
+            # reached individual list item
+            if not isinstance(item, nested_types):
+                if filter_expression and not filter_expression(item):
+                    continue
+                yield map_expression(item) if map_expression else item
+            # reached depth - add sublist elements unchanged
+            elif depths is not None and depth <= 0:
+                yield from item
+            # reached another list - descend into it before continuing this one
+            else:
+                stack.append(items)
+                items = iter(item)
+                if depths is not None:
+                    depths.append(depth)
+                    depth -= 1
+                break
+        else:
+            if not stack:
+                return
+            items = stack.pop()
+            if depths is not None:
+                depth = depths.pop()
+
 def flatten(l, depth=None, map_expression=None, filter_expression=None):
     """"Take a nested sequence and return a flattened list with no subcollections.
     Supports mapping or filtering elements before they get added to the final flatlist."""
-    # reached individual list item or recursion depth
-    if is_primitive(l):
-        failed_filter = filter_expression and not filter_expression(l)
-        filter_e = [] if failed_filter else [l]
-        terminal_e = [
-            map_expression(l)
-        ] if map_expression and not failed_filter else filter_e
-        return terminal_e
-
-    # optionally break at specific recursion depth
+    # hand back an unflattened sequence as is
     if isinstance(depth, int):
-        if depth <= 0:
+        if depth <= 0 and not is_primitive(l):
             return l
-        depth -= 1
+        return list(iter_flatten(l, depth, map_expression=map_expression, filter_expression=filter_expression))
+    if not isinstance(l, nested_types):
+        return list(iter_flatten(l, map_expression=map_expression, filter_expression=filter_expression))
 
-    # reached another list - flatten it
+    # walk sublists appending elements straight to the flatlist
     flat_l = []
-    # recurse through sublists
-    for l_sub in l:
-        flat_l += flatten(l_sub, depth, map_expression=map_expression, filter_expression=filter_expression)
-
-    return flat_l
+    add = flat_l.append
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    items = iter(l)
+    while True:
+        for item in items:
+            # reached another list - come back to this one after it
+            if isinstance(item, nested_types):
+                push(items)
+                items = iter(item)
+                break
+            if filter_expression and not filter_expression(item):
+                continue
+            add(map_expression(item) if map_expression else item)
+        else:
+            if not stack:
+                return flat_l
+            items = pop()
 
 # NOTE: current use treats dict as a terminal object
+# sequence types unnested when flattening
+nested_types = (list, set, tuple, deque)
+
 def is_primitive(l):
     """Check if the value is considered a flatlist primitive"""
-    return not isinstance(l, (list, set, tuple, deque))
+    return not isinstance(l, nested_types)
+
+def iter_flat_map(expression, l, depth=None):
+    """Flatten and yield the expression run on all elements in all sublists"""
+    return iter_flatten(l, depth, map_expression=expression)
+
+def iter_flat_filter(expression, l, depth=None):
+    """Flatten and yield the elements in all sublists passing the expression"""
+    return iter_flatten(l, depth, filter_expression=expression)
 
-def flat_map(expression, l):
+def flat_map(expression, l, depth=None):
     """Flatten and run expression on all elements in all sublists"""
-    return flatten(l, map_expression=expression)
+    return flatten(l, depth, map_expression=expression)
 
-def flat_filter(expression, l):
+def flat_filter(expression, l, depth=None):
     """Flatten and filter all elements in all sublists"""
-    return flatten(l, filter_expression=expression)
+    return flatten(l, depth, filter_expression=expression)
@@ -0,0 +1,131 @@
+from collections.abc import MutableMapping
+import copy
+
+# Copy-on-write map layered over a shared base map
+# - reading through, iterating and membership checks see the base map's keys
+#   and values wherever the overlay has not set or removed its own
+# - looking a key up with [] (or get, setdefault, pop) copies the base value
+#   into the overlay's own layer first, since callers may mutate what they get,
+#   so the base map never changes through the overlay
+# - setting and deleting keys only touch the layer and a set of removed keys
+# - the base is read live, so base changes show through for keys the overlay
+#   has not copied, set or removed
+# - memory grows with the keys the overlay has touched, not with the base size
+class Overlay(MutableMapping):
+    def __init__(self, base, copy_value=copy.deepcopy):
+        # shared map read through, which may itself be an overlay
+        self.base = base
+        # values set or copied into this overlay
+        self.layer = {}
+        # base keys removed from this overlay
+        self.removed = set()
+        # function copying a base value before handing it out, or None for
+        # immutable values that can be shared as they are
+        self.copy_value = copy_value
+
+    def in_base(self, key):
+        """Check if the key is read through from the base map"""
+        return key not in self.removed and key in self.base
+
+    def peek(self, key, default=None):
+        """Read a value without copying it into the layer. Do not mutate it."""
+        if key in self.layer:
+            return self.layer[key]
+        if not self.in_base(key):
+            return default
+        return self.base.peek(key) if isinstance(self.base, Overlay) else self.base[key]
+
+    def __getitem__(self, key):
+        if key in self.layer:
+            return self.layer[key]
+        if not self.in_base(key):
+            raise KeyError(key)
+        value = self.base.peek(key) if isinstance(self.base, Overlay) else self.base[key]
+        if self.copy_value:
+            value = self.copy_value(value)
+        self.layer[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        self.layer[key] = value
+        self.removed.discard(key)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.layer.pop(key, None)
+        if key in self.base:
+            self.removed.add(key)
+
+    def __contains__(self, key):
+        return key in self.layer or self.in_base(key)
+
+    def __iter__(self):
+        # base keys first in base order, then keys only in the layer
+        for key in self.base:
+            if self.in_base(key):
+                yield key
+        for key in self.layer:
+            if not self.in_base(key):
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"Overlay({dict(self.items())})"
+
+    def items(self):
+        """Iterate (key, value) pairs without copying values into the layer"""
+        return ((key, self.peek(key)) for key in self)
+
+    def values(self):
+        """Iterate values without copying them into the layer"""
+        return (self.peek(key) for key in self)
+
+    def clear(self):
+        """Remove every key without touching the base map"""
+        self.layer.clear()
+        self.removed = set(self.base)
+
+    def changes(self):
+        """Count keys this overlay holds or removed apart from the base map"""
+        return len(self.layer) + len(self.removed)
+
+# Overlay on a Collection (see tools/collector.py) adding values under new ids
+# - new ids count up from the base's next id at the time of layering, just as
+#   the base would have allocated them
+# - base ids from that point on are not read through, so ids the base adds
+#   after layering never clash with ids the overlay adds
+# - added ids iterate after the base ids, in the order they were added
+class CollectionOverlay(Overlay):
+    def __init__(self, base, copy_value=copy.deepcopy):
+        super().__init__(base, copy_value=copy_value)
+        # first id allocated here rather than read from the base
+        self.first_id = base.next_id
+        # next id to allocate
+        self.next_id = base.next_id
+
+    def in_base(self, key):
+        """Check if the key is read through from the base map"""
+        if isinstance(key, int) and key >= self.first_id:
+            return False
+        return super().in_base(key)
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if isinstance(key, int) and key >= self.next_id:
+            self.next_id = key + 1
+
+    def add(self, value):
+        """Store a value under a new id and return the id"""
+        key = self.next_id
+        self[key] = value
+        return key
+
+def peek(mapping, key, default=None):
+    """Read a value from a map or an overlay without copying it into the overlay's
+    layer. Do not mutate it."""
+    if isinstance(mapping, Overlay):
+        return mapping.peek(key, default)
+    return mapping.get(key, default)
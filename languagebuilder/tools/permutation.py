@@ -0,0 +1,65 @@
+import hashlib
+
+# Keyed permutation of the integers 0 to size - 1
+# - a balanced Feistel network shuffles numbers with an even count of bits,
+#   each round mixing one half into the other through a keyed hash
+# - numbers the network sends beyond size are passed through again until
+#   they land in range, which keeps the mapping one-to-one within size
+# - the same key always gives the same order, so a position alone is enough
+#   to resume walking the permutation in another process or after a restart
+class Permutation():
+    def __init__(self, size, key="", rounds=8):
+        if not isinstance(size, int) or size < 1:
+            raise ValueError(f"Permutation expected a positive size not {size}")
+        self.size = size
+        key = key.encode() if isinstance(key, str) else bytes(key)
+        # blake2b keys hold at most 64 bytes, so longer keys are hashed down to
+        # 64 bytes rather than cut, keeping every byte of the key significant
+        self.key = key if len(key) <= 64 else hashlib.blake2b(key, digest_size=64).digest()
+        self.rounds = rounds
+
+        # split numbers into two equal halves of bits covering the size
+        bits = max(2, (size - 1).bit_length())
+        self.half_bits = (bits + 1) // 2
+        self.half_mask = (1 << self.half_bits) - 1
+        self.digest_size = min(64, (self.half_bits + 7) // 8)
+
+    def mix(self, round_index, half):
+        """Hash one half with the key and round into a number of half bits"""
+        digest = hashlib.blake2b(
+            half.to_bytes(self.digest_size, "big"),
+            digest_size=self.digest_size,
+            key=self.key,
+            salt=round_index.to_bytes(16, "big")
+        ).digest()
+        return int.from_bytes(digest, "big") & self.half_mask
+
+    def encrypt(self, number):
+        left, right = number >> self.half_bits, number & self.half_mask
+        for round_index in range(self.rounds):
+            left, right = right, left ^ self.mix(round_index, right)
+        return (left << self.half_bits) | right
+
+    def decrypt(self, number):
+        left, right = number >> self.half_bits, number & self.half_mask
+        for round_index in reversed(range(self.rounds)):
+            left, right = right ^ self.mix(round_index, left), left
+        return (left << self.half_bits) | right
+
+    def forward(self, index):
+        """Find the number at a position in the permutation"""
+        if not 0 <= index < self.size:
+            raise IndexError(f"Permutation index {index} out of range for size {self.size}")
+        number = self.encrypt(index)
+        while number >= self.size:
+            number = self.encrypt(number)
+        return number
+
+    def backward(self, number):
+        """Find the position of a number in the permutation"""
+        if not 0 <= number < self.size:
+            raise IndexError(f"Permutation number {number} out of range for size {self.size}")
+        index = self.decrypt(number)
+        while index >= self.size:
+            index = self.decrypt(index)
+        return index
@@ -0,0 +1,120 @@
+import copy
+import json
+import time
+
+# stage names and the path from a language to the method each stage times
+stages = {
+    'build_word': ('phonology', 'build_word'),
+    'apply_rule': ('phonology', 'apply_rule'),
+    'apply_rules_many': ('phonology', 'apply_rules_many'),
+    'change_symbol': ('phonology', 'change_symbol'),
+    'spell': ('phonology', 'spell'),
+    'spell_many': ('phonology', 'spell_many'),
+    'syllabify': ('phonology', 'syllables', 'syllabify'),
+    'syllabify_many': ('phonology', 'syllables', 'syllabify_many'),
+    'provide': ('grammar', 'provide'),
+    'plan_unit': ('grammar', 'plan_unit'),
+    'attach_plan': ('grammar', 'attach_plan'),
+    'attach_exponents': ('grammar', 'attach_exponents'),
+    'search': ('vocabulary', 'search')
+}
+
+# Count calls and time spent in the hot paths of one language
+# - each stage is a method on one of the language's components, wrapped by an
+#   instance attribute only while the profiler is enabled, so a language that
+#   is not being profiled runs its methods untouched
+# - nested calls count toward every stage they pass through, so time spent in
+#   build_word includes the apply_rule and spell calls made inside it
+# - batch paths have stages of their own: sound changes on many words (as in
+#   change_sounds, histories and summaries) run through apply_rules_many
+#   rather than apply_rule and change_symbol, and built units and sentences
+#   run through plan_unit and attach_plan rather than attach_exponents
+# - counts and times add up across enabled runs until reset
+# - calls made in other processes (like process pool workers) are not counted
+class Profiler:
+    def __init__(self):
+        # map of stage:number of calls
+        self.counts = {stage: 0 for stage in stages}
+        # map of stage:cumulative seconds
+        self.totals = {stage: 0.0 for stage in stages}
+        # (owner, attribute name, replaced instance attribute or None) per wrapped method
+        self.wrapped = []
+
+    def enable(self, language):
+        """Start counting calls to every stage on the language's components"""
+        if self.wrapped:
+            print("Profiler enable failed - already enabled")
+            return
+        for stage, path in stages.items():
+            owner = language
+            for attribute in path[:-1]:
+                owner = getattr(owner, attribute)
+            attribute = path[-1]
+            self.wrapped.append((owner, attribute, vars(owner).get(attribute)))
+            setattr(owner, attribute, Probe(self, stage, getattr(owner, attribute)))
+        return True
+
+    def disable(self):
+        """Stop counting calls and restore the wrapped methods"""
+        for owner, attribute, replaced in reversed(self.wrapped):
+            if replaced is None:
+                delattr(owner, attribute)
+            else:
+                setattr(owner, attribute, replaced)
+        self.wrapped = []
+
+    def is_enabled(self):
+        """Check if the profiler is currently counting calls"""
+        return bool(self.wrapped)
+
+    def reset(self):
+        """Zero every count and time"""
+        self.counts = {stage: 0 for stage in stages}
+        self.totals = {stage: 0.0 for stage in stages}
+
+    def snapshot(self):
+        """Read counts and times as a map of stage:{'calls', 'seconds'}"""
+        return {
+            stage: {'calls': self.counts[stage], 'seconds': self.totals[stage]}
+            for stage in stages
+        }
+
+    def format_prometheus(self, prefix="languagebuilder"):
+        """Format counts and times as Prometheus text exposition"""
+        lines = []
+        for metric, description, values in (
+            (f"{prefix}_stage_calls_total", "Calls to each profiled stage", self.counts),
+            (f"{prefix}_stage_seconds_total", "Seconds spent in each profiled stage", self.totals)
+        ):
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} counter")
+            lines += [f'{metric}{{stage="{stage}"}} {values[stage]}' for stage in stages]
+        return "\n".join(lines) + "\n"
+
+    def save(self, path, prometheus=False):
+        """Write a snapshot to a JSON file or a Prometheus text file"""
+        with open(path, "w") as snapshot_file:
+            if prometheus:
+                snapshot_file.write(self.format_prometheus())
+            else:
+                json.dump(self.snapshot(), snapshot_file, indent=2)
+        return path
+
+# Stand-in for a profiled method counting and timing each call
+class Probe:
+    def __init__(self, profiler, stage, method):
+        self.profiler = profiler
+        self.stage = stage
+        self.method = method
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.method(*args, **kwargs)
+        finally:
+            self.profiler.totals[self.stage] += time.perf_counter() - start
+            self.profiler.counts[self.stage] += 1
+
+    def __deepcopy__(self, memo):
+        # copies (like forked languages) get the method without the probe
+        return copy.deepcopy(self.method, memo)